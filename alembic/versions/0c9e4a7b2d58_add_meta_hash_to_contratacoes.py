@@ -0,0 +1,30 @@
+"""Add meta_hash to contratacoes
+
+Revision ID: 0c9e4a7b2d58
+Revises: f7b3d1e9a2c4
+Create Date: 2026-10-18 18:36:12.540731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9e4a7b2d58'
+down_revision: Union[str, Sequence[str], None] = 'f7b3d1e9a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left NULL for existing rows: the hash is computed from the PNCP payload
+    # in Python, so each row gets one on its next write.
+    op.add_column('contratacoes', sa.Column('meta_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contratacoes', 'meta_hash')
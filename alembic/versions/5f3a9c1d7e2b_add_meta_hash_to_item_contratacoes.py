@@ -0,0 +1,30 @@
+"""Add meta_hash to item_contratacoes
+
+Revision ID: 5f3a9c1d7e2b
+Revises: c6066214bc86
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3a9c1d7e2b'
+down_revision: Union[str, Sequence[str], None] = 'c6066214bc86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep a NULL hash; each one is rewritten once, the first
+    # time its contratacao is updated, and diffed from then on.
+    op.add_column('item_contratacoes', sa.Column('meta_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('item_contratacoes', 'meta_hash')
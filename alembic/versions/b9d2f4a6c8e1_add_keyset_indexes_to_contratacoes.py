@@ -0,0 +1,37 @@
+"""Add keyset indexes to contratacoes
+
+Revision ID: b9d2f4a6c8e1
+Revises: 0c9e4a7b2d58
+Create Date: 2026-10-18 19:42:10.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d2f4a6c8e1'
+down_revision: Union[str, Sequence[str], None] = '0c9e4a7b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RANGE_COLUMNS = ('data_atualizacao_global', 'data_publicacao_pncp')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The keyset walk orders by (column, numero_controle_pncp); the composite
+    # index serves it and still serves plain range filters on the column, so
+    # it replaces the single-column one.
+    for column in RANGE_COLUMNS:
+        op.create_index(f'ix_contratacoes_{column}_numero_controle_pncp', 'contratacoes', [column, 'numero_controle_pncp'], unique=False)
+        op.drop_index(op.f(f'ix_contratacoes_{column}'), table_name='contratacoes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in RANGE_COLUMNS:
+        op.create_index(op.f(f'ix_contratacoes_{column}'), 'contratacoes', [column], unique=False)
+        op.drop_index(f'ix_contratacoes_{column}_numero_controle_pncp', table_name='contratacoes')
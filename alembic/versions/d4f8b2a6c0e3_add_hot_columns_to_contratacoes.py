@@ -0,0 +1,68 @@
+"""Add hot columns to contratacoes
+
+Revision ID: d4f8b2a6c0e3
+Revises: a7c3e9f1b5d4
+Create Date: 2026-10-18 13:04:27.661820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8b2a6c0e3'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e9f1b5d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contratacoes', sa.Column('data_atualizacao_global', sa.TIMESTAMP(timezone=False), nullable=True))
+    op.add_column('contratacoes', sa.Column('ano_compra', sa.Integer(), nullable=True))
+    op.add_column('contratacoes', sa.Column('orgao_cnpj', sa.String(length=14), nullable=True))
+    op.add_column('contratacoes', sa.Column('data_publicacao_pncp', sa.TIMESTAMP(timezone=False), nullable=True))
+
+    # Backfill from meta; values the application would not parse stay NULL.
+    op.execute(
+        f"""
+        UPDATE contratacoes SET
+            data_atualizacao_global = CASE
+                WHEN meta->>'dataAtualizacaoGlobal' ~ '{TIMESTAMP_PATTERN}'
+                THEN (meta->>'dataAtualizacaoGlobal')::timestamp END,
+            ano_compra = CASE
+                WHEN meta->>'anoCompra' ~ '^\\d+$'
+                THEN (meta->>'anoCompra')::integer END,
+            orgao_cnpj = meta->'orgaoEntidade'->>'cnpj',
+            data_publicacao_pncp = CASE
+                WHEN meta->>'dataPublicacaoPncp' ~ '{TIMESTAMP_PATTERN}'
+                THEN (meta->>'dataPublicacaoPncp')::timestamp END
+        """
+    )
+
+    op.create_index(op.f('ix_contratacoes_data_atualizacao_global'), 'contratacoes', ['data_atualizacao_global'], unique=False)
+    op.create_index(op.f('ix_contratacoes_ano_compra'), 'contratacoes', ['ano_compra'], unique=False)
+    op.create_index(op.f('ix_contratacoes_orgao_cnpj'), 'contratacoes', ['orgao_cnpj'], unique=False)
+    op.create_index(op.f('ix_contratacoes_data_publicacao_pncp'), 'contratacoes', ['data_publicacao_pncp'], unique=False)
+    op.create_index('ix_contratacoes_numero_controle_pncp_version', 'contratacoes', ['numero_controle_pncp'], unique=False, postgresql_include=['data_atualizacao_global'])
+    op.create_index('ix_contratacoes_meta_gin', 'contratacoes', ['meta'], unique=False, postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+    op.create_index('ix_item_contratacoes_meta_gin', 'item_contratacoes', ['meta'], unique=False, postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_item_contratacoes_meta_gin', table_name='item_contratacoes', postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+    op.drop_index('ix_contratacoes_meta_gin', table_name='contratacoes', postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+    op.drop_index('ix_contratacoes_numero_controle_pncp_version', table_name='contratacoes', postgresql_include=['data_atualizacao_global'])
+    op.drop_index(op.f('ix_contratacoes_data_publicacao_pncp'), table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_orgao_cnpj'), table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_ano_compra'), table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_data_atualizacao_global'), table_name='contratacoes')
+    op.drop_column('contratacoes', 'data_publicacao_pncp')
+    op.drop_column('contratacoes', 'orgao_cnpj')
+    op.drop_column('contratacoes', 'ano_compra')
+    op.drop_column('contratacoes', 'data_atualizacao_global')
@@ -0,0 +1,152 @@
+"""Partition contratacoes and item_contratacoes by year
+
+Revision ID: e1a5c7d9f3b2
+Revises: d4f8b2a6c0e3
+Create Date: 2026-10-18 15:42:08.314596
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a5c7d9f3b2'
+down_revision: Union[str, Sequence[str], None] = 'd4f8b2a6c0e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('contratacoes', 'item_contratacoes')
+ANO_FROM_KEY = 'right(numero_controle_pncp, 4)::integer'
+
+
+def _drop_indexes() -> None:
+    op.drop_index('ix_item_contratacoes_meta_gin', table_name='item_contratacoes')
+    op.drop_index('ix_contratacoes_meta_gin', table_name='contratacoes')
+    op.drop_index('ix_contratacoes_numero_controle_pncp_version', table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_data_publicacao_pncp'), table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_orgao_cnpj'), table_name='contratacoes')
+    op.drop_index(op.f('ix_contratacoes_data_atualizacao_global'), table_name='contratacoes')
+
+
+def _create_indexes(partitioned: bool) -> None:
+    version_columns = ['numero_controle_pncp', 'ano_compra'] if partitioned else ['numero_controle_pncp']
+    op.create_index(op.f('ix_contratacoes_data_atualizacao_global'), 'contratacoes', ['data_atualizacao_global'], unique=False)
+    op.create_index(op.f('ix_contratacoes_orgao_cnpj'), 'contratacoes', ['orgao_cnpj'], unique=False)
+    op.create_index(op.f('ix_contratacoes_data_publicacao_pncp'), 'contratacoes', ['data_publicacao_pncp'], unique=False)
+    op.create_index('ix_contratacoes_numero_controle_pncp_version', 'contratacoes', version_columns, unique=False, postgresql_include=['data_atualizacao_global'])
+    op.create_index('ix_contratacoes_meta_gin', 'contratacoes', ['meta'], unique=False, postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+    op.create_index('ix_item_contratacoes_meta_gin', 'item_contratacoes', ['meta'], unique=False, postgresql_using='gin', postgresql_ops={'meta': 'jsonb_path_ops'})
+
+
+def _rename_to_old() -> None:
+    for table in reversed(TABLES):
+        op.rename_table(table, f'{table}_old')
+        op.execute(f'ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey')
+
+
+def _create_tables(partitioned: bool) -> None:
+    partition_by = {'postgresql_partition_by': 'RANGE (ano_compra)'} if partitioned else {}
+    contratacoes_pk = ['numero_controle_pncp', 'ano_compra'] if partitioned else ['numero_controle_pncp']
+    op.create_table('contratacoes',
+    sa.Column('numero_controle_pncp', sa.String(), nullable=False),
+    sa.Column('ano_compra', sa.Integer(), nullable=not partitioned),
+    sa.Column('meta', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('data_atualizacao_global', sa.TIMESTAMP(timezone=False), nullable=True),
+    sa.Column('orgao_cnpj', sa.String(length=14), nullable=True),
+    sa.Column('data_publicacao_pncp', sa.TIMESTAMP(timezone=False), nullable=True),
+    sa.PrimaryKeyConstraint(*contratacoes_pk),
+    **partition_by
+    )
+    if partitioned:
+        op.create_table('item_contratacoes',
+        sa.Column('numero_controle_pncp', sa.String(), nullable=False),
+        sa.Column('ano_compra', sa.Integer(), nullable=False),
+        sa.Column('numero_item', sa.Integer(), nullable=False),
+        sa.Column('meta', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('meta_hash', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['numero_controle_pncp', 'ano_compra'], ['contratacoes.numero_controle_pncp', 'contratacoes.ano_compra'], ),
+        sa.PrimaryKeyConstraint('numero_controle_pncp', 'ano_compra', 'numero_item'),
+        **partition_by
+        )
+    else:
+        op.create_table('item_contratacoes',
+        sa.Column('numero_controle_pncp', sa.String(), nullable=False),
+        sa.Column('numero_item', sa.Integer(), nullable=False),
+        sa.Column('meta', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('meta_hash', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['numero_controle_pncp'], ['contratacoes.numero_controle_pncp'], ),
+        sa.PrimaryKeyConstraint('numero_controle_pncp', 'numero_item')
+        )
+
+
+def _drop_old() -> None:
+    op.drop_table('item_contratacoes_old')
+    op.drop_table('contratacoes_old')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_indexes()
+    op.drop_index(op.f('ix_contratacoes_ano_compra'), table_name='contratacoes')
+    _rename_to_old()
+    _create_tables(partitioned=True)
+
+    # One partition per year with data, through next year; anything outside
+    # that range lands in the default partition until its year is created.
+    first_year = op.get_bind().execute(
+        sa.text(f'SELECT min({ANO_FROM_KEY}) FROM contratacoes_old')
+    ).scalar()
+    last_year = datetime.now().year + 1
+    for table in TABLES:
+        for year in range(first_year or last_year - 1, last_year + 1):
+            op.execute(f'CREATE TABLE {table}_y{year} PARTITION OF {table} FOR VALUES FROM ({year}) TO ({year + 1})')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(
+        f"""
+        INSERT INTO contratacoes
+            (numero_controle_pncp, ano_compra, meta, data_atualizacao_global, orgao_cnpj, data_publicacao_pncp)
+        SELECT numero_controle_pncp, {ANO_FROM_KEY}, meta, data_atualizacao_global, orgao_cnpj, data_publicacao_pncp
+        FROM contratacoes_old
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO item_contratacoes
+            (numero_controle_pncp, ano_compra, numero_item, meta, meta_hash)
+        SELECT numero_controle_pncp, {ANO_FROM_KEY}, numero_item, meta, meta_hash
+        FROM item_contratacoes_old
+        """
+    )
+    _drop_old()
+    _create_indexes(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_indexes()
+    _rename_to_old()
+    _create_tables(partitioned=False)
+    op.execute(
+        """
+        INSERT INTO contratacoes
+            (numero_controle_pncp, ano_compra, meta, data_atualizacao_global, orgao_cnpj, data_publicacao_pncp)
+        SELECT numero_controle_pncp, ano_compra, meta, data_atualizacao_global, orgao_cnpj, data_publicacao_pncp
+        FROM contratacoes_old
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO item_contratacoes (numero_controle_pncp, numero_item, meta, meta_hash)
+        SELECT numero_controle_pncp, numero_item, meta, meta_hash
+        FROM item_contratacoes_old
+        """
+    )
+    # Dropping the partitioned parents drops their partitions too.
+    _drop_old()
+    _create_indexes(partitioned=False)
+    op.create_index(op.f('ix_contratacoes_ano_compra'), 'contratacoes', ['ano_compra'], unique=False)
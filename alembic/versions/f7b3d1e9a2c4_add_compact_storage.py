@@ -0,0 +1,47 @@
+"""Add compact storage
+
+Revision ID: f7b3d1e9a2c4
+Revises: e1a5c7d9f3b2
+Create Date: 2026-10-18 17:21:45.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3d1e9a2c4'
+down_revision: Union[str, Sequence[str], None] = 'e1a5c7d9f3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('compression_dictionaries',
+    sa.Column('dict_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('dict_id')
+    )
+    op.add_column('contratacoes', sa.Column('meta_zstd', sa.LargeBinary(), nullable=True))
+    op.add_column('item_contratacoes', sa.Column('meta_zstd', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Compacted rows only keep a few fields in meta; dropping meta_zstd would
+    # lose the rest of their payload.
+    for table in ('contratacoes', 'item_contratacoes'):
+        compacted = op.get_bind().execute(
+            sa.text(f'SELECT 1 FROM {table} WHERE meta_zstd IS NOT NULL LIMIT 1')
+        ).first()
+        if compacted is not None:
+            raise RuntimeError(
+                f'{table} has compacted rows; run licitabot-compact-storage expand first'
+            )
+    op.drop_column('item_contratacoes', 'meta_zstd')
+    op.drop_column('contratacoes', 'meta_zstd')
+    op.drop_table('compression_dictionaries')
@@ -1,6 +1,8 @@
+from typing import Any, Dict, List, Literal, Optional
+
 from pydantic import BaseModel, ConfigDict, field_validator
 
-from licitabot.domain.value_objects import YearMonthDay
+from licitabot.domain.value_objects import CodigoModalidadeContratacao, YearMonthDay
 
 
 class RawContratacaoIngestionParamsDTO(BaseModel):
@@ -8,6 +10,9 @@ class RawContratacaoIngestionParamsDTO(BaseModel):
 
     dataInicial: YearMonthDay
     dataFinal: YearMonthDay
+    codigoModalidadeContratacao: int = CodigoModalidadeContratacao.PREGAO_ELETRONICO
+    writeMode: Literal["upsert", "copy"] = "upsert"
+    resumeExecutionId: Optional[str] = None
 
     @field_validator("dataInicial", "dataFinal", mode="before")
     @classmethod
@@ -16,6 +21,53 @@ class RawContratacaoIngestionParamsDTO(BaseModel):
             return YearMonthDay(v)
         return v
 
+    @field_validator("codigoModalidadeContratacao", mode="after")
+    @classmethod
+    def validate_codigo_modalidade_contratacao(cls, v):
+        return CodigoModalidadeContratacao(v)
+
 
 class RawContratacaoIngestionResultDTO(BaseModel):
     n_raw_contratacoes_processed: int
+    n_raw_contratacoes_saved: int = 0
+    n_raw_contratacoes_inserted: int = 0
+    n_raw_contratacoes_updated: int = 0
+    n_raw_contratacoes_unchanged: int = 0
+    n_pages_committed: int = 0
+    n_pages_resumed: int = 0
+    n_items_inserted: int = 0
+    n_items_updated: int = 0
+    n_items_deleted: int = 0
+    n_items_fetches_skipped: int = 0
+    limiters: Dict[str, Any] = {}
+
+
+class RawContratacaoMultiModalidadeIngestionParamsDTO(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    dataInicial: YearMonthDay
+    dataFinal: YearMonthDay
+    codigosModalidadeContratacao: List[int]
+    writeMode: Literal["upsert", "copy"] = "upsert"
+
+    @field_validator("dataInicial", "dataFinal", mode="before")
+    @classmethod
+    def validate_year_month_day(cls, v):
+        if isinstance(v, str):
+            return YearMonthDay(v)
+        return v
+
+    @field_validator("codigosModalidadeContratacao", mode="after")
+    @classmethod
+    def validate_codigos_modalidade_contratacao(cls, v):
+        if not v:
+            raise ValueError("codigosModalidadeContratacao must not be empty")
+        return [CodigoModalidadeContratacao(codigo) for codigo in dict.fromkeys(v)]
+
+
+class RawContratacaoMultiModalidadeIngestionResultDTO(BaseModel):
+    n_modalidades: int
+    n_raw_contratacoes_processed: int = 0
+    n_raw_contratacoes_saved: int = 0
+    results: Dict[str, RawContratacaoIngestionResultDTO] = {}
+    errors: Dict[str, str] = {}
@@ -1,24 +1,75 @@
-from typing import Generator, Optional, Protocol
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Protocol
+from uuid import UUID
 
-from licitabot.domain.entities import RawContratacao
-from licitabot.domain.value_objects import NumeroControlePNCP, YearMonthDay
+from licitabot.domain.entities import RawContratacao, RawContratacaoPage
+from licitabot.domain.value_objects import (
+    CodigoModalidadeContratacao,
+    NumeroControlePNCP,
+    YearMonthDay,
+)
 
 
 class RawContratacaoRepositoryInterface(Protocol):
+    item_counts: Dict[str, int]
+    contratacao_counts: Dict[str, int]
+
     async def get(
         self, numero_controle_pncp: NumeroControlePNCP
     ) -> Optional[RawContratacao]: ...
+    async def get_updated_dates(
+        self, numeros_controle_pncp: list[NumeroControlePNCP]
+    ) -> Dict[NumeroControlePNCP, Optional[str]]: ...
     async def save(self, entity: RawContratacao, force: bool = False) -> None: ...
+    async def save_many(
+        self, entities: list[RawContratacao], force: bool = False
+    ) -> list[NumeroControlePNCP]: ...
+    async def copy_many(
+        self, entities: list[RawContratacao], force: bool = False
+    ) -> list[NumeroControlePNCP]: ...
     async def delete(self, numero_controle_pncp: NumeroControlePNCP) -> None: ...
     async def commit(self) -> None: ...
     async def flush(self) -> None: ...
     async def rollback(self) -> None: ...
+    def expunge_all(self) -> None: ...
+
+
+class ReadCacheInterface(Protocol):
+    def get(self, key: Hashable) -> Optional[Any]: ...
+    def set(self, key: Hashable, value: Any, group: Hashable) -> None: ...
+    def invalidate(self, group: Hashable) -> None: ...
+    def snapshot(self) -> dict: ...
+
+
+class IngestionCheckpointRepositoryInterface(Protocol):
+    async def get_completed_pages(
+        self,
+        execution_id: UUID,
+        data_inicial: YearMonthDay,
+        data_final: YearMonthDay,
+        codigo_modalidade_contratacao: CodigoModalidadeContratacao,
+    ) -> set[int]: ...
+    async def add_completed_pages(
+        self,
+        execution_id: UUID,
+        data_inicial: YearMonthDay,
+        data_final: YearMonthDay,
+        codigo_modalidade_contratacao: CodigoModalidadeContratacao,
+        paginas: list[int],
+    ) -> None: ...
 
 
 class RawContratacaoGatewayInterface(Protocol):
-    async def fetch_updated_contratacoes(
-        self, dataInicial: YearMonthDay, dataFinal: YearMonthDay
-    ) -> Generator[RawContratacao, None, None]: ...
+    codigo_modalidade_contratacao: CodigoModalidadeContratacao
+    n_items_fetches_skipped: int
+
+    async def fetch_updated_contratacoes_pages(
+        self,
+        dataInicial: YearMonthDay,
+        dataFinal: YearMonthDay,
+        sink: Callable[[RawContratacaoPage], Awaitable[None]],
+        completed_paginas: frozenset[int] = frozenset(),
+    ) -> None: ...
     async def fetch_number_of_entries(
         self, dataInicial: YearMonthDay, dataFinal: YearMonthDay
     ) -> int: ...
+    def get_limiter_snapshots(self) -> dict: ...
@@ -0,0 +1,54 @@
+import asyncio
+from collections import deque
+from typing import Optional
+
+from licitabot.domain.entities import RawContratacaoPage
+
+
+class BoundedPageQueue:
+
+    def __init__(self, max_pages: int, max_bytes: Optional[int] = None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.n_pages = 0
+        self.n_bytes = 0
+        self._pages: deque[RawContratacaoPage] = deque()
+        self._closed = False
+        self._condition = asyncio.Condition()
+
+    def _has_room(self, page: RawContratacaoPage) -> bool:
+        if self.n_pages == 0:
+            # A single page larger than the byte budget must still get through.
+            return True
+        if self.n_pages >= self.max_pages:
+            return False
+        if self.max_bytes is not None:
+            return self.n_bytes + page.n_bytes <= self.max_bytes
+        return True
+
+    async def put(self, page: RawContratacaoPage) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._has_room(page))
+            self.n_pages += 1
+            self.n_bytes += page.n_bytes
+            self._pages.append(page)
+            self._condition.notify_all()
+
+    async def close(self) -> None:
+        async with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    async def get(self) -> Optional[RawContratacaoPage]:
+        # Returns None to every consumer once the queue is closed and drained.
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._pages or self._closed)
+            if not self._pages:
+                return None
+            return self._pages.popleft()
+
+    async def release(self, page: RawContratacaoPage) -> None:
+        async with self._condition:
+            self.n_pages -= 1
+            self.n_bytes -= page.n_bytes
+            self._condition.notify_all()
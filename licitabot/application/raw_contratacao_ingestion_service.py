@@ -1,25 +1,144 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Sequence
+from uuid import UUID
+
 from licitabot.application.dtos import (
     RawContratacaoIngestionParamsDTO,
     RawContratacaoIngestionResultDTO,
 )
 from licitabot.application.interfaces import (
+    IngestionCheckpointRepositoryInterface,
     RawContratacaoGatewayInterface,
     RawContratacaoRepositoryInterface,
 )
-from licitabot.infrastructure.execution_tracker.tracker import track
-import logging
+from licitabot.application.page_queue import BoundedPageQueue
+from licitabot.domain.entities import RawContratacao, RawContratacaoPage
+from licitabot.domain.value_objects import NumeroControlePNCP
+from licitabot.infrastructure.execution_tracker.tracker import (
+    current_execution_id,
+    track,
+)
 
 logger = logging.getLogger("licitabot")
 
+SaveMany = Callable[[list[RawContratacao]], Awaitable[list[NumeroControlePNCP]]]
+Writer = tuple[
+    RawContratacaoRepositoryInterface, IngestionCheckpointRepositoryInterface
+]
+
+
+def leaf_exceptions(error: BaseException) -> list[BaseException]:
+    if isinstance(error, BaseExceptionGroup):
+        return [leaf for inner in error.exceptions for leaf in leaf_exceptions(inner)]
+    return [error]
+
 
 class RawContratacaoIngestionService:
     def __init__(
         self,
         raw_contratacao_gateway: RawContratacaoGatewayInterface,
         raw_contratacao_repository: RawContratacaoRepositoryInterface,
+        ingestion_checkpoint_repository: IngestionCheckpointRepositoryInterface,
+        max_buffered_pages: int = 10,
+        max_buffered_bytes: Optional[int] = None,
+        commit_every_pages: int = 1,
+        commit_every_entities: Optional[int] = None,
+        writer_repositories: Sequence[Writer] = (),
     ):
         self.raw_contratacao_gateway = raw_contratacao_gateway
         self.raw_contratacao_repository = raw_contratacao_repository
+        self.ingestion_checkpoint_repository = ingestion_checkpoint_repository
+        self.max_buffered_pages = max_buffered_pages
+        self.max_buffered_bytes = max_buffered_bytes
+        self.commit_every_pages = commit_every_pages
+        self.commit_every_entities = commit_every_entities
+        # Each writer persists through its own session, so batches from
+        # different writers commit concurrently.
+        self.writers: list[Writer] = [
+            (raw_contratacao_repository, ingestion_checkpoint_repository),
+            *writer_repositories,
+        ]
+        self.n_processed = 0
+        self.n_saved = 0
+        self.committed_pages: set[int] = set()
+        self.checkpoint_execution_id: Optional[UUID] = None
+
+    async def _fetch(
+        self,
+        params: RawContratacaoIngestionParamsDTO,
+        page_queue: BoundedPageQueue,
+        completed_paginas: frozenset[int],
+    ) -> None:
+        await self.raw_contratacao_gateway.fetch_updated_contratacoes_pages(
+            params.dataInicial, params.dataFinal, page_queue.put, completed_paginas
+        )
+        await page_queue.close()
+
+    async def _commit_batch(
+        self,
+        params: RawContratacaoIngestionParamsDTO,
+        writer: Writer,
+        save_many: SaveMany,
+        pages: list[RawContratacaoPage],
+        n_entries_to_process: int,
+    ) -> None:
+        raw_contratacao_repository, ingestion_checkpoint_repository = writer
+        contratacoes = [
+            raw_contratacao for page in pages for raw_contratacao in page.contratacoes
+        ]
+        saved = await save_many(contratacoes)
+        await ingestion_checkpoint_repository.add_completed_pages(
+            self.checkpoint_execution_id,
+            params.dataInicial,
+            params.dataFinal,
+            self.raw_contratacao_gateway.codigo_modalidade_contratacao,
+            [page.pagina for page in pages],
+        )
+        await raw_contratacao_repository.commit()
+        raw_contratacao_repository.expunge_all()
+        self.n_processed += len(contratacoes)
+        self.n_saved += len(saved)
+        self.committed_pages.update(page.pagina for page in pages)
+        logger.info(
+            f"[*] Committed pages {sorted(page.pagina for page in pages)}: "
+            f"{self.n_processed}/{n_entries_to_process} raw contratacoes, "
+            f"{len(saved)} written"
+        )
+
+    async def _persist(
+        self,
+        params: RawContratacaoIngestionParamsDTO,
+        page_queue: BoundedPageQueue,
+        n_entries_to_process: int,
+        writer: Writer,
+    ) -> None:
+        raw_contratacao_repository, _ = writer
+        if params.writeMode == "copy":
+            save_many = raw_contratacao_repository.copy_many
+        else:
+            save_many = raw_contratacao_repository.save_many
+        pending_pages: list[RawContratacaoPage] = []
+        n_pending_entities = 0
+        while (page := await page_queue.get()) is not None:
+            # The pending batch is bounded by the commit thresholds, so the
+            # page can leave the fetch budget as soon as it is taken.
+            await page_queue.release(page)
+            pending_pages.append(page)
+            n_pending_entities += len(page.contratacoes)
+            if len(pending_pages) >= self.commit_every_pages or (
+                self.commit_every_entities is not None
+                and n_pending_entities >= self.commit_every_entities
+            ):
+                await self._commit_batch(
+                    params, writer, save_many, pending_pages, n_entries_to_process
+                )
+                pending_pages = []
+                n_pending_entities = 0
+        if pending_pages:
+            await self._commit_batch(
+                params, writer, save_many, pending_pages, n_entries_to_process
+            )
 
     @track("raw_contratacao_ingestion")
     async def run(
@@ -34,26 +153,93 @@ class RawContratacaoIngestionService:
 
         logger.info(f"[*] Number of entries to process: {n_entries_to_process}")
 
+        page_queue = BoundedPageQueue(self.max_buffered_pages, self.max_buffered_bytes)
+        self.n_processed = 0
+        self.n_saved = 0
+        self.committed_pages = set()
+
+        completed_paginas = frozenset()
+        if params.resumeExecutionId:
+            # Checkpoints stay under the execution that started the window, so
+            # a resumed run can itself be resumed.
+            self.checkpoint_execution_id = UUID(params.resumeExecutionId)
+            completed_paginas = frozenset(
+                await self.ingestion_checkpoint_repository.get_completed_pages(
+                    self.checkpoint_execution_id,
+                    params.dataInicial,
+                    params.dataFinal,
+                    self.raw_contratacao_gateway.codigo_modalidade_contratacao,
+                )
+            )
+            logger.info(
+                f"[*] Resuming execution {params.resumeExecutionId}: "
+                f"{len(completed_paginas)} pages already completed"
+            )
+        else:
+            self.checkpoint_execution_id = current_execution_id.get()
+
         try:
-            i = 0
-            async for (
-                raw_contratacao
-            ) in self.raw_contratacao_gateway.fetch_updated_contratacoes(
-                params.dataInicial, params.dataFinal
-            ):
-                i += 1
-                logger.info(
-                    f"[*] Processing raw contratacao {i}/{n_entries_to_process}"
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._fetch(params, page_queue, completed_paginas))
+                for writer in self.writers:
+                    tg.create_task(
+                        self._persist(params, page_queue, n_entries_to_process, writer)
+                    )
+            n_items_fetches_skipped = (
+                self.raw_contratacao_gateway.n_items_fetches_skipped
+            )
+            logger.info(
+                f"[*] Skipped item fetches for {n_items_fetches_skipped} "
+                f"unchanged raw contratacoes"
+            )
+        except* Exception as eg:
+            # Fetch failures arrive nested in the gateway's and the page's
+            # task groups; the leaves are the actual causes.
+            errors = leaf_exceptions(eg)
+            for error in errors:
+                logger.error(
+                    f"[!] Error processing raw contratacoes after "
+                    f"{len(self.committed_pages)} committed pages: {error}"
                 )
-                await self.raw_contratacao_repository.save(raw_contratacao)
-                if i % 100 == 0:
-                    await self.raw_contratacao_repository.flush()
-            await self.raw_contratacao_repository.commit()
-        except Exception as e:
-            logger.error(f"[!] Error processing raw contratacao {i}: {e}")
-            await self.raw_contratacao_repository.rollback()
-            raise e
+            for raw_contratacao_repository, _ in self.writers:
+                await raw_contratacao_repository.rollback()
+            raise errors[0]
+
+        item_counts = {
+            key: sum(
+                raw_contratacao_repository.item_counts[key]
+                for raw_contratacao_repository, _ in self.writers
+            )
+            for key in ("inserted", "updated", "deleted")
+        }
+        contratacao_counts = {
+            key: sum(
+                raw_contratacao_repository.contratacao_counts[key]
+                for raw_contratacao_repository, _ in self.writers
+            )
+            for key in ("inserted", "updated", "unchanged")
+        }
+        logger.info(
+            f"[*] Contratacoes inserted: {contratacao_counts['inserted']}, "
+            f"updated: {contratacao_counts['updated']}, "
+            f"unchanged: {contratacao_counts['unchanged']}"
+        )
+        logger.info(
+            f"[*] Items inserted: {item_counts['inserted']}, "
+            f"updated: {item_counts['updated']}, deleted: {item_counts['deleted']}"
+        )
 
         return RawContratacaoIngestionResultDTO(
             n_raw_contratacoes_processed=n_entries_to_process,
+            n_raw_contratacoes_saved=self.n_saved,
+            n_raw_contratacoes_inserted=contratacao_counts["inserted"],
+            n_raw_contratacoes_updated=contratacao_counts["updated"],
+            n_raw_contratacoes_unchanged=contratacao_counts["unchanged"],
+            n_pages_committed=len(self.committed_pages),
+            n_pages_resumed=len(completed_paginas),
+            n_items_inserted=item_counts["inserted"],
+            n_items_updated=item_counts["updated"],
+            n_items_deleted=item_counts["deleted"],
+            n_items_fetches_skipped=n_items_fetches_skipped,
+            limiters=self.raw_contratacao_gateway.get_limiter_snapshots(),
         )
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from licitabot.application.dtos import (
+    RawContratacaoIngestionParamsDTO,
+    RawContratacaoMultiModalidadeIngestionParamsDTO,
+    RawContratacaoMultiModalidadeIngestionResultDTO,
+)
+from licitabot.application.raw_contratacao_ingestion_service import (
+    RawContratacaoIngestionService,
+)
+from licitabot.domain.value_objects import CodigoModalidadeContratacao
+from licitabot.infrastructure.execution_tracker.tracker import track_group
+
+logger = logging.getLogger("licitabot")
+
+
+class RawContratacaoMultiModalidadeIngestionService:
+    def __init__(
+        self,
+        raw_contratacao_ingestion_services: dict[
+            CodigoModalidadeContratacao, RawContratacaoIngestionService
+        ],
+    ):
+        self.raw_contratacao_ingestion_services = raw_contratacao_ingestion_services
+
+    async def run(
+        self, params: RawContratacaoMultiModalidadeIngestionParamsDTO
+    ) -> RawContratacaoMultiModalidadeIngestionResultDTO:
+
+        codigos = params.codigosModalidadeContratacao
+        async with track_group(
+            "raw_contratacao_multi_modalidade_ingestion",
+            n_shards=len(codigos),
+            meta={"params": params.model_dump()},
+        ):
+            # Each modalidade runs as its own tracked execution, so one failing
+            # neither cancels the others nor loses their committed pages.
+            outcomes = await asyncio.gather(
+                *(
+                    self.raw_contratacao_ingestion_services[codigo].run(
+                        RawContratacaoIngestionParamsDTO(
+                            dataInicial=params.dataInicial,
+                            dataFinal=params.dataFinal,
+                            codigoModalidadeContratacao=codigo,
+                            writeMode=params.writeMode,
+                        )
+                    )
+                    for codigo in codigos
+                ),
+                return_exceptions=True,
+            )
+
+            result = RawContratacaoMultiModalidadeIngestionResultDTO(
+                n_modalidades=len(codigos)
+            )
+            for codigo, outcome in zip(codigos, outcomes):
+                if isinstance(outcome, BaseException):
+                    result.errors[str(codigo)] = str(outcome)
+                    logger.error(f"[!] Modalidade {codigo} failed: {outcome}")
+                    continue
+                result.results[str(codigo)] = outcome
+                result.n_raw_contratacoes_processed += (
+                    outcome.n_raw_contratacoes_processed
+                )
+                result.n_raw_contratacoes_saved += outcome.n_raw_contratacoes_saved
+                logger.info(
+                    f"[*] Modalidade {codigo}: "
+                    f"{outcome.n_raw_contratacoes_processed} processed, "
+                    f"{outcome.n_raw_contratacoes_saved} saved, "
+                    f"{outcome.n_pages_committed} pages committed"
+                )
+
+            if result.errors:
+                raise RuntimeError(
+                    f"Ingestion failed for modalidades {list(result.errors)}: "
+                    f"{result.errors}"
+                )
+
+        return result
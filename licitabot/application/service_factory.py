@@ -1,19 +1,48 @@
+from typing import Any, Dict, Optional, Sequence
+
 from licitabot.application.raw_contratacao_ingestion_service import (
     RawContratacaoIngestionService,
 )
-from licitabot.domain.value_objects import CodigoModalidadeContratacao
+from licitabot.application.raw_contratacao_multi_modalidade_ingestion_service import (
+    RawContratacaoMultiModalidadeIngestionService,
+)
+from licitabot.domain.value_objects import (
+    CodigoModalidadeContratacao,
+    NumeroControlePNCP,
+)
+from licitabot.infrastructure.adapters.decode_pool import decode_pool
+from licitabot.infrastructure.adapters.fair_share_semaphore import (
+    FairShareSemaphore,
+)
+from licitabot.infrastructure.adapters.http_cache import get_http_cache
 from licitabot.infrastructure.adapters.pncp_api_consulta_adapter import (
     PNCPApiConsultaAdapter,
 )
 from licitabot.infrastructure.adapters.pncp_api_pncp_adapter import (
     PNCPApiPncpAdapter,
 )
+from licitabot.infrastructure.database.session import async_session_factory
 from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
     RawContratacaoGateway,
 )
+from licitabot.infrastructure.repositories.ingestion_checkpoint.repository import (
+    IngestionCheckpointRepository,
+)
 from licitabot.infrastructure.repositories.raw_contratacao.repository import (
     RawContratacaoRepository,
 )
+from licitabot.settings import settings
+
+
+async def get_stored_updated_dates(
+    numeros_controle_pncp: list[NumeroControlePNCP],
+) -> Dict[NumeroControlePNCP, Optional[str]]:
+    # Page workers run concurrently with the writer, so each lookup gets its
+    # own short-lived session instead of sharing the ingestion session.
+    async with async_session_factory() as session:
+        return await RawContratacaoRepository(session).get_updated_dates(
+            numeros_controle_pncp
+        )
 
 
 class ServiceFactory:
@@ -22,19 +51,77 @@ class ServiceFactory:
     def create_raw_contratacao_ingestion_service(
         session,
         codigo_modalidade_contratacao: CodigoModalidadeContratacao = CodigoModalidadeContratacao.PREGAO_ELETRONICO,
+        use_http_cache: Optional[bool] = None,
+        request_budget: Optional[FairShareSemaphore] = None,
+        writer_sessions: Sequence[Any] = (),
     ) -> RawContratacaoIngestionService:
 
-        pncp_api_consulta_adapter = PNCPApiConsultaAdapter()
-        pncp_api_pncp_adapter = PNCPApiPncpAdapter()
+        http_cache = get_http_cache(use_http_cache)
+        pncp_api_consulta_adapter = PNCPApiConsultaAdapter(
+            cache=http_cache,
+            request_budget=request_budget,
+            budget_tenant=codigo_modalidade_contratacao,
+        )
+        pncp_api_pncp_adapter = PNCPApiPncpAdapter(
+            cache=http_cache,
+            request_budget=request_budget,
+            budget_tenant=codigo_modalidade_contratacao,
+        )
 
         raw_contratacao_gateway = RawContratacaoGateway(
             pncp_api_consulta_adapter=pncp_api_consulta_adapter,
             pncp_api_pncp_adapter=pncp_api_pncp_adapter,
             codigo_modalidade_contratacao=codigo_modalidade_contratacao,
+            n_page_workers=settings.ingestion_services.n_page_workers,
+            n_item_workers=settings.ingestion_services.n_item_workers,
+            stored_versions_lookup=get_stored_updated_dates,
+            decode_executor=decode_pool.get(),
         )
 
         raw_contratacao_repository = RawContratacaoRepository(session)
+        ingestion_checkpoint_repository = IngestionCheckpointRepository(session)
 
         return RawContratacaoIngestionService(
-            raw_contratacao_gateway, raw_contratacao_repository
+            raw_contratacao_gateway,
+            raw_contratacao_repository,
+            ingestion_checkpoint_repository,
+            max_buffered_pages=settings.ingestion_services.max_buffered_pages,
+            max_buffered_bytes=settings.ingestion_services.max_buffered_bytes,
+            commit_every_pages=settings.ingestion_services.commit_every_pages,
+            commit_every_entities=settings.ingestion_services.commit_every_entities,
+            writer_repositories=[
+                (
+                    RawContratacaoRepository(writer_session),
+                    IngestionCheckpointRepository(writer_session),
+                )
+                for writer_session in writer_sessions
+            ],
+        )
+
+    @staticmethod
+    def create_raw_contratacao_multi_modalidade_ingestion_service(
+        sessions: Dict[CodigoModalidadeContratacao, Any],
+        use_http_cache: Optional[bool] = None,
+    ) -> RawContratacaoMultiModalidadeIngestionService:
+
+        # All modalidades draw from the budget a single run would use, each
+        # getting a fair share of it while others are waiting.
+        request_budget = FairShareSemaphore(
+            "pncp_requests",
+            settings.ingestion_services.n_page_workers
+            + settings.ingestion_services.n_item_workers,
+        )
+
+        return RawContratacaoMultiModalidadeIngestionService(
+            {
+                codigo_modalidade_contratacao: (
+                    ServiceFactory.create_raw_contratacao_ingestion_service(
+                        session,
+                        codigo_modalidade_contratacao,
+                        use_http_cache=use_http_cache,
+                        request_budget=request_budget,
+                    )
+                )
+                for codigo_modalidade_contratacao, session in sessions.items()
+            }
         )
@@ -1,7 +1,11 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from licitabot.domain.value_objects import NumeroControlePNCP
+from licitabot.domain.value_objects import (
+    CodigoModalidadeContratacao,
+    ContentHash,
+    NumeroControlePNCP,
+)
 
 
 @dataclass
@@ -15,6 +19,29 @@ class RawItemContratacao:
     meta: Dict[str, Any] = field(
         metadata={"description": "Additional metadata for the contract item"}
     )
+    content_hash: Optional[ContentHash] = field(
+        default=None,
+        metadata={
+            "description": "Hash of the canonical meta, or of meta_json when "
+            "set; computed on creation"
+        },
+    )
+    meta_json: Optional[bytes] = field(
+        default=None,
+        metadata={
+            "description": "Original JSON document; when set, meta only holds "
+            "its key fields"
+        },
+    )
+
+    def __post_init__(self):
+        # Passthrough hashes the original bytes: decoding them only to hash
+        # would cost what passthrough saves. Its hashes differ from the
+        # decoded path's, so switching decoder rewrites each row once.
+        if self.content_hash is None and self.meta_json is not None:
+            self.content_hash = ContentHash.from_bytes(self.meta_json)
+        elif self.content_hash is None:
+            self.content_hash = ContentHash.from_meta(self.meta)
 
 
 @dataclass
@@ -28,6 +55,43 @@ class RawContratacao:
     items: list[RawItemContratacao] = field(
         metadata={"description": "List of items in the contract"}
     )
+    content_hash: Optional[ContentHash] = field(
+        default=None,
+        metadata={
+            "description": "Hash of the canonical meta and items, or of "
+            "meta_json when set"
+        },
+    )
+    meta_json: Optional[bytes] = field(
+        default=None,
+        metadata={
+            "description": "Original JSON document, items included; when set, "
+            "meta only holds its key fields"
+        },
+    )
+
+    def __post_init__(self):
+        if self.content_hash is None and self.meta_json is not None:
+            self.content_hash = ContentHash.from_bytes(self.meta_json)
+        elif self.content_hash is None:
+            self.content_hash = ContentHash.from_contratacao(
+                self.meta, (item.content_hash for item in self.items)
+            )
+
+
+@dataclass
+class RawContratacaoPage:
+    codigo_modalidade_contratacao: CodigoModalidadeContratacao = field(
+        metadata={"description": "Procurement modality the page was queried for"}
+    )
+    pagina: int = field(metadata={"description": "Page number in the PNCP results"})
+    contratacoes: list[RawContratacao] = field(
+        metadata={"description": "Raw contracts in the page, with their items"}
+    )
+    n_bytes: int = field(
+        default=0,
+        metadata={"description": "Size of the PNCP responses that made up the page"},
+    )
 
 
 @dataclass
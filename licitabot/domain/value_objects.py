@@ -1,5 +1,8 @@
+import hashlib
+import json
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Any, Iterable
 
 
 class NumeroPagina(int):
@@ -67,6 +70,13 @@ class CodigoModalidadeContratacao(int):
             raise ValueError(f"Invalid codigoModalidadeContratacao: {value}")
         return int.__new__(cls, value)
 
+    @classmethod
+    def all(cls) -> list["CodigoModalidadeContratacao"]:
+        return [
+            cls(value)
+            for value in range(cls.LEILAO_ELETRONICO, cls.LEILAO_PRESENCIAL + 1)
+        ]
+
 
 class NumeroControlePNCP(str):
     PATTERN = re.compile(r"^\d{14}-\d{1}-\d{6}/\d{4}$")
@@ -76,6 +86,10 @@ class NumeroControlePNCP(str):
             raise ValueError(f"Invalid NumeroControlePNCP format: {value}")
         return str.__new__(cls, value)
 
+    @property
+    def ano(self) -> int:
+        return int(self[-4:])
+
 
 class CNPJ(str):
     PATTERN = re.compile(r"^\d{14}$")
@@ -100,6 +114,35 @@ class Sequencial(int):
         return int.__new__(cls, value)
 
 
+class ContentHash(str):
+    PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+    def __new__(cls, value: str):
+        if not cls.PATTERN.match(value):
+            raise ValueError(f"Invalid ContentHash: {value}")
+        return str.__new__(cls, value)
+
+    @classmethod
+    def from_meta(cls, meta: Any) -> "ContentHash":
+        canonical = json.dumps(
+            meta, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return cls.from_bytes(canonical.encode())
+
+    @classmethod
+    def from_contratacao(
+        cls, meta: dict[str, Any], item_hashes: Iterable[str]
+    ) -> "ContentHash":
+        # Items enter through their own hashes, so they are serialized once.
+        meta = {key: value for key, value in meta.items() if key != "items"}
+        meta["items"] = sorted(item_hashes)
+        return cls.from_meta(meta)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ContentHash":
+        return cls(hashlib.sha256(data).hexdigest())
+
+
 class IngestionWindow:
     def __init__(self, data_inicial: YearMonthDay, data_final: YearMonthDay):
         self._validate_ingestion_window(data_inicial, data_final)
@@ -118,3 +161,12 @@ class IngestionWindow:
     ):
         if data_inicial > data_final:
             raise ValueError(f"Invalid ingestion window: {data_inicial} > {data_final}")
+
+    def split_by_day(self) -> list["IngestionWindow"]:
+        day = datetime.strptime(self.data_inicial, "%Y%m%d")
+        last_day = datetime.strptime(self.data_final, "%Y%m%d")
+        windows = []
+        while day <= last_day:
+            windows.append(IngestionWindow.from_datetime(day, day))
+            day += timedelta(days=1)
+        return windows
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+from httpx import Response, TimeoutException
+
+logger = logging.getLogger("licitabot")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class LimiterDecision:
+    at: str
+    action: str
+    reason: str
+    window: float
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveConcurrencyLimiter:
+
+    def __init__(
+        self,
+        name: str,
+        initial_window: float = 10,
+        min_window: float = 1,
+        max_window: float = 50,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_threshold: float = 10.0,
+        max_error_rate: float = 0.05,
+        default_retry_after: float = 5.0,
+        max_decisions: int = 100,
+    ):
+        self.name = name
+        self.window = float(initial_window)
+        self.min_window = float(min_window)
+        self.max_window = float(max_window)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.max_error_rate = max_error_rate
+        self.default_retry_after = default_retry_after
+        self.decisions: deque[LimiterDecision] = deque(maxlen=max_decisions)
+
+        self.in_flight = 0
+        self.n_successes = 0
+        self.n_failures = 0
+        self.latency_ewma: Optional[float] = None
+        self.error_rate_ewma = 0.0
+        self._ewma_alpha = 0.1
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    def _record(self, action: str, reason: str) -> None:
+        decision = LimiterDecision(
+            at=datetime.now(timezone.utc).isoformat(),
+            action=action,
+            reason=reason,
+            window=round(self.window, 2),
+        )
+        self.decisions.append(decision)
+        logger.info(
+            f"[*] Limiter {self.name}: {action} ({reason}), window={decision.window}"
+        )
+
+    def _update_ewma(self, latency: Optional[float], failed: bool) -> None:
+        alpha = self._ewma_alpha
+        self.error_rate_ewma = (
+            alpha * float(failed) + (1 - alpha) * self.error_rate_ewma
+        )
+        if latency is not None:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma = alpha * latency + (1 - alpha) * self.latency_ewma
+
+    async def _acquire(self) -> None:
+        async with self._condition:
+            while True:
+                paused_for = self._paused_until - time.monotonic()
+                if paused_for > 0:
+                    self._condition.release()
+                    try:
+                        await asyncio.sleep(paused_for)
+                    finally:
+                        await self._condition.acquire()
+                    continue
+                if self.in_flight < max(int(self.window), 1):
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        self.n_successes += 1
+        self._update_ewma(latency, failed=False)
+        if self.latency_ewma > self.latency_threshold:
+            return
+        if self.error_rate_ewma > self.max_error_rate:
+            return
+        if self.window >= self.max_window:
+            return
+        previous = int(self.window)
+        self.window = min(
+            self.window + self.increase_step / self.window, self.max_window
+        )
+        if int(self.window) > previous:
+            self._record("increase", f"healthy latency {self.latency_ewma:.2f}s")
+
+    def on_failure(self, reason: str, retry_after: Optional[float] = None) -> None:
+        self.n_failures += 1
+        self._update_ewma(None, failed=True)
+        now = time.monotonic()
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._record("pause", f"{reason}, retry after {retry_after:.1f}s")
+        # Responses that were already in flight when the window was cut all
+        # carry the same signal, so decrease at most once per latency period.
+        decrease_interval = self.latency_ewma or 1.0
+        if now - self._last_decrease < decrease_interval:
+            return
+        self._last_decrease = now
+        self.window = max(self.window * self.decrease_factor, self.min_window)
+        self._record("decrease", reason)
+
+    async def request(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        await self._acquire()
+        try:
+            started_at = time.monotonic()
+            try:
+                response = await send()
+            except TimeoutException:
+                self.on_failure("timeout")
+                raise
+            latency = time.monotonic() - started_at
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429 and retry_after is None:
+                    retry_after = self.default_retry_after
+                self.on_failure(f"status {response.status_code}", retry_after)
+            else:
+                self.on_success(latency)
+            return response
+        finally:
+            await self._release()
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 2),
+            "n_successes": self.n_successes,
+            "n_failures": self.n_failures,
+            "latency_ewma": self.latency_ewma,
+            "error_rate_ewma": round(self.error_rate_ewma, 4),
+            "decisions": [asdict(decision) for decision in self.decisions],
+        }
@@ -0,0 +1,46 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from licitabot.settings import PNCPDecodeSettings, settings
+
+logger = logging.getLogger("licitabot")
+
+
+class DecodePool:
+
+    def __init__(self, decode_settings: PNCPDecodeSettings):
+        self.decode_settings = decode_settings
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> Optional[ProcessPoolExecutor]:
+        if self.decode_settings.n_process_workers <= 0:
+            return None
+        if self._executor is None:
+            logger.info(
+                f"[*] Starting decode pool with "
+                f"{self.decode_settings.n_process_workers} processes"
+            )
+            # forkserver keeps workers from inheriting the event loop, open
+            # sockets and threads of the consumer.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.decode_settings.n_process_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info("[*] Shutting down decode pool")
+            executor.shutdown(cancel_futures=True)
+
+    async def __aenter__(self) -> "DecodePool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+decode_pool = DecodePool(settings.pncp_decode)
@@ -1,6 +1,13 @@
 from typing import Any, Dict, List
 from typing import Optional, Literal
-from pydantic import BaseModel, RootModel, conint, ConfigDict, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    PrivateAttr,
+    RootModel,
+    conint,
+    field_validator,
+)
 
 from licitabot.domain.value_objects import (
     CNPJ,
@@ -65,6 +72,8 @@ class PNCPUpdatedContratacoesResultDTO(BaseModel):
     paginasRestantes: conint(ge=0)
     empty: bool
 
+    _n_bytes: int = PrivateAttr(default=0)
+
     @field_validator("totalPaginas", mode="before")
     @classmethod
     def validate_total_paginas(cls, v):
@@ -112,7 +121,7 @@ class PNCPContratacaoItemsParamsDTO(BaseModel):
 class PNCPContratacaoItemsResultDTO(RootModel[List[entryDTO]]):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    pass
+    _n_bytes: int = PrivateAttr(default=0)
 
 
 class LiteLLMEmbeddingsParamsDTO(BaseModel):
@@ -0,0 +1,78 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+
+class FairShareSemaphore:
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.in_flight: dict[Hashable, int] = {}
+        self.n_waiting: dict[Hashable, int] = {}
+        self.n_acquired: dict[Hashable, int] = {}
+        self.wait_time: dict[Hashable, float] = {}
+        self._condition = asyncio.Condition()
+
+    def _active_tenants(self) -> set[Hashable]:
+        return {
+            tenant
+            for tenant in self.in_flight.keys() | self.n_waiting.keys()
+            if self.in_flight.get(tenant, 0) or self.n_waiting.get(tenant, 0)
+        }
+
+    def _fair_share(self) -> int:
+        return math.ceil(self.capacity / max(len(self._active_tenants()), 1))
+
+    def _can_acquire(self, tenant: Hashable) -> bool:
+        if sum(self.in_flight.values()) >= self.capacity:
+            return False
+        fair_share = self._fair_share()
+        if self.in_flight.get(tenant, 0) < fair_share:
+            return True
+        # Slots beyond the fair share are only borrowed while no tenant that
+        # is still under its share is waiting for one.
+        return not any(
+            self.n_waiting.get(other, 0) and self.in_flight.get(other, 0) < fair_share
+            for other in self._active_tenants()
+            if other != tenant
+        )
+
+    async def acquire(self, tenant: Hashable) -> None:
+        started_at = time.monotonic()
+        async with self._condition:
+            self.n_waiting[tenant] = self.n_waiting.get(tenant, 0) + 1
+            try:
+                await self._condition.wait_for(lambda: self._can_acquire(tenant))
+            finally:
+                self.n_waiting[tenant] -= 1
+                self._condition.notify_all()
+            self.in_flight[tenant] = self.in_flight.get(tenant, 0) + 1
+            self.n_acquired[tenant] = self.n_acquired.get(tenant, 0) + 1
+            self.wait_time[tenant] = (
+                self.wait_time.get(tenant, 0.0) + time.monotonic() - started_at
+            )
+
+    async def release(self, tenant: Hashable) -> None:
+        async with self._condition:
+            self.in_flight[tenant] -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, tenant: Hashable) -> AsyncIterator[None]:
+        await self.acquire(tenant)
+        try:
+            yield
+        finally:
+            await self.release(tenant)
+
+    def snapshot(self, tenant: Hashable) -> dict:
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight.get(tenant, 0),
+            "n_acquired": self.n_acquired.get(tenant, 0),
+            "wait_time": round(self.wait_time.get(tenant, 0.0), 2),
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from httpx import Request, Response
+
+from licitabot.settings import HTTPCacheSettings, settings
+
+logger = logging.getLogger("licitabot")
+
+SendRequest = Callable[[Dict[str, str]], Awaitable[Response]]
+
+
+class HTTPResponseCache:
+
+    def __init__(self, directory: str, ttl: float, max_bytes: int):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.n_hits = 0
+        self.n_revalidated = 0
+        self.n_misses = 0
+        # Body sizes by key, least recently used first, and their total; the
+        # directory is only scanned once, when the first response is stored.
+        self._index: Optional[OrderedDict[str, int]] = None
+        self._total_bytes = 0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, cache_settings: HTTPCacheSettings) -> "HTTPResponseCache":
+        return cls(
+            directory=cache_settings.directory,
+            ttl=cache_settings.ttl,
+            max_bytes=cache_settings.max_bytes,
+        )
+
+    def _key(self, url: str, params: Dict[str, Any]) -> str:
+        canonical = json.dumps(
+            [url, sorted((str(k), str(v)) for k, v in params.items())]
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        entries = []
+        if self.directory.exists():
+            for body_path in self.directory.glob("*/*.body"):
+                stat = body_path.stat()
+                entries.append((stat.st_mtime, body_path.stem, stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+    def _read(self, key: str) -> Optional[tuple[Dict[str, Any], bytes]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            content = body_path.read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(body_path)
+        return meta, content
+
+    def _write(self, key: str, meta: Dict[str, Any], content: bytes) -> None:
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        files = ((body_path, content), (meta_path, json.dumps(meta).encode()))
+        for path, data in files:
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def _touch(self, key: str, meta: Dict[str, Any]) -> None:
+        meta_path, _ = self._paths(key)
+        meta_path.write_text(json.dumps(meta))
+
+    def _delete(self, keys: list[str]) -> None:
+        for key in keys:
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+
+    def _used(self, key: str) -> None:
+        if self._index is not None and key in self._index:
+            self._index.move_to_end(key)
+
+    async def _store(self, key: str, response: Response) -> None:
+        meta = {
+            "stored_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+        }
+        await asyncio.to_thread(self._write, key, meta, response.content)
+        async with self._lock:
+            if self._index is None:
+                self._index = await asyncio.to_thread(self._load_index)
+                self._total_bytes = sum(self._index.values())
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(response.content)
+            self._total_bytes += len(response.content)
+            evicted = []
+            while self._total_bytes > self.max_bytes and self._index:
+                evicted_key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(evicted_key)
+            if evicted:
+                await asyncio.to_thread(self._delete, evicted)
+                logger.info(f"[*] HTTP cache evicted down to {self._total_bytes} bytes")
+
+    def _cached_response(
+        self, url: str, params: Dict[str, Any], meta: Dict[str, Any], content: bytes
+    ) -> Response:
+        headers = {}
+        if meta.get("content_type"):
+            headers["Content-Type"] = meta["content_type"]
+        return Response(
+            200,
+            content=content,
+            headers=headers,
+            request=Request("GET", url, params=params),
+        )
+
+    async def fetch(
+        self, url: str, params: Dict[str, Any], send: SendRequest
+    ) -> Response:
+        key = self._key(url, params)
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is None:
+            self.n_misses += 1
+            response = await send({})
+            if response.status_code == 200:
+                await self._store(key, response)
+            return response
+
+        meta, content = cached
+        self._used(key)
+        if time.time() - meta["stored_at"] < self.ttl:
+            self.n_hits += 1
+            return self._cached_response(url, params, meta, content)
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        response = await send(headers)
+        if response.status_code == 304:
+            self.n_revalidated += 1
+            meta["stored_at"] = time.time()
+            await asyncio.to_thread(self._touch, key, meta)
+            return self._cached_response(url, params, meta, content)
+        self.n_misses += 1
+        if response.status_code == 200:
+            await self._store(key, response)
+        return response
+
+    def snapshot(self) -> dict:
+        return {
+            "n_hits": self.n_hits,
+            "n_revalidated": self.n_revalidated,
+            "n_misses": self.n_misses,
+        }
+
+
+def get_http_cache(enabled: Optional[bool] = None) -> Optional[HTTPResponseCache]:
+    if enabled is None:
+        enabled = settings.http_cache.enabled
+    if not enabled:
+        return None
+    return HTTPResponseCache.from_settings(settings.http_cache)
@@ -0,0 +1,54 @@
+import logging
+
+from httpx import URL, AsyncClient, Limits
+
+from licitabot.settings import HTTPSettings, settings
+
+logger = logging.getLogger("licitabot")
+
+
+class HTTPClientRegistry:
+
+    def __init__(self, http_settings: HTTPSettings):
+        self.http_settings = http_settings
+        self._clients: dict[str, AsyncClient] = {}
+
+    def _origin(self, base_url: str) -> str:
+        url = URL(base_url)
+        return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+    def _create_client(self, base_url: str) -> AsyncClient:
+        return AsyncClient(
+            base_url=base_url,
+            timeout=self.http_settings.timeout,
+            http2=self.http_settings.http2,
+            limits=Limits(
+                max_connections=self.http_settings.max_connections_per_host,
+                max_keepalive_connections=self.http_settings.max_keepalive_connections,
+                keepalive_expiry=self.http_settings.keepalive_expiry,
+            ),
+        )
+
+    def get(self, base_url: str) -> AsyncClient:
+        origin = self._origin(base_url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            logger.info(f"[*] Opening HTTP client pool for {origin}")
+            client = self._create_client(base_url)
+            self._clients[origin] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for origin, client in clients.items():
+            logger.info(f"[*] Closing HTTP client pool for {origin}")
+            await client.aclose()
+
+    async def __aenter__(self) -> "HTTPClientRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+http_client_registry = HTTPClientRegistry(settings.http)
@@ -0,0 +1,116 @@
+import re
+
+# The decoder only finds where each element of the array starts and ends;
+# the elements are handed over as bytes and decoded by the caller, so the
+# configured msgspec or passthrough decoder still does the parsing.
+WHITESPACE = b" \t\r\n"
+SCALAR_END = b" \t\r\n,]"
+_STRING = re.compile(rb'"(?:[^"\\]++|\\.)*+"', re.DOTALL)
+# Skips everything up to the next bracket outside a string. The possessive
+# quantifiers keep a failed match (no bracket yet, or a string still cut off
+# by the chunk) linear.
+_NEXT_BRACKET = re.compile(
+    rb'(?:[^"\[\]{}]++|' + _STRING.pattern + rb")*+([\[\]{}])", re.DOTALL
+)
+
+
+def _nested_container_pattern(depth: int) -> re.Pattern:
+    flat = rb'[^"\[\]{}]++|' + _STRING.pattern
+    body = rb"(?:" + flat + rb")*+"
+    for _ in range(depth - 1):
+        body = rb"(?:" + flat + rb"|[\[{]" + body + rb"[\]}])*+"
+    return re.compile(rb"[\[{]" + body + rb"[\]}]", re.DOTALL)
+
+
+# Matches a whole object or array nested up to four levels in one call,
+# which covers PNCP items; deeper or cut-off elements are scanned bracket
+# by bracket instead.
+_CONTAINER = _nested_container_pattern(4)
+
+
+class JSONArrayStreamDecoder:
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._started = False
+        self._finished = False
+        self._expect_separator = False
+        self._empty = True
+        # Where a container split across chunks was scanned up to, and how
+        # deeply nested the scan is there, so it is not scanned again.
+        self._scanned = 0
+        self._depth = 0
+
+    def _skip_whitespace(self, position: int) -> int:
+        while position < len(self._buffer) and self._buffer[position] in WHITESPACE:
+            position += 1
+        return position
+
+    def _find_container_end(self, start: int) -> int:
+        position = max(self._scanned, start)
+        while match := _NEXT_BRACKET.match(self._buffer, position):
+            position = match.end()
+            self._depth += 1 if match.group(1) in b"[{" else -1
+            if self._depth == 0:
+                self._scanned = 0
+                return position
+        self._scanned = position
+        return -1
+
+    def _find_element_end(self, start: int) -> int:
+        first = self._buffer[start : start + 1]
+        if first == b'"':
+            string = _STRING.match(self._buffer, start)
+            return -1 if string is None else string.end()
+        if first in (b"[", b"{"):
+            if not self._depth and (container := _CONTAINER.match(self._buffer, start)):
+                return container.end()
+            return self._find_container_end(start)
+        # A number or literal may still be growing ("2" then ".5"), so it
+        # only ends once a delimiter after it has arrived.
+        end = start
+        while end < len(self._buffer) and self._buffer[end] not in SCALAR_END:
+            end += 1
+        return -1 if end == len(self._buffer) else end
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        self._buffer += chunk
+        elements = []
+        position = 0
+        while not self._finished:
+            position = self._skip_whitespace(position)
+            if position == len(self._buffer):
+                break
+            byte = self._buffer[position : position + 1]
+            if not self._started:
+                if byte != b"[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                position += 1
+            elif byte == b"]" and (self._expect_separator or self._empty):
+                self._finished = True
+                position += 1
+            elif self._expect_separator:
+                if byte != b",":
+                    raise ValueError(f"Unexpected {byte!r} in JSON array")
+                self._expect_separator = False
+                position += 1
+            else:
+                end = self._find_element_end(position)
+                if end == -1:
+                    break
+                if end == position:
+                    raise ValueError(f"Unexpected {byte!r} in JSON array")
+                elements.append(bytes(self._buffer[position:end]))
+                self._expect_separator = True
+                self._empty = False
+                position = end
+
+        del self._buffer[:position]
+        if self._scanned:
+            self._scanned -= position
+        return elements
+
+    def close(self) -> None:
+        if not self._finished or self._buffer.strip():
+            raise ValueError("Incomplete or trailing data in JSON array")
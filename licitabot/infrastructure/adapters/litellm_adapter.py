@@ -1,3 +1,5 @@
+from typing import Optional
+
 from licitabot.settings import settings
 from httpx import AsyncClient
 from tenacity import (
@@ -10,14 +12,15 @@ from licitabot.infrastructure.adapters.dtos import (
     LiteLLMEmbeddingsParamsDTO,
     LiteLLMEmbeddingsResultDTO,
 )
+from licitabot.infrastructure.adapters.http_client_registry import (
+    http_client_registry,
+)
 
 
 class LiteLLMAdapter:
 
-    def __init__(self):
-        self.client = AsyncClient(
-            timeout=settings.http.timeout, base_url=settings.litellm.base_url
-        )
+    def __init__(self, client: Optional[AsyncClient] = None):
+        self.client = client or http_client_registry.get(settings.litellm.base_url)
         self.embeddings_url = "/v1/embeddings"
         self.headers = {
             "Authorization": f"Bearer {settings.litellm.api_key}",
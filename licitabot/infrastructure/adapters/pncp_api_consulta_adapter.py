@@ -1,4 +1,6 @@
-from httpx import AsyncClient
+from typing import Awaitable, Callable, Hashable, Optional
+
+from httpx import AsyncClient, Response
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -6,20 +8,71 @@ from tenacity import (
     wait_exponential,
 )
 
+from licitabot.infrastructure.adapters.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+)
 from licitabot.infrastructure.adapters.dtos import (
     PNCPUpdatedContratacoesParamsDTO,
     PNCPUpdatedContratacoesResultDTO,
 )
+from licitabot.infrastructure.adapters.fair_share_semaphore import (
+    FairShareSemaphore,
+)
+from licitabot.infrastructure.adapters.http_cache import HTTPResponseCache
+from licitabot.infrastructure.adapters.http_client_registry import (
+    http_client_registry,
+)
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    PNCPDecoder,
+    decode_updated_contratacoes,
+)
 from licitabot.settings import settings
 
+consulta_limiter = AdaptiveConcurrencyLimiter(
+    "pncp_consulta", **settings.pncp_limiter.model_dump()
+)
+
 
 class PNCPApiConsultaAdapter:
 
-    def __init__(self):
-        self.client = AsyncClient(timeout=settings.http.timeout)
+    def __init__(
+        self,
+        client: Optional[AsyncClient] = None,
+        limiter: AdaptiveConcurrencyLimiter = consulta_limiter,
+        cache: Optional[HTTPResponseCache] = None,
+        request_budget: Optional[FairShareSemaphore] = None,
+        budget_tenant: Hashable = None,
+        decoder: PNCPDecoder = settings.pncp_decode.decoder,
+    ):
+        self.PNCP_BASE_URL = "https://pncp.gov.br"
         self.PNCP_GET_UPDATED_CONTRATACOES_URL = (
             "https://pncp.gov.br/api/consulta/v1/contratacoes/atualizacao"
         )
+        self.client = client or http_client_registry.get(self.PNCP_BASE_URL)
+        self.limiter = limiter
+        self.cache = cache
+        self.request_budget = request_budget
+        self.budget_tenant = budget_tenant
+        self.decoder = decoder
+
+    async def _request(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        # Like the limiter's, a budget slot covers one send and is not held
+        # through tenacity's backoff between attempts.
+        if self.request_budget is None:
+            return await self.limiter.request(send)
+        async with self.request_budget.slot(self.budget_tenant):
+            return await self.limiter.request(send)
+
+    async def _get(self, url: str, params: dict) -> Response:
+        if self.cache is None:
+            return await self._request(lambda: self.client.get(url, params=params))
+        return await self.cache.fetch(
+            url,
+            params,
+            lambda headers: self._request(
+                lambda: self.client.get(url, params=params, headers=headers)
+            ),
+        )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -27,22 +80,19 @@ class PNCPApiConsultaAdapter:
         retry=retry_if_exception_type((Exception,)),
         reraise=True,
     )
-    async def get_updated_contratacoes(
+    async def get_updated_contratacoes_content(
         self, params: PNCPUpdatedContratacoesParamsDTO
-    ) -> PNCPUpdatedContratacoesResultDTO:
-        response = await self.client.get(
-            self.PNCP_GET_UPDATED_CONTRATACOES_URL,
-            params=params.model_dump(),
+    ) -> bytes:
+        response = await self._get(
+            self.PNCP_GET_UPDATED_CONTRATACOES_URL, params.model_dump()
         )
         response.raise_for_status()
         if response.status_code == 204:
-            return PNCPUpdatedContratacoesResultDTO(
-                data=[],
-                totalPaginas=0,
-                totalRegistros=0,
-                numeroPagina=0,
-                paginasRestantes=0,
-                empty=True,
-            )
-        response = response.json()
-        return PNCPUpdatedContratacoesResultDTO.model_validate(response)
+            return b""
+        return response.content
+
+    async def get_updated_contratacoes(
+        self, params: PNCPUpdatedContratacoesParamsDTO
+    ) -> PNCPUpdatedContratacoesResultDTO:
+        content = await self.get_updated_contratacoes_content(params)
+        return decode_updated_contratacoes(content, self.decoder)
@@ -1,4 +1,6 @@
-from httpx import AsyncClient
+from typing import Awaitable, Callable, Hashable, Optional
+
+from httpx import AsyncClient, Response
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -6,18 +8,134 @@ from tenacity import (
     wait_exponential,
 )
 
+from licitabot.infrastructure.adapters.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+)
 from licitabot.infrastructure.adapters.dtos import (
     PNCPContratacaoItemsParamsDTO,
     PNCPContratacaoItemsResultDTO,
+    entryDTO,
+)
+from licitabot.infrastructure.adapters.fair_share_semaphore import (
+    FairShareSemaphore,
+)
+from licitabot.infrastructure.adapters.http_cache import HTTPResponseCache
+from licitabot.infrastructure.adapters.http_client_registry import (
+    http_client_registry,
+)
+from licitabot.infrastructure.adapters.json_stream import JSONArrayStreamDecoder
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    PNCPDecoder,
+    decode_contratacao_item,
+    decode_contratacao_items,
+    validate_contratacao_items,
 )
 from licitabot.settings import settings
 
+pncp_limiter = AdaptiveConcurrencyLimiter(
+    "pncp_pncp", **settings.pncp_limiter.model_dump()
+)
+
 
 class PNCPApiPncpAdapter:
 
-    def __init__(self):
-        self.client = AsyncClient(timeout=settings.http.timeout)
+    def __init__(
+        self,
+        client: Optional[AsyncClient] = None,
+        limiter: AdaptiveConcurrencyLimiter = pncp_limiter,
+        cache: Optional[HTTPResponseCache] = None,
+        request_budget: Optional[FairShareSemaphore] = None,
+        budget_tenant: Hashable = None,
+        stream: bool = settings.pncp_items.stream,
+        max_streamed_items: int = settings.pncp_items.max_streamed_items,
+        page_size: int = settings.pncp_items.page_size,
+        decoder: PNCPDecoder = settings.pncp_decode.decoder,
+    ):
+        self.PNCP_BASE_URL = "https://pncp.gov.br"
         self.PNCP_GET_CONTRATACAO_ITEMS_URL = "https://pncp.gov.br/api/pncp/v1/orgaos/{cnpj}/compras/{ano}/{sequencial}/itens"
+        self.client = client or http_client_registry.get(self.PNCP_BASE_URL)
+        self.limiter = limiter
+        self.cache = cache
+        self.request_budget = request_budget
+        self.budget_tenant = budget_tenant
+        self.stream = stream
+        self.max_streamed_items = max_streamed_items
+        self.page_size = page_size
+        self.decoder = decoder
+
+    async def _request(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        # Like the limiter's, a budget slot covers one send and is not held
+        # through tenacity's backoff between attempts.
+        if self.request_budget is None:
+            return await self.limiter.request(send)
+        async with self.request_budget.slot(self.budget_tenant):
+            return await self.limiter.request(send)
+
+    async def _get(self, url: str, params: dict) -> Response:
+        if self.cache is None:
+            return await self._request(lambda: self.client.get(url, params=params))
+        return await self.cache.fetch(
+            url,
+            params,
+            lambda headers: self._request(
+                lambda: self.client.get(url, params=params, headers=headers)
+            ),
+        )
+
+    async def _stream_items(self, url: str) -> tuple[list[entryDTO], int, bool]:
+        items: list[entryDTO] = []
+        n_bytes = 0
+        truncated = False
+
+        async def send() -> Response:
+            nonlocal n_bytes, truncated
+            # The body is decoded inside the limiter slot, so the slot covers
+            # the transfer just like a buffered request would.
+            async with self.client.stream(
+                "GET", url, params={"tamanhoPagina": 10000}
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    return response
+                stream = JSONArrayStreamDecoder()
+                async for chunk in response.aiter_bytes():
+                    n_bytes += len(chunk)
+                    items.extend(
+                        decode_contratacao_item(element, self.decoder)
+                        for element in stream.feed(chunk)
+                    )
+                    if len(items) > self.max_streamed_items:
+                        truncated = True
+                        return response
+                stream.close()
+                return response
+
+        response = await self._request(send)
+        response.raise_for_status()
+        return items, n_bytes, truncated
+
+    async def _get_items_pages(
+        self, url: str, first_pagina: int
+    ) -> tuple[list[entryDTO], int]:
+        items: list[entryDTO] = []
+        n_bytes = 0
+        pagina = first_pagina
+        while True:
+            response = await self._get(
+                url, {"pagina": pagina, "tamanhoPagina": self.page_size}
+            )
+            response.raise_for_status()
+            page = decode_contratacao_items(response.content, self.decoder)
+            items.extend(page.root)
+            n_bytes += page._n_bytes
+            if len(page.root) < self.page_size:
+                return items, n_bytes
+            pagina += 1
+
+    def _get_items_url(self, params: PNCPContratacaoItemsParamsDTO) -> str:
+        return self.PNCP_GET_CONTRATACAO_ITEMS_URL.format(
+            cnpj=params.cnpj, ano=params.ano, sequencial=params.sequencial
+        )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -25,16 +143,39 @@ class PNCPApiPncpAdapter:
         retry=retry_if_exception_type((Exception,)),
         reraise=True,
     )
-    async def get_contratacao_items(
+    async def get_contratacao_items_content(
         self, params: PNCPContratacaoItemsParamsDTO
-    ) -> PNCPContratacaoItemsResultDTO:
-        cnpj = params.cnpj
-        ano = params.ano
-        sequencial = params.sequencial
-        url = self.PNCP_GET_CONTRATACAO_ITEMS_URL.format(
-            cnpj=cnpj, ano=ano, sequencial=sequencial
+    ) -> bytes:
+        response = await self._get(
+            self._get_items_url(params), {"tamanhoPagina": 10000}
         )
-        response = await self.client.get(url, params={"tamanhoPagina": 10000})
         response.raise_for_status()
-        response = response.json()
-        return PNCPContratacaoItemsResultDTO.model_validate(response)
+        return response.content
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=10, max=60),
+        retry=retry_if_exception_type((Exception,)),
+        reraise=True,
+    )
+    async def get_contratacao_items(
+        self, params: PNCPContratacaoItemsParamsDTO
+    ) -> PNCPContratacaoItemsResultDTO:
+        url = self._get_items_url(params)
+        if self.cache is not None or not self.stream:
+            response = await self._get(url, {"tamanhoPagina": 10000})
+            response.raise_for_status()
+            return decode_contratacao_items(response.content, self.decoder)
+
+        items, n_bytes, truncated = await self._stream_items(url)
+        if truncated:
+            # Keep the items that fill whole pages and fetch the rest page by
+            # page, so no single body exceeds the streaming threshold.
+            n_kept = len(items) - len(items) % self.page_size
+            del items[n_kept:]
+            page_items, page_bytes = await self._get_items_pages(
+                url, n_kept // self.page_size + 1
+            )
+            items.extend(page_items)
+            n_bytes += page_bytes
+        return validate_contratacao_items(items, n_bytes, self.decoder)
@@ -0,0 +1,216 @@
+from typing import Annotated, Any, Literal, Optional
+
+import msgspec
+
+from licitabot.infrastructure.adapters.dtos import (
+    PNCPContratacaoItemsResultDTO,
+    PNCPUpdatedContratacoesResultDTO,
+    entryDTO,
+)
+
+# Only the fields the gateway reads are declared; msgspec skips the rest of
+# each entry, which is stored untouched as meta.
+
+
+class OrgaoEntidadeStruct(msgspec.Struct):
+    cnpj: Annotated[str, msgspec.Meta(pattern=r"^\d{14}$")]
+
+
+class ContratacaoEntryStruct(msgspec.Struct):
+    numeroControlePNCP: Annotated[
+        str, msgspec.Meta(pattern=r"^\d{14}-\d{1}-\d{6}/\d{4}$")
+    ]
+    orgaoEntidade: OrgaoEntidadeStruct
+    anoCompra: Annotated[int, msgspec.Meta(ge=1900)]
+    sequencialCompra: Annotated[int, msgspec.Meta(ge=1)]
+    dataAtualizacaoGlobal: Optional[str] = None
+
+
+class UpdatedContratacoesPageStruct(msgspec.Struct):
+    data: list[dict[str, Any]]
+    totalPaginas: Annotated[int, msgspec.Meta(ge=0)]
+    totalRegistros: Annotated[int, msgspec.Meta(ge=0)]
+    numeroPagina: Annotated[int, msgspec.Meta(ge=0)]
+    paginasRestantes: Annotated[int, msgspec.Meta(ge=0)]
+    empty: bool
+
+
+class ItemStruct(msgspec.Struct):
+    numeroItem: Annotated[int, msgspec.Meta(ge=1)]
+
+
+# Passthrough: entries stay as the original JSON bytes, and only the key
+# fields below are decoded; they are what the gateway and the hot columns,
+# projections and compact storage read.
+
+
+class ContratacaoKeyFieldsStruct(ContratacaoEntryStruct):
+    dataPublicacaoPncp: Optional[str] = None
+    objetoCompra: Optional[str] = None
+
+
+class ItemKeyFieldsStruct(ItemStruct):
+    descricao: Optional[str] = None
+
+
+class PassthroughUpdatedContratacoesPageStruct(UpdatedContratacoesPageStruct):
+    data: list[msgspec.Raw]
+
+
+# Key fields only: what a decode pool worker sends back for a page, so the
+# full entries never cross the process boundary on their way in.
+
+
+class ContratacaoKeysPageStruct(UpdatedContratacoesPageStruct):
+    data: list[ContratacaoEntryStruct]
+
+
+_updated_contratacoes_decoder = msgspec.json.Decoder(UpdatedContratacoesPageStruct)
+_items_decoder = msgspec.json.Decoder(list[dict[str, Any]])
+_item_decoder = msgspec.json.Decoder(dict[str, Any])
+_passthrough_updated_contratacoes_decoder = msgspec.json.Decoder(
+    PassthroughUpdatedContratacoesPageStruct
+)
+_passthrough_items_decoder = msgspec.json.Decoder(list[msgspec.Raw])
+_contratacao_keys_page_decoder = msgspec.json.Decoder(ContratacaoKeysPageStruct)
+_contratacao_key_fields_decoder = msgspec.json.Decoder(ContratacaoKeyFieldsStruct)
+_item_key_fields_decoder = msgspec.json.Decoder(ItemKeyFieldsStruct)
+
+
+PNCPDecoder = Literal["msgspec", "pydantic", "passthrough"]
+
+# Where a passthrough entry keeps its original JSON bytes.
+RAW_JSON_KEY = "_json"
+
+
+def _passthrough_entry(raw: msgspec.Raw, decoder: msgspec.json.Decoder) -> entryDTO:
+    entry = msgspec.to_builtins(decoder.decode(raw))
+    entry[RAW_JSON_KEY] = bytes(raw)
+    return entry
+
+
+def passthrough_document(entry: entryDTO, items: list[entryDTO]) -> bytes:
+    # The stored contratacao document carries its items, as in the decoded
+    # path; they are spliced in as bytes instead of re-encoded.
+    items_json = b"[" + b",".join(item[RAW_JSON_KEY] for item in items) + b"]"
+    body = entry[RAW_JSON_KEY].rstrip()[:-1].rstrip()
+    separator = b"" if body.endswith(b"{") else b","
+    return body + separator + b'"items":' + items_json + b"}"
+
+
+def empty_updated_contratacoes() -> PNCPUpdatedContratacoesResultDTO:
+    return PNCPUpdatedContratacoesResultDTO.model_construct(
+        data=[],
+        totalPaginas=0,
+        totalRegistros=0,
+        numeroPagina=0,
+        paginasRestantes=0,
+        empty=True,
+    )
+
+
+def decode_updated_contratacoes(
+    content: bytes, decoder: PNCPDecoder = "msgspec"
+) -> PNCPUpdatedContratacoesResultDTO:
+    if not content:
+        return empty_updated_contratacoes()
+    if decoder == "pydantic":
+        result = PNCPUpdatedContratacoesResultDTO.model_validate_json(content)
+        result._n_bytes = len(content)
+        return result
+    if decoder == "passthrough":
+        page = _passthrough_updated_contratacoes_decoder.decode(content)
+        data = [
+            _passthrough_entry(raw, _contratacao_key_fields_decoder)
+            for raw in page.data
+        ]
+    else:
+        page = _updated_contratacoes_decoder.decode(content)
+        for entry in page.data:
+            msgspec.convert(entry, ContratacaoEntryStruct)
+        data = page.data
+    # Already validated above, so the pydantic validators are skipped.
+    result = PNCPUpdatedContratacoesResultDTO.model_construct(
+        data=data,
+        totalPaginas=page.totalPaginas,
+        totalRegistros=page.totalRegistros,
+        numeroPagina=page.numeroPagina,
+        paginasRestantes=page.paginasRestantes,
+        empty=page.empty,
+    )
+    result._n_bytes = len(content)
+    return result
+
+
+def decode_updated_contratacoes_keys(
+    content: bytes, decoder: PNCPDecoder = "msgspec"
+) -> PNCPUpdatedContratacoesResultDTO:
+    if not content:
+        return empty_updated_contratacoes()
+    if decoder == "pydantic":
+        # Validated in full, like decode_updated_contratacoes, then reduced.
+        result = decode_updated_contratacoes(content, decoder)
+        data = [
+            msgspec.to_builtins(msgspec.convert(entry, ContratacaoEntryStruct))
+            for entry in result.data
+        ]
+        page = result
+    else:
+        page = _contratacao_keys_page_decoder.decode(content)
+        data = msgspec.to_builtins(page.data)
+    result = PNCPUpdatedContratacoesResultDTO.model_construct(
+        data=data,
+        totalPaginas=page.totalPaginas,
+        totalRegistros=page.totalRegistros,
+        numeroPagina=page.numeroPagina,
+        paginasRestantes=page.paginasRestantes,
+        empty=page.empty,
+    )
+    result._n_bytes = len(content)
+    return result
+
+
+def validate_contratacao_items(
+    items: list[entryDTO], n_bytes: int = 0, decoder: PNCPDecoder = "msgspec"
+) -> PNCPContratacaoItemsResultDTO:
+    if decoder == "pydantic":
+        result = PNCPContratacaoItemsResultDTO.model_validate(items)
+    else:
+        for item in items:
+            msgspec.convert(item, ItemStruct)
+        result = PNCPContratacaoItemsResultDTO.model_construct(items)
+    result._n_bytes = n_bytes
+    return result
+
+
+def decode_contratacao_item(
+    content: bytes, decoder: PNCPDecoder = "msgspec"
+) -> entryDTO:
+    # One element of a streamed /itens body; the list is validated with
+    # validate_contratacao_items once it is complete.
+    if decoder == "passthrough":
+        return _passthrough_entry(msgspec.Raw(content), _item_key_fields_decoder)
+    return _item_decoder.decode(content)
+
+
+def decode_contratacao_items(
+    content: bytes, decoder: PNCPDecoder = "msgspec"
+) -> PNCPContratacaoItemsResultDTO:
+    if not content:
+        return validate_contratacao_items([], 0, decoder)
+    if decoder == "pydantic":
+        result = PNCPContratacaoItemsResultDTO.model_validate_json(content)
+        result._n_bytes = len(content)
+        return result
+    if decoder == "passthrough":
+        result = PNCPContratacaoItemsResultDTO.model_construct(
+            [
+                _passthrough_entry(raw, _item_key_fields_decoder)
+                for raw in _passthrough_items_decoder.decode(content)
+            ]
+        )
+        result._n_bytes = len(content)
+        return result
+    return validate_contratacao_items(
+        _items_decoder.decode(content), len(content), decoder
+    )
@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from licitabot.settings import ReadCacheSettings, settings
+
+
+class LRUTTLCache:
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_evictions = 0
+        self.n_invalidations = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Hashable, Any]] = (
+            OrderedDict()
+        )
+        self._groups: dict[Hashable, set[Hashable]] = {}
+
+    @classmethod
+    def from_settings(cls, cache_settings: ReadCacheSettings) -> "LRUTTLCache":
+        return cls(max_entries=cache_settings.max_entries, ttl=cache_settings.ttl)
+
+    def _remove(self, key: Hashable) -> None:
+        _, group, _ = self._entries.pop(key)
+        keys = self._groups[group]
+        keys.discard(key)
+        if not keys:
+            del self._groups[group]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.n_misses += 1
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.n_misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.n_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, group: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, group, value)
+        self._groups.setdefault(group, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.n_evictions += 1
+
+    def invalidate(self, group: Hashable) -> None:
+        for key in list(self._groups.get(group, ())):
+            self._remove(key)
+            self.n_invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._groups.clear()
+
+    def snapshot(self) -> dict:
+        n_lookups = self.n_hits + self.n_misses
+        return {
+            "n_entries": len(self._entries),
+            "n_hits": self.n_hits,
+            "n_misses": self.n_misses,
+            "hit_rate": round(self.n_hits / n_lookups, 4) if n_lookups else 0.0,
+            "n_evictions": self.n_evictions,
+            "n_invalidations": self.n_invalidations,
+        }
+
+
+# One per process, shared by every repository instance, so entries outlive
+# the request-scoped sessions.
+read_cache = LRUTTLCache.from_settings(settings.read_cache)
+
+
+def get_read_cache(enabled: Optional[bool] = None) -> Optional[LRUTTLCache]:
+    if enabled is None:
+        enabled = settings.read_cache.enabled
+    if not enabled:
+        return None
+    return read_cache
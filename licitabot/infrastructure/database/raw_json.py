@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+
+class RawJSON(str):
+    # JSON text that is already serialized, sent to Postgres as is.
+    pass
+
+
+def serialize_json(value: Any) -> str:
+    if isinstance(value, RawJSON):
+        return value
+    return json.dumps(value)
@@ -1,8 +1,33 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from licitabot.settings import settings
-
-engine = create_async_engine(settings.database.async_url)
+from licitabot.infrastructure.database.raw_json import serialize_json
+from licitabot.settings import DatabaseSettings, settings
+
+
+def _create_engine(database: DatabaseSettings):
+    statement_cache_size = database.statement_cache_size
+    prepared_statement_cache_size = database.prepared_statement_cache_size
+    if not database.server_side_prepared_statements:
+        # Needed behind transaction-pooling proxies such as pgbouncer.
+        statement_cache_size = 0
+        prepared_statement_cache_size = 0
+    url = make_url(database.async_url).update_query_dict(
+        {"prepared_statement_cache_size": str(prepared_statement_cache_size)}
+    )
+    return create_async_engine(
+        url,
+        pool_size=database.pool_size,
+        max_overflow=database.max_overflow,
+        pool_timeout=database.pool_timeout,
+        pool_recycle=database.pool_recycle,
+        pool_pre_ping=database.pool_pre_ping,
+        connect_args={"statement_cache_size": statement_cache_size},
+        json_serializer=serialize_json,
+    )
+
+
+engine = _create_engine(settings.database)
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession)
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, UUID, Enum
+from sqlalchemy import Column, ForeignKey, Integer, String, TIMESTAMP, UUID, Enum
 import uuid
 import enum
 from sqlalchemy.dialects.postgresql import JSONB
@@ -17,6 +17,9 @@ class ExecutionStatus(str, enum.Enum):
 class Execution(Base):
     __tablename__ = "executions"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    parent_id = Column(
+        UUID(as_uuid=True), ForeignKey("executions.id"), nullable=True, index=True
+    )
     job_name = Column(String, nullable=False)
     status = Column(
         Enum(ExecutionStatus), nullable=False, default=ExecutionStatus.RUNNING
@@ -47,3 +50,20 @@ class Execution(Base):
     def mark_cancelled(self):
         self.status = ExecutionStatus.CANCELLED
         self.ended_at = datetime.now(timezone.utc)
+
+
+class IngestionCheckpoint(Base):
+    __tablename__ = "ingestion_checkpoints"
+    execution_id = Column(
+        UUID(as_uuid=True), ForeignKey("executions.id"), primary_key=True
+    )
+    data_inicial = Column(String, primary_key=True)
+    data_final = Column(String, primary_key=True)
+    codigo_modalidade_contratacao = Column(Integer, primary_key=True)
+    pagina = Column(Integer, primary_key=True)
+
+    completed_at = Column(
+        TIMESTAMP(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
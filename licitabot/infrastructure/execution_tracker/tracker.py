@@ -1,9 +1,28 @@
 import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from licitabot.infrastructure.execution_tracker.models import Execution
+from sqlalchemy import select
+from licitabot.infrastructure.execution_tracker.models import (
+    Execution,
+    ExecutionStatus,
+)
 from licitabot.infrastructure.database.session import create_session
 import functools
 import inspect
+import json
+import logging
+
+logger = logging.getLogger("licitabot")
+
+current_execution_id: ContextVar[Optional[UUID]] = ContextVar(
+    "current_execution_id", default=None
+)
+current_parent_execution_id: ContextVar[Optional[UUID]] = ContextVar(
+    "current_parent_execution_id", default=None
+)
 
 
 class ExecutionTracker:
@@ -11,13 +30,69 @@ class ExecutionTracker:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def start(self, job_name: str, meta: dict | None = None) -> Execution:
+    async def get(self, execution_id: UUID) -> Optional[Execution]:
+        return await self.session.get(Execution, execution_id)
+
+    async def start(
+        self,
+        job_name: str,
+        meta: dict | None = None,
+        parent_id: UUID | None = None,
+    ) -> Execution:
 
-        execution = Execution(job_name=job_name, meta=meta)
+        execution = Execution(job_name=job_name, meta=meta, parent_id=parent_id)
         self.session.add(execution)
         await self.session.commit()
+        # Callers read the id right away; load it now rather than lazily.
+        await self.session.refresh(execution)
         return execution
 
+    async def refresh_aggregate(self, parent_id: UUID) -> Optional[UUID]:
+        parent = await self.session.get(
+            Execution, parent_id, with_for_update=True, populate_existing=True
+        )
+        if parent is None:
+            await self.session.rollback()
+            return None
+        result = await self.session.execute(
+            select(Execution.status, Execution.meta).where(
+                Execution.parent_id == parent_id
+            )
+        )
+        # A shard may run more than once (e.g. when resumed), so statuses are
+        # folded per shard: it counts as succeeded if any of its runs did.
+        shard_statuses: dict[str, set[ExecutionStatus]] = {}
+        for status, meta in result.all():
+            shard_key = json.dumps(_shard_key(meta), sort_keys=True)
+            shard_statuses.setdefault(shard_key, set()).add(status)
+        n_shards = (parent.meta or {}).get("n_shards", len(shard_statuses))
+        n_succeeded = sum(
+            ExecutionStatus.SUCCESS in statuses for statuses in shard_statuses.values()
+        )
+        n_running = sum(
+            statuses == {ExecutionStatus.RUNNING}
+            for statuses in shard_statuses.values()
+        )
+        n_failed = len(shard_statuses) - n_succeeded - n_running
+        aggregate = {
+            "n_shards": n_shards,
+            "n_succeeded": n_succeeded,
+            "n_failed": n_failed,
+            "n_running": n_running,
+            "n_pending": n_shards - len(shard_statuses),
+        }
+        finished = n_succeeded + n_failed == n_shards
+        if n_succeeded == n_shards:
+            parent.mark_success(aggregate)
+        elif finished:
+            parent.mark_failed(aggregate)
+        else:
+            parent.result = aggregate
+        grandparent_id = parent.parent_id
+        await self.session.commit()
+        # A finished group is itself a shard of its own parent, if it has one.
+        return grandparent_id if finished else None
+
     async def mark_success(
         self, execution: Execution, result: dict | None = None
     ) -> None:
@@ -41,6 +116,12 @@ async def get_execution_tracker():
         return ExecutionTracker(session=session)
 
 
+def _shard_key(meta: dict | None) -> dict:
+    params = dict((meta or {}).get("params", {}))
+    params.pop("resumeExecutionId", None)
+    return params
+
+
 def _convert_to_dict(value):
     if hasattr(value, "model_dump"):
         return value.model_dump()
@@ -50,6 +131,40 @@ def _convert_to_dict(value):
         return str(value)
 
 
+async def _refresh_aggregate(tracker: ExecutionTracker, parent_id: UUID) -> None:
+    try:
+        while parent_id is not None:
+            parent_id = await tracker.refresh_aggregate(parent_id)
+    except Exception as e:
+        logger.error(f"[!] Error refreshing aggregate execution {parent_id}: {e}")
+
+
+@asynccontextmanager
+async def track_group(job_name: str, n_shards: int, meta: dict | None = None):
+    tracker = await get_execution_tracker()
+    parent_id = current_parent_execution_id.get()
+    execution = await tracker.start(
+        job_name, {**(meta or {}), "n_shards": n_shards}, parent_id
+    )
+    token = current_parent_execution_id.set(execution.id)
+    try:
+        yield execution
+    except asyncio.CancelledError:
+        await tracker.mark_cancelled(execution)
+        raise
+    except Exception as e:
+        await tracker.mark_failed(execution, {"error": str(e)})
+        if parent_id is not None:
+            await _refresh_aggregate(tracker, parent_id)
+        raise e
+    else:
+        # A group that ran to completion is settled by its shards, each of
+        # which refreshes the group when it finishes.
+        await _refresh_aggregate(tracker, execution.id)
+    finally:
+        current_parent_execution_id.reset(token)
+
+
 def track(job_name: str):
     def decorator(func):
         @functools.wraps(func)
@@ -66,7 +181,9 @@ def track(job_name: str):
                     except Exception:
                         meta[name] = str(value)
 
-            execution = await tracker.start(job_name, meta)
+            parent_id = current_parent_execution_id.get()
+            execution = await tracker.start(job_name, meta, parent_id)
+            token = current_execution_id.set(execution.id)
 
             try:
                 result = await func(*args, **kwargs)
@@ -80,6 +197,10 @@ def track(job_name: str):
             except Exception as e:
                 await tracker.mark_failed(execution, {"error": str(e)})
                 raise e
+            finally:
+                current_execution_id.reset(token)
+                if parent_id is not None:
+                    await _refresh_aggregate(tracker, parent_id)
 
         return wrapper
 
@@ -1,14 +1,20 @@
 import asyncio
-from typing import AsyncGenerator
+import logging
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Dict, Optional
 
-from licitabot.domain.entities import RawContratacao, RawItemContratacao
+from licitabot.domain.entities import (
+    RawContratacao,
+    RawContratacaoPage,
+    RawItemContratacao,
+)
 from licitabot.domain.value_objects import (
     CodigoModalidadeContratacao,
+    NumeroControlePNCP,
     NumeroPagina,
     TamanhoPagina,
     TotalPaginas,
     YearMonthDay,
-    NumeroControlePNCP,
 )
 from licitabot.infrastructure.adapters.dtos import (
     PNCPContratacaoItemsParamsDTO,
@@ -23,10 +29,85 @@ from licitabot.infrastructure.adapters.pncp_api_consulta_adapter import (
 from licitabot.infrastructure.adapters.pncp_api_pncp_adapter import (
     PNCPApiPncpAdapter,
 )
-import logging
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    RAW_JSON_KEY,
+    PNCPDecoder,
+    decode_contratacao_items,
+    decode_updated_contratacoes,
+    decode_updated_contratacoes_keys,
+    passthrough_document,
+)
 
 logger = logging.getLogger("licitabot")
 
+StoredVersionsLookup = Callable[
+    [list[NumeroControlePNCP]], Awaitable[Dict[NumeroControlePNCP, Optional[str]]]
+]
+
+
+def convert_to_raw_item_contratacao(
+    entry: entryDTO, numero_controle_pncp: NumeroControlePNCP
+) -> RawItemContratacao:
+    if RAW_JSON_KEY in entry:
+        return RawItemContratacao(
+            numero_controle_pncp=numero_controle_pncp,
+            numero_item=entry["numeroItem"],
+            meta={key: value for key, value in entry.items() if key != RAW_JSON_KEY},
+            meta_json=entry[RAW_JSON_KEY],
+        )
+    return RawItemContratacao(
+        numero_controle_pncp=numero_controle_pncp,
+        numero_item=entry["numeroItem"],
+        meta=entry,
+    )
+
+
+def convert_to_raw_contratacao(entry: entryDTO) -> RawContratacao:
+    numero_controle_pncp = entry["numeroControlePNCP"]
+    items = [
+        convert_to_raw_item_contratacao(item, numero_controle_pncp)
+        for item in entry["items"]
+    ]
+    if RAW_JSON_KEY in entry:
+        return RawContratacao(
+            numero_controle_pncp=numero_controle_pncp,
+            meta={
+                key: value
+                for key, value in entry.items()
+                if key not in (RAW_JSON_KEY, "items")
+            },
+            items=items,
+            meta_json=passthrough_document(entry, entry["items"]),
+        )
+    return RawContratacao(
+        numero_controle_pncp=numero_controle_pncp,
+        meta=entry,
+        items=items,
+    )
+
+
+def build_raw_contratacoes(
+    page_content: bytes,
+    numeros_controle_pncp: list[NumeroControlePNCP],
+    items_contents: list[bytes],
+    decoder: PNCPDecoder,
+) -> list[RawContratacao]:
+    # Runs in a decode pool process: takes the raw page and /itens bodies and
+    # returns records ready to persist, so the entries are decoded and
+    # converted in one place and only the records come back.
+    entries = {
+        entry["numeroControlePNCP"]: entry
+        for entry in decode_updated_contratacoes(page_content, decoder).data
+    }
+    raw_contratacoes = []
+    for numero_controle_pncp, items_content in zip(
+        numeros_controle_pncp, items_contents
+    ):
+        entry = entries[numero_controle_pncp]
+        entry["items"] = decode_contratacao_items(items_content, decoder).root
+        raw_contratacoes.append(convert_to_raw_contratacao(entry))
+    return raw_contratacoes
+
 
 class RawContratacaoGateway:
 
@@ -36,22 +117,27 @@ class RawContratacaoGateway:
         pncp_api_pncp_adapter: PNCPApiPncpAdapter,
         codigo_modalidade_contratacao: CodigoModalidadeContratacao,
         tamanho_pagina: TamanhoPagina = 50,
-        n_workers: int = 20,
-        max_retries: int = 5,
+        n_page_workers: int = 20,
+        n_item_workers: int = 50,
+        stored_versions_lookup: Optional[StoredVersionsLookup] = None,
+        decode_executor: Optional[Executor] = None,
     ):
         self.pncp_api_consulta_adapter = pncp_api_consulta_adapter
         self.pncp_api_pncp_adapter = pncp_api_pncp_adapter
         self.codigo_modalidade_contratacao = codigo_modalidade_contratacao
         self.tamanho_pagina = tamanho_pagina
-        self.n_workers = n_workers
-        self.max_retries = max_retries
+        self.n_page_workers = n_page_workers
+        self.n_item_workers = n_item_workers
+        self.stored_versions_lookup = stored_versions_lookup
+        self.decode_executor = decode_executor
+        self.n_items_fetches_skipped = 0
 
-    async def _get_pagina(
+    async def _fetch_pagina(
         self,
         dataInicial: YearMonthDay,
         dataFinal: YearMonthDay,
         pagina: NumeroPagina,
-    ) -> PNCPUpdatedContratacoesResultDTO:
+    ) -> tuple[PNCPUpdatedContratacoesResultDTO, Optional[bytes]]:
         params = PNCPUpdatedContratacoesParamsDTO(
             dataInicial=dataInicial,
             dataFinal=dataFinal,
@@ -59,7 +145,32 @@ class RawContratacaoGateway:
             tamanhoPagina=self.tamanho_pagina,
             codigoModalidadeContratacao=self.codigo_modalidade_contratacao,
         )
-        return await self.pncp_api_consulta_adapter.get_updated_contratacoes(params)
+        if self.decode_executor is None:
+            result = await self.pncp_api_consulta_adapter.get_updated_contratacoes(
+                params
+            )
+            return result, None
+        # The pool only sends back the key fields; the page bytes are kept
+        # for build_raw_contratacoes, which decodes the entries in full.
+        content = await self.pncp_api_consulta_adapter.get_updated_contratacoes_content(
+            params
+        )
+        result = await asyncio.get_running_loop().run_in_executor(
+            self.decode_executor,
+            decode_updated_contratacoes_keys,
+            content,
+            self.pncp_api_consulta_adapter.decoder,
+        )
+        return result, content
+
+    async def _get_pagina(
+        self,
+        dataInicial: YearMonthDay,
+        dataFinal: YearMonthDay,
+        pagina: NumeroPagina,
+    ) -> PNCPUpdatedContratacoesResultDTO:
+        result, _ = await self._fetch_pagina(dataInicial, dataFinal, pagina)
+        return result
 
     async def _get_num_paginas(
         self, dataInicial: YearMonthDay, dataFinal: YearMonthDay
@@ -67,85 +178,160 @@ class RawContratacaoGateway:
         result = await self._get_pagina(dataInicial, dataFinal, 1)
         return result.totalPaginas
 
-    async def _get_items(self, entry: entryDTO) -> PNCPContratacaoItemsResultDTO:
-        params = PNCPContratacaoItemsParamsDTO(
+    def _get_items_params(self, entry: entryDTO) -> PNCPContratacaoItemsParamsDTO:
+        return PNCPContratacaoItemsParamsDTO(
             cnpj=entry["orgaoEntidade"]["cnpj"],
             ano=entry["anoCompra"],
             sequencial=entry["sequencialCompra"],
         )
+
+    async def _get_items(self, entry: entryDTO) -> PNCPContratacaoItemsResultDTO:
+        params = self._get_items_params(entry)
         return await self.pncp_api_pncp_adapter.get_contratacao_items(params)
 
-    def _convert_to_raw_item_contratacao(
-        self, entry: entryDTO, numero_controle_pncp: NumeroControlePNCP
-    ) -> RawItemContratacao:
-        return RawItemContratacao(
-            numero_controle_pncp=numero_controle_pncp,
-            numero_item=entry["numeroItem"],
-            meta=entry,
-        )
+    async def _get_items_content(self, entry: entryDTO) -> bytes:
+        params = self._get_items_params(entry)
+        return await self.pncp_api_pncp_adapter.get_contratacao_items_content(params)
 
-    def _convert_to_raw_contratacao(self, entry: entryDTO):
-        numero_controle_pncp = entry["numeroControlePNCP"]
-        return RawContratacao(
-            numero_controle_pncp=numero_controle_pncp,
-            meta=entry,
-            items=[
-                self._convert_to_raw_item_contratacao(item, numero_controle_pncp)
-                for item in entry["items"]
-            ],
+    async def _build_page(
+        self,
+        pagina: NumeroPagina,
+        result: PNCPUpdatedContratacoesResultDTO,
+        page_content: Optional[bytes],
+        entries: list[entryDTO],
+        item_tasks: list[asyncio.Task],
+    ) -> RawContratacaoPage:
+        n_bytes = result._n_bytes
+        if self.decode_executor is None:
+            for entry, item_task in zip(entries, item_tasks):
+                items = item_task.result()
+                entry["items"] = items.root
+                n_bytes += items._n_bytes
+            contratacoes = [
+                self._convert_to_raw_contratacao(entry) for entry in entries
+            ]
+        else:
+            items_contents = [item_task.result() for item_task in item_tasks]
+            n_bytes += sum(len(content) for content in items_contents)
+            contratacoes = await asyncio.get_running_loop().run_in_executor(
+                self.decode_executor,
+                build_raw_contratacoes,
+                page_content,
+                [entry["numeroControlePNCP"] for entry in entries],
+                items_contents,
+                self.pncp_api_pncp_adapter.decoder,
+            )
+        return RawContratacaoPage(
+            codigo_modalidade_contratacao=self.codigo_modalidade_contratacao,
+            pagina=pagina,
+            contratacoes=contratacoes,
+            n_bytes=n_bytes,
         )
 
+    def _convert_to_raw_contratacao(self, entry: entryDTO) -> RawContratacao:
+        return convert_to_raw_contratacao(entry)
+
+    def get_limiter_snapshots(self) -> dict:
+        snapshots = {
+            "pncp_api_consulta": self.pncp_api_consulta_adapter.limiter.snapshot(),
+            "pncp_api_pncp": self.pncp_api_pncp_adapter.limiter.snapshot(),
+        }
+        # Both adapters of a modalidade draw from the same budget.
+        request_budget = self.pncp_api_pncp_adapter.request_budget
+        if request_budget is not None:
+            snapshots["request_budget"] = request_budget.snapshot(
+                self.codigo_modalidade_contratacao
+            )
+        return snapshots
+
     async def fetch_number_of_entries(
         self, dataInicial: YearMonthDay, dataFinal: YearMonthDay
     ) -> int:
         result = await self._get_pagina(dataInicial, dataFinal, 1)
         return result.totalRegistros
 
-    async def fetch_updated_contratacoes(
-        self, dataInicial: YearMonthDay, dataFinal: YearMonthDay
-    ) -> AsyncGenerator[RawContratacao, None]:
+    async def _filter_changed_entries(self, data: list[entryDTO]) -> list[entryDTO]:
+        if self.stored_versions_lookup is None or not data:
+            return data
+        stored_versions = await self.stored_versions_lookup(
+            [entry["numeroControlePNCP"] for entry in data]
+        )
+        changed = []
+        for entry in data:
+            stored_version = stored_versions.get(entry["numeroControlePNCP"])
+            version = entry.get("dataAtualizacaoGlobal")
+            if stored_version and version and stored_version >= version:
+                continue
+            changed.append(entry)
+        self.n_items_fetches_skipped += len(data) - len(changed)
+        return changed
+
+    async def _log_errors(self, fetch: Callable[[], Awaitable], description: str):
+        # Retries live in the adapters only: tenacity makes up to 3 attempts
+        # per call, 10-60s apart, and every attempt goes through the limiter,
+        # which shrinks its window and honours Retry-After on 429/5xx. So an
+        # error reaching this point is final and fails the page.
+        try:
+            return await fetch()
+        except Exception as e:
+            logger.error(f"[!] Error getting {description}: {e}")
+            raise
+
+    async def fetch_updated_contratacoes_pages(
+        self,
+        dataInicial: YearMonthDay,
+        dataFinal: YearMonthDay,
+        sink: Callable[[RawContratacaoPage], Awaitable[None]],
+        completed_paginas: frozenset[int] = frozenset(),
+    ) -> None:
 
         num_paginas = await self._get_num_paginas(dataInicial, dataFinal)
+        self.n_items_fetches_skipped = 0
 
-        semaphore = asyncio.Semaphore(self.n_workers)
-        cooldown_event = asyncio.Event()
-
-        async def fetch_page_with_semaphore(pagina: NumeroPagina):
-            async with semaphore:
-                retry_count = 0
-                while True:
-                    try:
-                        if cooldown_event.is_set():
-                            await asyncio.sleep(0)
-                            await cooldown_event.wait()
-                        result = await self._get_pagina(dataInicial, dataFinal, pagina)
-
-                        for entry in result.data:
-                            items = await self._get_items(entry)
-                            entry["items"] = items.root
-                        return result
-                    except Exception as e:
-                        logger.error(f"[!] Error getting page {pagina}: {e}")
-                        if not cooldown_event.is_set():
-                            cooldown_event.set()
-                            logger.debug(f"[*] Cooldown event set")
-                            logger.debug(f"[*] Sleeping for 180 seconds")
-                            await asyncio.sleep(180)
-                            cooldown_event.clear()
-                            logger.debug(f"[*] Cooldown event cleared")
-                        else:
-                            await cooldown_event.wait()
-                    retry_count += 1
-                    if retry_count > self.max_retries:
-                        raise e
-                    continue
-
-        tasks = [
-            fetch_page_with_semaphore(pagina) for pagina in range(1, num_paginas + 1)
+        pending_paginas = [
+            pagina
+            for pagina in range(1, num_paginas + 1)
+            if pagina not in completed_paginas
         ]
+        if completed_paginas:
+            logger.info(
+                f"[*] Skipping {num_paginas - len(pending_paginas)} pages "
+                f"already completed"
+            )
+        paginas = iter(pending_paginas)
+        item_semaphore = asyncio.Semaphore(self.n_item_workers)
+
+        get_items = (
+            self._get_items if self.decode_executor is None else self._get_items_content
+        )
+
+        async def fetch_items_with_semaphore(entry: entryDTO):
+            async with item_semaphore:
+                return await self._log_errors(
+                    lambda: get_items(entry),
+                    f"items of {entry.get('numeroControlePNCP')}",
+                )
+
+        async def fetch_page_with_items(pagina: NumeroPagina) -> RawContratacaoPage:
+            result, page_content = await self._log_errors(
+                lambda: self._fetch_pagina(dataInicial, dataFinal, pagina),
+                f"page {pagina}",
+            )
+            entries = await self._filter_changed_entries(result.data)
+            async with asyncio.TaskGroup() as tg:
+                item_tasks = [
+                    tg.create_task(fetch_items_with_semaphore(entry))
+                    for entry in entries
+                ]
+            return await self._build_page(
+                pagina, result, page_content, entries, item_tasks
+            )
+
+        async def page_worker():
+            for pagina in paginas:
+                page = await fetch_page_with_items(pagina)
+                await sink(page)
 
-        for coroutine in asyncio.as_completed(tasks):
-            result = await coroutine
-            for entry in result.data:
-                contratacao = self._convert_to_raw_contratacao(entry)
-                yield contratacao
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(min(self.n_page_workers, len(pending_paginas))):
+                tg.create_task(page_worker())
@@ -1,39 +1,53 @@
-from licitabot.infrastructure.repositories.raw_contratacao.repository import (
-    RawContratacaoRepository,
+from licitabot.application.interfaces import ReadCacheInterface
+from licitabot.infrastructure.adapters.read_cache import get_read_cache
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawContratacao as RawContratacaoModel,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawItemContratacao as RawItemContratacaoModel,
 )
-from licitabot.domain.entities import (
-    RawItemContratacao,
-    ItemContratacao,
-    RawContratacao,
-    Contratacao,
+from licitabot.infrastructure.repositories.raw_contratacao.repository import (
+    in_anos_compra,
+    any_key,
 )
+from licitabot.domain.entities import ItemContratacao, Contratacao
 from licitabot.domain.value_objects import NumeroControlePNCP
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Literal, Optional
+from sqlalchemy import Row, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Only the fields the domain objects carry are read out of meta, so a
+# lookup never transfers the raw payloads.
+OBJETO = RawContratacaoModel.meta["objetoCompra"].astext.label("objeto")
+DESCRICAO = RawItemContratacaoModel.meta["descricao"].astext.label("descricao")
+
+RangeColumn = Literal["data_atualizacao_global", "data_publicacao_pncp"]
+
 
 class ContratacaoReadOnlyRepository:
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self, session: AsyncSession, cache: Optional[ReadCacheInterface] = None
+    ):
         self.session = session
-        self.raw_contratacao_repository = RawContratacaoRepository(session)
+        # Entries are grouped by numero_controle_pncp, which is what
+        # RawContratacaoRepository invalidates on write.
+        self.cache = cache if cache is not None else get_read_cache()
 
-    def _from_raw_item_contratacao(
-        self, raw_item_contratacao: RawItemContratacao
-    ) -> ItemContratacao:
+    def _item_from_row(self, row: Row) -> ItemContratacao:
         return ItemContratacao(
-            numero_controle_pncp=raw_item_contratacao.numero_controle_pncp,
-            numero_item=raw_item_contratacao.numero_item,
-            descricao=raw_item_contratacao.meta.get("descricao"),
+            numero_controle_pncp=row.numero_controle_pncp,
+            numero_item=row.numero_item,
+            descricao=row.descricao,
         )
 
-    def _from_raw_contratacao(self, raw_contratacao: RawContratacao) -> Contratacao:
-        items = [
-            self._from_raw_item_contratacao(item) for item in raw_contratacao.items
-        ]
+    def _contratacao_from_row(
+        self, row: Row, items: list[ItemContratacao]
+    ) -> Contratacao:
         return Contratacao(
-            numero_controle_pncp=raw_contratacao.numero_controle_pncp,
-            objeto=raw_contratacao.meta.get("objetoCompra"),
+            numero_controle_pncp=row.numero_controle_pncp,
+            objeto=row.objeto,
             items=items,
         )
 
@@ -41,10 +55,152 @@ class ContratacaoReadOnlyRepository:
         self, numero_controle_pncp: NumeroControlePNCP
     ) -> Optional[Contratacao]:
 
-        raw_contratacao = await self.raw_contratacao_repository.get(
-            numero_controle_pncp
+        key = ("contratacao", numero_controle_pncp)
+        if self.cache is not None:
+            contratacao = self.cache.get(key)
+            if contratacao is not None:
+                return contratacao
+
+        result = await self.session.execute(
+            select(RawContratacaoModel.numero_controle_pncp, OBJETO).where(
+                RawContratacaoModel.numero_controle_pncp == numero_controle_pncp,
+                in_anos_compra(RawContratacaoModel.ano_compra, [numero_controle_pncp]),
+            )
         )
-        if not raw_contratacao:
+        row = result.first()
+        if not row:
             return None
 
-        return self._from_raw_contratacao(raw_contratacao)
+        items = await self.session.execute(
+            select(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+                DESCRICAO,
+            )
+            .where(
+                RawItemContratacaoModel.numero_controle_pncp == numero_controle_pncp,
+                in_anos_compra(
+                    RawItemContratacaoModel.ano_compra, [numero_controle_pncp]
+                ),
+            )
+            .order_by(RawItemContratacaoModel.numero_item)
+        )
+        contratacao = self._contratacao_from_row(
+            row, [self._item_from_row(item) for item in items.all()]
+        )
+        if self.cache is not None:
+            self.cache.set(key, contratacao, numero_controle_pncp)
+        return contratacao
+
+    async def _get_items(
+        self, numeros_controle_pncp: list[NumeroControlePNCP], chunk_size: int = 1000
+    ) -> Dict[NumeroControlePNCP, list[ItemContratacao]]:
+        items: Dict[NumeroControlePNCP, list[ItemContratacao]] = {
+            numero_controle_pncp: [] for numero_controle_pncp in numeros_controle_pncp
+        }
+        if not numeros_controle_pncp:
+            return items
+        # Server-side cursor: rows arrive chunk_size at a time, however many
+        # items the contratacoes have.
+        result = await self.session.stream(
+            select(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+                DESCRICAO,
+            )
+            .where(
+                any_key(
+                    RawItemContratacaoModel.numero_controle_pncp,
+                    numeros_controle_pncp,
+                ),
+                in_anos_compra(
+                    RawItemContratacaoModel.ano_compra, numeros_controle_pncp
+                ),
+            )
+            .order_by(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+            )
+            .execution_options(yield_per=chunk_size)
+        )
+        async for row in result:
+            items[row.numero_controle_pncp].append(self._item_from_row(row))
+        return items
+
+    async def get_many(
+        self, numeros_controle_pncp: list[NumeroControlePNCP]
+    ) -> Dict[NumeroControlePNCP, Contratacao]:
+        contratacoes: Dict[NumeroControlePNCP, Contratacao] = {}
+        misses = []
+        for numero_controle_pncp in dict.fromkeys(numeros_controle_pncp):
+            contratacao = None
+            if self.cache is not None:
+                contratacao = self.cache.get(("contratacao", numero_controle_pncp))
+            if contratacao is None:
+                misses.append(numero_controle_pncp)
+            else:
+                contratacoes[numero_controle_pncp] = contratacao
+        if not misses:
+            return contratacoes
+
+        numeros_controle_pncp = misses
+        result = await self.session.execute(
+            select(RawContratacaoModel.numero_controle_pncp, OBJETO).where(
+                any_key(
+                    RawContratacaoModel.numero_controle_pncp, numeros_controle_pncp
+                ),
+                in_anos_compra(RawContratacaoModel.ano_compra, numeros_controle_pncp),
+            )
+        )
+        rows = result.all()
+        items = await self._get_items([row.numero_controle_pncp for row in rows])
+        for row in rows:
+            contratacao = self._contratacao_from_row(
+                row, items[row.numero_controle_pncp]
+            )
+            contratacoes[row.numero_controle_pncp] = contratacao
+            if self.cache is not None:
+                self.cache.set(
+                    ("contratacao", row.numero_controle_pncp),
+                    contratacao,
+                    row.numero_controle_pncp,
+                )
+        return contratacoes
+
+    async def iter_range(
+        self,
+        data_inicial: datetime,
+        data_final: datetime,
+        column: RangeColumn = "data_atualizacao_global",
+        chunk_size: int = 500,
+    ) -> AsyncIterator[list[Contratacao]]:
+        # Bypasses the cache: a full walk would only evict the hot entries.
+        # Keyset pagination on (column, numero_controle_pncp), which has a
+        # composite index: each chunk merges per-partition index scans that
+        # start after the last row of the previous one, so the cost per chunk
+        # stays flat however deep the walk goes.
+        range_column = getattr(RawContratacaoModel, column)
+        keyset = tuple_(range_column, RawContratacaoModel.numero_controle_pncp)
+        statement = (
+            select(RawContratacaoModel.numero_controle_pncp, range_column, OBJETO)
+            .where(
+                range_column >= data_inicial.replace(tzinfo=None),
+                range_column < data_final.replace(tzinfo=None),
+            )
+            .order_by(range_column, RawContratacaoModel.numero_controle_pncp)
+            .limit(chunk_size)
+        )
+        after = None
+        while True:
+            page = statement if after is None else statement.where(keyset > after)
+            rows = (await self.session.execute(page)).all()
+            if not rows:
+                return
+            items = await self._get_items([row.numero_controle_pncp for row in rows])
+            yield [
+                self._contratacao_from_row(row, items[row.numero_controle_pncp])
+                for row in rows
+            ]
+            if len(rows) < chunk_size:
+                return
+            after = (rows[-1][1], rows[-1].numero_controle_pncp)
@@ -0,0 +1,59 @@
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from licitabot.application.interfaces import IngestionCheckpointRepositoryInterface
+from licitabot.domain.value_objects import CodigoModalidadeContratacao, YearMonthDay
+from licitabot.infrastructure.execution_tracker.models import IngestionCheckpoint
+
+
+class IngestionCheckpointRepository(IngestionCheckpointRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_completed_pages(
+        self,
+        execution_id: UUID,
+        data_inicial: YearMonthDay,
+        data_final: YearMonthDay,
+        codigo_modalidade_contratacao: CodigoModalidadeContratacao,
+    ) -> set[int]:
+        result = await self.session.execute(
+            select(IngestionCheckpoint.pagina).where(
+                IngestionCheckpoint.execution_id == execution_id,
+                IngestionCheckpoint.data_inicial == data_inicial,
+                IngestionCheckpoint.data_final == data_final,
+                IngestionCheckpoint.codigo_modalidade_contratacao
+                == codigo_modalidade_contratacao,
+            )
+        )
+        return set(result.scalars().all())
+
+    async def add_completed_pages(
+        self,
+        execution_id: UUID,
+        data_inicial: YearMonthDay,
+        data_final: YearMonthDay,
+        codigo_modalidade_contratacao: CodigoModalidadeContratacao,
+        paginas: list[int],
+    ) -> None:
+        if not paginas:
+            return
+        await self.session.execute(
+            pg_insert(IngestionCheckpoint)
+            .values(
+                [
+                    {
+                        "execution_id": execution_id,
+                        "data_inicial": data_inicial,
+                        "data_final": data_final,
+                        "codigo_modalidade_contratacao": codigo_modalidade_contratacao,
+                        "pagina": pagina,
+                    }
+                    for pagina in paginas
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
@@ -1,9 +1,21 @@
 from licitabot.infrastructure.repositories.contratacao.repository import (
+    DESCRICAO,
     ContratacaoReadOnlyRepository,
+    RangeColumn,
 )
-from licitabot.domain.entities import ItemContratacao, Contratacao
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawItemContratacao as RawItemContratacaoModel,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.repository import (
+    in_anos_compra,
+)
+from licitabot.domain.entities import ItemContratacao
 from licitabot.domain.value_objects import NumeroControlePNCP
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import select, tuple_
+
+ItemKey = tuple[NumeroControlePNCP, int]
 
 
 class ItemContratacaoReadOnlyRepository(ContratacaoReadOnlyRepository):
@@ -11,18 +23,84 @@ class ItemContratacaoReadOnlyRepository(ContratacaoReadOnlyRepository):
     async def get(
         self, numero_controle_pncp: NumeroControlePNCP, numero_item: int
     ) -> Optional[ItemContratacao]:
-        contratacao = await super().get(numero_controle_pncp)
-        if not contratacao:
-            return None
-        item = self._find_item(contratacao, numero_item)
-        if not item:
+        key = ("item", numero_controle_pncp, numero_item)
+        if self.cache is not None:
+            item = self.cache.get(key)
+            if item is not None:
+                return item
+
+        # A primary key lookup, instead of loading the whole contratacao.
+        result = await self.session.execute(
+            select(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+                DESCRICAO,
+            ).where(
+                RawItemContratacaoModel.numero_controle_pncp == numero_controle_pncp,
+                in_anos_compra(
+                    RawItemContratacaoModel.ano_compra, [numero_controle_pncp]
+                ),
+                RawItemContratacaoModel.numero_item == numero_item,
+            )
+        )
+        row = result.first()
+        if not row:
             return None
+        item = self._item_from_row(row)
+        if self.cache is not None:
+            self.cache.set(key, item, numero_controle_pncp)
         return item
 
-    def _find_item(
-        self, contratacao: Contratacao, numero_item: int
-    ) -> Optional[ItemContratacao]:
-        return next(
-            (item for item in contratacao.items if item.numero_item == numero_item),
-            None,
+    async def get_many(self, keys: list[ItemKey]) -> Dict[ItemKey, ItemContratacao]:
+        items: Dict[ItemKey, ItemContratacao] = {}
+        misses = []
+        for key in dict.fromkeys(keys):
+            item = None
+            if self.cache is not None:
+                item = self.cache.get(("item", *key))
+            if item is None:
+                misses.append(key)
+            else:
+                items[key] = item
+        if not misses:
+            return items
+
+        keys = misses
+        result = await self.session.execute(
+            select(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+                DESCRICAO,
+            ).where(
+                tuple_(
+                    RawItemContratacaoModel.numero_controle_pncp,
+                    RawItemContratacaoModel.numero_item,
+                ).in_(keys),
+                in_anos_compra(
+                    RawItemContratacaoModel.ano_compra, [key for key, _ in keys]
+                ),
+            )
         )
+        for row in result.all():
+            item = self._item_from_row(row)
+            items[(row.numero_controle_pncp, row.numero_item)] = item
+            if self.cache is not None:
+                self.cache.set(
+                    ("item", row.numero_controle_pncp, row.numero_item),
+                    item,
+                    row.numero_controle_pncp,
+                )
+        return items
+
+    async def iter_range(
+        self,
+        data_inicial: datetime,
+        data_final: datetime,
+        column: RangeColumn = "data_atualizacao_global",
+        chunk_size: int = 500,
+    ) -> AsyncIterator[list[ItemContratacao]]:
+        # Chunks hold the items of chunk_size contratacoes.
+        async for contratacoes in super().iter_range(
+            data_inicial, data_final, column, chunk_size
+        ):
+            yield [item for contratacao in contratacoes for item in contratacao.items]
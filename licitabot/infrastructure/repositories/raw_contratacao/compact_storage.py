@@ -0,0 +1,249 @@
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import zstandard
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    CompressionDictionary as CompressionDictionaryModel,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawContratacao as RawContratacaoModel,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawItemContratacao as RawItemContratacaoModel,
+)
+from licitabot.settings import CompactStorageSettings, settings
+
+logger = logging.getLogger("licitabot")
+
+# What stays in meta in compact mode: the fields read by the projection
+# queries. Only these are left for the meta GIN indexes, so a containment
+# query on any other field never matches a compact row; expand the rows
+# first if such queries must see them.
+CONTRATACAO_META_FIELDS = ("objetoCompra", "dataAtualizacaoGlobal")
+ITEM_META_FIELDS = ("descricao",)
+
+NO_DICTIONARY = 0
+# How long a lookup that found no dictionary is trusted before writers ask
+# the database again.
+NO_DICTIONARY_TTL = 300.0
+
+
+def _dumps(meta: Dict[str, Any]) -> bytes:
+    return json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def slim_meta(meta: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    return {field: meta[field] for field in fields if field in meta}
+
+
+class PayloadCodec:
+
+    def __init__(self, level: int, no_dictionary_ttl: float = NO_DICTIONARY_TTL):
+        self.level = level
+        self.no_dictionary_ttl = no_dictionary_ttl
+        self.current_dict_id = NO_DICTIONARY
+        self._no_dictionary_until = 0.0
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressors = {NO_DICTIONARY: zstandard.ZstdDecompressor()}
+        self._warned = False
+
+    @classmethod
+    def from_settings(cls, storage_settings: CompactStorageSettings) -> "PayloadCodec":
+        return cls(level=storage_settings.level)
+
+    def add_dictionary(self, data: bytes, current: bool = False) -> int:
+        dictionary = zstandard.ZstdCompressionDict(data)
+        dict_id = dictionary.dict_id()
+        self._decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        if current:
+            self.current_dict_id = dict_id
+            self._compressor = zstandard.ZstdCompressor(
+                level=self.level, dict_data=dictionary
+            )
+        return dict_id
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(CompressionDictionaryModel.data).order_by(
+                CompressionDictionaryModel.created_at
+            )
+        )
+        rows = result.scalars().all()
+        for i, data in enumerate(rows):
+            self.add_dictionary(data, current=i == len(rows) - 1)
+
+    async def ensure_dictionaries(
+        self, session: AsyncSession, blobs: Iterable[bytes]
+    ) -> None:
+        # Another process may have trained a newer dictionary since the last
+        # load; frames name the dictionary they need.
+        needed = {zstandard.get_frame_parameters(blob).dict_id for blob in blobs}
+        if needed - self._decompressors.keys():
+            await self.load(session)
+        missing = needed - self._decompressors.keys()
+        if missing:
+            raise ValueError(f"Unknown compression dictionaries {sorted(missing)}")
+
+    async def ensure_compressor(self, session: AsyncSession) -> None:
+        # Until a dictionary exists this runs for every write batch, so a miss
+        # is remembered for a while; train() in this process installs its
+        # dictionary directly, and one trained elsewhere is seen after the TTL.
+        if self.current_dict_id != NO_DICTIONARY:
+            return
+        if time.monotonic() < self._no_dictionary_until:
+            return
+        await self.load(session)
+        if self.current_dict_id == NO_DICTIONARY:
+            self._no_dictionary_until = time.monotonic() + self.no_dictionary_ttl
+        if self.current_dict_id == NO_DICTIONARY and not self._warned:
+            self._warned = True
+            logger.warning(
+                "[!] No compression dictionary trained yet, compressing without "
+                "one; run licitabot-compact-storage train"
+            )
+
+    def compress(self, meta: Dict[str, Any]) -> bytes:
+        return self.compress_json(_dumps(meta))
+
+    def compress_json(self, document: bytes) -> bytes:
+        return self._compressor.compress(document)
+
+    def decompress(self, blob: bytes) -> Dict[str, Any]:
+        dict_id = zstandard.get_frame_parameters(blob).dict_id
+        return json.loads(self._decompressors[dict_id].decompress(blob))
+
+    def train(self, samples: list[Dict[str, Any]], dictionary_size: int) -> bytes:
+        dictionary = zstandard.train_dictionary(
+            dictionary_size, [_dumps(sample) for sample in samples]
+        )
+        return dictionary.as_bytes()
+
+
+payload_codec = PayloadCodec.from_settings(settings.compact_storage)
+
+
+class CompactStorageBackfill:
+
+    def __init__(self, session: AsyncSession, codec: PayloadCodec = payload_codec):
+        self.session = session
+        self.codec = codec
+
+    async def train(
+        self,
+        n_samples: int = settings.compact_storage.n_training_samples,
+        dictionary_size: int = settings.compact_storage.dictionary_size,
+    ) -> int:
+        samples = []
+        for model in (RawContratacaoModel, RawItemContratacaoModel):
+            # Only rows still stored in full are usable samples.
+            result = await self.session.execute(
+                select(model.meta)
+                .where(model.meta_zstd.is_(None), model.meta.is_not(None))
+                .limit(n_samples)
+            )
+            samples += result.scalars().all()
+        if not samples:
+            raise ValueError("No uncompressed rows to train a dictionary on")
+
+        data = self.codec.train(samples, dictionary_size)
+        dict_id = self.codec.add_dictionary(data, current=True)
+        self.session.add(CompressionDictionaryModel(dict_id=dict_id, data=data))
+        await self.session.commit()
+        logger.info(
+            f"[*] Trained dictionary {dict_id} ({len(data)} bytes) "
+            f"on {len(samples)} samples"
+        )
+        return dict_id
+
+    def _converted_row(
+        self, row, primary_key: tuple, fields: tuple[str, ...], compact: bool
+    ) -> dict:
+        key = {column.key: value for column, value in zip(primary_key, row)}
+        if compact:
+            return {
+                **key,
+                "meta": slim_meta(row.meta, fields),
+                "meta_zstd": self.codec.compress(row.meta),
+            }
+        return {**key, "meta": self.codec.decompress(row.meta_zstd), "meta_zstd": None}
+
+    async def _convert(
+        self,
+        model,
+        primary_key: tuple,
+        fields: tuple[str, ...],
+        compact: bool,
+        batch_size: int,
+    ) -> int:
+        pending = model.meta_zstd.is_(None) if compact else model.meta_zstd.is_not(None)
+        n_rows = 0
+        after: Optional[tuple] = None
+        while True:
+            # Keyset over the primary key, so each batch starts where the
+            # previous one stopped instead of rescanning converted rows.
+            statement = (
+                select(*primary_key, model.meta, model.meta_zstd)
+                .where(pending, model.meta.is_not(None))
+                .order_by(*primary_key)
+                .limit(batch_size)
+            )
+            if after is not None:
+                statement = statement.where(tuple_(*primary_key) > after)
+            rows = (await self.session.execute(statement)).all()
+            if not rows:
+                return n_rows
+            if not compact:
+                await self.codec.ensure_dictionaries(
+                    self.session, [row.meta_zstd for row in rows]
+                )
+            await self.session.execute(
+                update(model),
+                [
+                    self._converted_row(row, primary_key, fields, compact)
+                    for row in rows
+                ],
+            )
+            await self.session.commit()
+            n_rows += len(rows)
+            after = tuple(rows[-1])[: len(primary_key)]
+            logger.info(f"[*] Converted {n_rows} rows of {model.__tablename__}")
+
+    async def _convert_all(self, compact: bool, batch_size: int) -> dict:
+        n_contratacoes = await self._convert(
+            RawContratacaoModel,
+            (RawContratacaoModel.ano_compra, RawContratacaoModel.numero_controle_pncp),
+            CONTRATACAO_META_FIELDS,
+            compact,
+            batch_size,
+        )
+        n_items = await self._convert(
+            RawItemContratacaoModel,
+            (
+                RawItemContratacaoModel.ano_compra,
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+            ),
+            ITEM_META_FIELDS,
+            compact,
+            batch_size,
+        )
+        return {"n_contratacoes": n_contratacoes, "n_items": n_items}
+
+    async def backfill(self, batch_size: int = 1000) -> dict:
+        await self.codec.ensure_compressor(self.session)
+        counts = await self._convert_all(compact=True, batch_size=batch_size)
+        logger.info(
+            "[*] Backfill done; run VACUUM FULL or pg_repack on the tables to "
+            "return the freed space to the OS"
+        )
+        return counts
+
+    async def expand(self, batch_size: int = 1000) -> dict:
+        # Back to full JSONB rows, e.g. before downgrading past the migration
+        # that added meta_zstd.
+        return await self._convert_all(compact=False, batch_size=batch_size)
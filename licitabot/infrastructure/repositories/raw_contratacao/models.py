@@ -1,4 +1,14 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    TIMESTAMP,
+    Column,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -8,19 +18,88 @@ from licitabot.infrastructure.database.base import Base
 class RawContratacao(Base):
     __tablename__ = "contratacoes"
     numero_controle_pncp = Column(String, primary_key=True)
+    # Partition key, taken from the year suffix of numero_controle_pncp so
+    # that any lookup by key can be pruned to a single partition.
+    ano_compra = Column(Integer, primary_key=True)
     meta = Column(JSONB)
+    # Compact storage: the full payload, zstd-compressed, while meta keeps
+    # only the fields queries read.
+    meta_zstd = Column(LargeBinary, nullable=True)
+    meta_hash = Column(String)
+    data_atualizacao_global = Column(TIMESTAMP(timezone=False))
+    orgao_cnpj = Column(String(14), index=True)
+    data_publicacao_pncp = Column(TIMESTAMP(timezone=False))
 
     items = relationship(
         "RawItemContratacao", back_populates="contratacao", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Covers the newer-wins lookup, so it never reads the meta document.
+        Index(
+            "ix_contratacoes_numero_controle_pncp_version",
+            "numero_controle_pncp",
+            "ano_compra",
+            postgresql_include=["data_atualizacao_global"],
+        ),
+        # Keyset order of ContratacaoRepository.iter_range; they also serve
+        # plain range filters on the date.
+        Index(
+            "ix_contratacoes_data_atualizacao_global_numero_controle_pncp",
+            "data_atualizacao_global",
+            "numero_controle_pncp",
+        ),
+        Index(
+            "ix_contratacoes_data_publicacao_pncp_numero_controle_pncp",
+            "data_publicacao_pncp",
+            "numero_controle_pncp",
+        ),
+        # Compact rows keep only CONTRATACAO_META_FIELDS in meta, so this
+        # index only matches them on those fields.
+        Index(
+            "ix_contratacoes_meta_gin",
+            "meta",
+            postgresql_using="gin",
+            postgresql_ops={"meta": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (ano_compra)"},
+    )
+
 
 class RawItemContratacao(Base):
     __tablename__ = "item_contratacoes"
-    numero_controle_pncp = Column(
-        String, ForeignKey("contratacoes.numero_controle_pncp"), primary_key=True
-    )
+    numero_controle_pncp = Column(String, primary_key=True)
+    ano_compra = Column(Integer, primary_key=True)
     numero_item = Column(Integer, primary_key=True)
     meta = Column(JSONB)
+    meta_zstd = Column(LargeBinary, nullable=True)
+    meta_hash = Column(String)
 
     contratacao = relationship("RawContratacao", back_populates="items")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["numero_controle_pncp", "ano_compra"],
+            ["contratacoes.numero_controle_pncp", "contratacoes.ano_compra"],
+        ),
+        # Likewise, only ITEM_META_FIELDS for compact items.
+        Index(
+            "ix_item_contratacoes_meta_gin",
+            "meta",
+            postgresql_using="gin",
+            postgresql_ops={"meta": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (ano_compra)"},
+    )
+
+
+class CompressionDictionary(Base):
+    __tablename__ = "compression_dictionaries"
+    # The id zstd writes into every frame compressed with the dictionary.
+    dict_id = Column(Integer, primary_key=True, autoincrement=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,135 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from licitabot.domain.services import time_service
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawContratacao as RawContratacaoModel,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.models import (
+    RawItemContratacao as RawItemContratacaoModel,
+)
+
+logger = logging.getLogger("licitabot")
+
+# Parents come first. The foreign key is declared between the parent
+# tables, item_contratacoes to contratacoes, and each partition inherits it.
+PARTITIONED_TABLES = (
+    RawContratacaoModel.__tablename__,
+    RawItemContratacaoModel.__tablename__,
+)
+
+LIST_PARTITIONS_SQL = """
+SELECT
+    parent.relname AS table_name,
+    child.relname AS partition_name,
+    pg_get_expr(child.relpartbound, child.oid) AS bound,
+    child.reltuples::bigint AS n_rows_estimate
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = ANY(:tables)
+ORDER BY parent.relname, child.relname
+"""
+
+# Foreign keys a table still holds to the partitioned tables, which is what
+# a detached item partition keeps of the inherited one.
+FOREIGN_KEYS_SQL = """
+SELECT pg_constraint.conname
+FROM pg_constraint
+JOIN pg_class referenced ON referenced.oid = pg_constraint.confrelid
+WHERE pg_constraint.conrelid = to_regclass(:name)
+    AND pg_constraint.contype = 'f'
+    AND referenced.relname = ANY(:tables)
+"""
+
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+class RawContratacaoPartitionManager:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_partitions(self) -> list[dict]:
+        result = await self.session.execute(
+            text(LIST_PARTITIONS_SQL),
+            {"tables": list(PARTITIONED_TABLES)},
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def _partition_exists(self, name: str) -> bool:
+        result = await self.session.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+        )
+        return result.scalar_one()
+
+    async def _drop_foreign_keys(self, name: str) -> None:
+        result = await self.session.execute(
+            text(FOREIGN_KEYS_SQL), {"name": name, "tables": list(PARTITIONED_TABLES)}
+        )
+        for constraint in result.scalars().all():
+            await self.session.execute(
+                text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+            )
+
+    async def ensure_year(self, year: int) -> list[str]:
+        created = []
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, year)
+            if await self._partition_exists(name):
+                continue
+            # Postgres refuses to attach a range whose rows already sit in
+            # the default partition; fail with a clear message instead.
+            default = default_partition_name(table)
+            if await self._partition_exists(default):
+                result = await self.session.execute(
+                    text(f"SELECT 1 FROM {default} WHERE ano_compra = :year LIMIT 1"),
+                    {"year": year},
+                )
+                if result.first() is not None:
+                    raise ValueError(
+                        f"{default} holds rows for {year}; move them out before "
+                        f"creating {name}"
+                    )
+            await self.session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ({year}) TO ({year + 1})"
+                )
+            )
+            created.append(name)
+            logger.info(f"[*] Created partition {name}")
+        await self.session.commit()
+        return created
+
+    async def ensure_years_ahead(self, n_years: int = 1) -> list[str]:
+        current_year = time_service.get_datetime_now().year
+        created = []
+        for year in range(current_year, current_year + n_years + 1):
+            created += await self.ensure_year(year)
+        return created
+
+    async def detach_year(self, year: int) -> list[str]:
+        detached = []
+        # Children first. A detached item partition keeps the foreign key to
+        # contratacoes as a standalone constraint, which would still point at
+        # the rows being detached next, so it is dropped.
+        for table in reversed(PARTITIONED_TABLES):
+            name = partition_name(table, year)
+            if not await self._partition_exists(name):
+                continue
+            await self.session.execute(
+                text(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            )
+            await self._drop_foreign_keys(name)
+            detached.append(name)
+            logger.info(f"[*] Detached partition {name}")
+        await self.session.commit()
+        return detached
@@ -1,23 +1,247 @@
-from typing import Optional
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
 
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from licitabot.application.interfaces import RawContratacaoRepositoryInterface
+from licitabot.application.interfaces import (
+    RawContratacaoRepositoryInterface,
+    ReadCacheInterface,
+)
 from licitabot.domain.entities import RawContratacao, RawItemContratacao
 from licitabot.domain.value_objects import NumeroControlePNCP
+from licitabot.infrastructure.adapters.read_cache import get_read_cache
+from licitabot.infrastructure.database.raw_json import RawJSON, serialize_json
+from licitabot.infrastructure.repositories.raw_contratacao.compact_storage import (
+    CONTRATACAO_META_FIELDS,
+    ITEM_META_FIELDS,
+    PayloadCodec,
+    payload_codec,
+    slim_meta,
+)
 from licitabot.infrastructure.repositories.raw_contratacao.models import (
     RawContratacao as RawContratacaoModel,
 )
 from licitabot.infrastructure.repositories.raw_contratacao.models import (
     RawItemContratacao as RawItemContratacaoModel,
 )
+from licitabot.settings import settings
+
+CONTRATACOES_TABLE = RawContratacaoModel.__tablename__
+ITEM_CONTRATACOES_TABLE = RawItemContratacaoModel.__tablename__
+CONTRATACOES_STAGING_TABLE = f"{CONTRATACOES_TABLE}_staging"
+ITEM_CONTRATACOES_STAGING_TABLE = f"{ITEM_CONTRATACOES_TABLE}_staging"
+
+HOT_COLUMNS = (
+    "data_atualizacao_global",
+    "orgao_cnpj",
+    "data_publicacao_pncp",
+)
+# Everything an upsert overwrites.
+STORED_COLUMNS = ("meta", "meta_zstd", "meta_hash", *HOT_COLUMNS)
+
+
+def inserted_row(table: str, key_columns: tuple[str, ...]) -> str:
+    # For the RETURNING of an upsert into table. xmax cannot be read back from
+    # a partitioned table, but a subquery in RETURNING sees the table as it
+    # was before the statement, so only updated rows are found there.
+    conditions = " AND ".join(
+        f"stored.{column} = {table}.{column}" for column in key_columns
+    )
+    return f"NOT EXISTS (SELECT 1 FROM {table} AS stored WHERE {conditions})"
+
+
+CONTRATACAO_INSERTED = inserted_row(
+    CONTRATACOES_TABLE, ("numero_controle_pncp", "ano_compra")
+)
+ITEM_CONTRATACAO_INSERTED = inserted_row(
+    ITEM_CONTRATACOES_TABLE, ("numero_controle_pncp", "ano_compra", "numero_item")
+)
+
+COPY_MERGE_TEMPLATE = f"""
+WITH merged AS (
+    INSERT INTO {CONTRATACOES_TABLE}
+        (numero_controle_pncp, ano_compra, {", ".join(STORED_COLUMNS)})
+    SELECT numero_controle_pncp, ano_compra, {", ".join(STORED_COLUMNS)}
+    FROM {CONTRATACOES_STAGING_TABLE}
+    ORDER BY numero_controle_pncp
+    ON CONFLICT (numero_controle_pncp, ano_compra) DO UPDATE SET
+        {", ".join(f"{column} = EXCLUDED.{column}" for column in STORED_COLUMNS)}
+    WHERE {CONTRATACOES_TABLE}.meta_hash IS DISTINCT FROM EXCLUDED.meta_hash
+    {{newer}}
+    RETURNING numero_controle_pncp, ano_compra, {CONTRATACAO_INSERTED} AS inserted
+),
+deleted_items AS (
+    DELETE FROM {ITEM_CONTRATACOES_TABLE} AS item
+    USING merged
+    WHERE item.numero_controle_pncp = merged.numero_controle_pncp
+    AND item.ano_compra = merged.ano_compra
+    AND NOT EXISTS (
+        SELECT 1 FROM {ITEM_CONTRATACOES_STAGING_TABLE} AS staging
+        WHERE staging.numero_controle_pncp = item.numero_controle_pncp
+        AND staging.numero_item = item.numero_item
+    )
+    RETURNING 1
+),
+upserted_items AS (
+    INSERT INTO {ITEM_CONTRATACOES_TABLE}
+        (numero_controle_pncp, ano_compra, numero_item, meta, meta_zstd, meta_hash)
+    SELECT
+        staging.numero_controle_pncp,
+        staging.ano_compra,
+        staging.numero_item,
+        staging.meta,
+        staging.meta_zstd,
+        staging.meta_hash
+    FROM {ITEM_CONTRATACOES_STAGING_TABLE} AS staging
+    JOIN merged USING (numero_controle_pncp, ano_compra)
+    ON CONFLICT (numero_controle_pncp, ano_compra, numero_item)
+    DO UPDATE SET
+        meta = EXCLUDED.meta,
+        meta_zstd = EXCLUDED.meta_zstd,
+        meta_hash = EXCLUDED.meta_hash
+    WHERE {ITEM_CONTRATACOES_TABLE}.meta_hash IS DISTINCT FROM EXCLUDED.meta_hash
+    RETURNING {ITEM_CONTRATACAO_INSERTED} AS inserted
+)
+SELECT
+    merged.numero_controle_pncp,
+    merged.inserted,
+    (SELECT count(*) FROM upserted_items WHERE inserted) AS n_items_inserted,
+    (SELECT count(*) FROM upserted_items WHERE NOT inserted) AS n_items_updated,
+    (SELECT count(*) FROM deleted_items) AS n_items_deleted
+FROM merged
+"""
+
+COPY_MERGE_SQL = COPY_MERGE_TEMPLATE.format(
+    newer=f"""AND ({CONTRATACOES_TABLE}.data_atualizacao_global IS NULL
+    OR EXCLUDED.data_atualizacao_global IS NULL
+    OR {CONTRATACOES_TABLE}.data_atualizacao_global
+        < EXCLUDED.data_atualizacao_global)"""
+)
+COPY_MERGE_FORCE_SQL = COPY_MERGE_TEMPLATE.format(newer="")
+
+ITEM_DELETE_CHUNK_SIZE = 1000
+# asyncpg refuses statements with more bind parameters than this.
+MAX_BIND_PARAMETERS = 32767
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def ano_compra(numero_controle_pncp: str) -> Optional[int]:
+    try:
+        return NumeroControlePNCP(numero_controle_pncp).ano
+    except ValueError:
+        return None
+
+
+def any_key(column, numeros_controle_pncp: list[NumeroControlePNCP]) -> ColumnElement:
+    # A single array parameter, so the statement text (and its prepared plan)
+    # does not change with the number of keys.
+    return column == any_(
+        bindparam(None, list(numeros_controle_pncp), type_=ARRAY(String))
+    )
+
+
+def in_anos_compra(column, numeros_controle_pncp: Iterable[str]) -> ColumnElement:
+    # Pins a lookup to the partitions of its keys. A key whose year cannot be
+    # parsed leaves the lookup unpruned, so it still finds (or misses) the
+    # row the way a plain key lookup would.
+    anos = {ano_compra(key) for key in numeros_controle_pncp}
+    if None in anos:
+        return true()
+    return column.in_(sorted(anos))
+
+
+def hot_columns(meta: Dict[str, Any]) -> Dict[str, Any]:
+    orgao_entidade = meta.get("orgaoEntidade") or {}
+    return {
+        "data_atualizacao_global": _parse_timestamp(meta.get("dataAtualizacaoGlobal")),
+        "orgao_cnpj": orgao_entidade.get("cnpj"),
+        "data_publicacao_pncp": _parse_timestamp(meta.get("dataPublicacaoPncp")),
+    }
 
 
 class RawContratacaoRepository(RawContratacaoRepositoryInterface):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: Optional[ReadCacheInterface] = None,
+        compact: Optional[bool] = None,
+        codec: Optional[PayloadCodec] = None,
+    ):
         self.session = session
+        self.item_counts = {"inserted": 0, "updated": 0, "deleted": 0}
+        # unchanged: not rewritten, because the stored version had the same
+        # content hash or was newer.
+        self.contratacao_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self.cache = cache if cache is not None else get_read_cache()
+        self._written: set[NumeroControlePNCP] = set()
+        # Compact rows are always readable; compact only decides how new
+        # rows are written.
+        if compact is None:
+            compact = settings.compact_storage.enabled
+        self.compact = compact
+        self.codec = codec if codec is not None else payload_codec
+
+    async def _prepare_write(self) -> None:
+        if self.compact:
+            await self.codec.ensure_compressor(self.session)
+
+    def _stored_meta(
+        self, entity: RawContratacao | RawItemContratacao, fields: tuple[str, ...]
+    ) -> Dict[str, Any]:
+        # Passthrough entities carry their original JSON, which goes to
+        # Postgres (or to the compressor) as is; meta only has key fields.
+        if self.compact:
+            if entity.meta_json is None:
+                meta_zstd = self.codec.compress(entity.meta)
+            else:
+                meta_zstd = self.codec.compress_json(entity.meta_json)
+            return {"meta": slim_meta(entity.meta, fields), "meta_zstd": meta_zstd}
+        if entity.meta_json is None:
+            return {"meta": entity.meta, "meta_zstd": None}
+        return {"meta": RawJSON(entity.meta_json.decode()), "meta_zstd": None}
+
+    def _load_meta(self, model) -> Dict[str, Any]:
+        if model.meta_zstd is not None:
+            return self.codec.decompress(model.meta_zstd)
+        if isinstance(model.meta, RawJSON):
+            # Written in this session and not reloaded yet.
+            return json.loads(model.meta)
+        return model.meta
+
+    def _invalidate(self, numeros_controle_pncp: Iterable[NumeroControlePNCP]) -> None:
+        if self.cache is None:
+            return
+        for numero_controle_pncp in numeros_controle_pncp:
+            self.cache.invalidate(numero_controle_pncp)
+            self._written.add(numero_controle_pncp)
 
     async def get(
         self, numero_controle_pncp: NumeroControlePNCP
@@ -25,6 +249,13 @@ class RawContratacaoRepository(RawContratacaoRepositoryInterface):
         result = await self._get_orm(numero_controle_pncp)
         if not result:
             return None
+        blobs = [
+            model.meta_zstd
+            for model in (result, *result.items)
+            if model.meta_zstd is not None
+        ]
+        if blobs:
+            await self.codec.ensure_dictionaries(self.session, blobs)
         return self._from_orm(result)
 
     async def _get_orm(
@@ -33,78 +264,385 @@ class RawContratacaoRepository(RawContratacaoRepositoryInterface):
         result = await self.session.execute(
             select(RawContratacaoModel)
             .options(selectinload(RawContratacaoModel.items))
-            .where(RawContratacaoModel.numero_controle_pncp == numero_controle_pncp)
+            .where(
+                RawContratacaoModel.numero_controle_pncp == numero_controle_pncp,
+                in_anos_compra(RawContratacaoModel.ano_compra, [numero_controle_pncp]),
+            )
         )
         return result.scalar_one_or_none()
 
+    async def get_updated_dates(
+        self, numeros_controle_pncp: list[NumeroControlePNCP]
+    ) -> Dict[NumeroControlePNCP, Optional[str]]:
+        if not numeros_controle_pncp:
+            return {}
+        result = await self.session.execute(
+            select(
+                RawContratacaoModel.numero_controle_pncp,
+                RawContratacaoModel.data_atualizacao_global,
+            ).where(
+                RawContratacaoModel.numero_controle_pncp.in_(numeros_controle_pncp),
+                in_anos_compra(RawContratacaoModel.ano_compra, numeros_controle_pncp),
+            )
+        )
+        return {
+            numero_controle_pncp: updated_date.isoformat() if updated_date else None
+            for numero_controle_pncp, updated_date in result.all()
+        }
+
     def _from_orm(self, model: RawContratacaoModel) -> RawContratacao:
         return RawContratacao(
             numero_controle_pncp=model.numero_controle_pncp,
-            meta=model.meta,
+            meta=self._load_meta(model),
             items=[self._from_orm_item(item) for item in model.items],
+            content_hash=model.meta_hash,
         )
 
     def _from_orm_item(self, model: RawItemContratacaoModel) -> RawItemContratacao:
         return RawItemContratacao(
             numero_controle_pncp=model.numero_controle_pncp,
             numero_item=model.numero_item,
-            meta=model.meta,
+            meta=self._load_meta(model),
+            content_hash=model.meta_hash,
         )
 
     def _to_orm(self, entity: RawContratacao) -> RawContratacaoModel:
         return RawContratacaoModel(
-            numero_controle_pncp=entity.numero_controle_pncp,
-            meta=entity.meta,
             items=[self._to_orm_item(item) for item in entity.items],
+            **self._to_row(entity),
         )
 
+    def _to_row(self, entity: RawContratacao) -> dict:
+        return {
+            "numero_controle_pncp": entity.numero_controle_pncp,
+            "ano_compra": ano_compra(entity.numero_controle_pncp),
+            **self._stored_meta(entity, CONTRATACAO_META_FIELDS),
+            "meta_hash": entity.content_hash,
+            **hot_columns(entity.meta),
+        }
+
     def _to_orm_item(self, entity: RawItemContratacao) -> RawItemContratacaoModel:
-        return RawItemContratacaoModel(
-            numero_controle_pncp=entity.numero_controle_pncp,
-            numero_item=entity.numero_item,
-            meta=entity.meta,
-        )
+        return RawItemContratacaoModel(**self._to_item_row(entity))
+
+    def _to_item_row(self, entity: RawItemContratacao) -> dict:
+        return {
+            "numero_controle_pncp": entity.numero_controle_pncp,
+            "ano_compra": ano_compra(entity.numero_controle_pncp),
+            "numero_item": entity.numero_item,
+            **self._stored_meta(entity, ITEM_META_FIELDS),
+            "meta_hash": entity.content_hash,
+        }
 
     async def save(self, entity: RawContratacao, force: bool = False) -> None:
+        await self._prepare_write()
         existing_raw_contratacao = await self._get_orm(entity.numero_controle_pncp)
 
         entity_orm = self._to_orm(entity)
+        entity_hot_columns = hot_columns(entity.meta)
 
         if existing_raw_contratacao:
+            # Identical content is never rewritten, not even with force.
+            if existing_raw_contratacao.meta_hash == entity.content_hash:
+                self.contratacao_counts["unchanged"] += 1
+                return
             if not force:
+                # Compared on the hot column, like save_many: compact rows
+                # have no meta to read it from.
                 existing_raw_contratacao_updated_date = (
-                    existing_raw_contratacao.meta.get("dataAtualizacaoGlobal")
+                    existing_raw_contratacao.data_atualizacao_global
                 )
-                entity_updated_date = entity.meta.get("dataAtualizacaoGlobal")
+                entity_updated_date = entity_hot_columns["data_atualizacao_global"]
                 if (
                     existing_raw_contratacao_updated_date
                     and entity_updated_date
                     and existing_raw_contratacao_updated_date >= entity_updated_date
                 ):
+                    self.contratacao_counts["unchanged"] += 1
                     return
 
             existing_raw_contratacao.meta = entity_orm.meta
+            existing_raw_contratacao.meta_zstd = entity_orm.meta_zstd
+            existing_raw_contratacao.meta_hash = entity_orm.meta_hash
+            self.contratacao_counts["updated"] += 1
+            for column, value in entity_hot_columns.items():
+                setattr(existing_raw_contratacao, column, value)
 
-            existing_raw_contratacao.items.clear()
-
-            for item_model in entity_orm.items:
-                existing_raw_contratacao.items.append(item_model)
+            stored_items = {
+                item.numero_item: item for item in existing_raw_contratacao.items
+            }
+            incoming_items = {item.numero_item: item for item in entity_orm.items}
+            for numero_item, stored_item in stored_items.items():
+                if numero_item not in incoming_items:
+                    existing_raw_contratacao.items.remove(stored_item)
+                    self.item_counts["deleted"] += 1
+            for numero_item, incoming_item in incoming_items.items():
+                stored_item = stored_items.get(numero_item)
+                if stored_item is None:
+                    existing_raw_contratacao.items.append(incoming_item)
+                    self.item_counts["inserted"] += 1
+                elif stored_item.meta_hash != incoming_item.meta_hash:
+                    stored_item.meta = incoming_item.meta
+                    stored_item.meta_zstd = incoming_item.meta_zstd
+                    stored_item.meta_hash = incoming_item.meta_hash
+                    self.item_counts["updated"] += 1
 
         else:
             self.session.add(entity_orm)
+            self.contratacao_counts["inserted"] += 1
+            self.item_counts["inserted"] += len(entity_orm.items)
+        self._invalidate([entity.numero_controle_pncp])
+
+    def _is_newer(self, entity: RawContratacao, other: RawContratacao) -> bool:
+        entity_updated_date = entity.meta.get("dataAtualizacaoGlobal")
+        other_updated_date = other.meta.get("dataAtualizacaoGlobal")
+        if not entity_updated_date or not other_updated_date:
+            return True
+        return entity_updated_date > other_updated_date
+
+    def _latest_versions(
+        self, entities: list[RawContratacao]
+    ) -> dict[NumeroControlePNCP, RawContratacao]:
+        latest: dict[NumeroControlePNCP, RawContratacao] = {}
+        for entity in entities:
+            current = latest.get(entity.numero_controle_pncp)
+            if current is None or self._is_newer(entity, current):
+                latest[entity.numero_controle_pncp] = entity
+        return latest
+
+    def _upsert_statement(self, rows: list[dict], force: bool):
+        statement = pg_insert(RawContratacaoModel).values(rows)
+        # Identical content is never rewritten, not even with force.
+        where = RawContratacaoModel.meta_hash.is_distinct_from(
+            statement.excluded.meta_hash
+        )
+        if not force:
+            stored_updated_date = RawContratacaoModel.data_atualizacao_global
+            entity_updated_date = statement.excluded.data_atualizacao_global
+            where = and_(
+                where,
+                or_(
+                    stored_updated_date.is_(None),
+                    entity_updated_date.is_(None),
+                    stored_updated_date < entity_updated_date,
+                ),
+            )
+        return statement.on_conflict_do_update(
+            index_elements=[
+                RawContratacaoModel.numero_controle_pncp,
+                RawContratacaoModel.ano_compra,
+            ],
+            set_={column: statement.excluded[column] for column in STORED_COLUMNS},
+            where=where,
+        ).returning(
+            RawContratacaoModel.numero_controle_pncp,
+            literal_column(CONTRATACAO_INSERTED).label("inserted"),
+        )
+
+    async def save_many(
+        self, entities: list[RawContratacao], force: bool = False
+    ) -> list[NumeroControlePNCP]:
+        latest = self._latest_versions(entities)
+        if not latest:
+            return []
+        await self._prepare_write()
+
+        # Rows are locked in key order, so concurrent writers upserting
+        # overlapping batches wait on each other instead of deadlocking.
+        rows = [self._to_row(latest[key]) for key in sorted(latest)]
+        # A batch can hold more rows than one statement has bind parameters
+        # for, so the upsert goes out in chunks, still in key order.
+        chunk_size = MAX_BIND_PARAMETERS // len(rows[0])
+        upserted = []
+        for start in range(0, len(rows), chunk_size):
+            statement = self._upsert_statement(rows[start : start + chunk_size], force)
+            upserted += (await self.session.execute(statement)).all()
+        self._count_contratacoes(upserted, len(latest))
+        saved = [row.numero_controle_pncp for row in upserted]
+        if not saved:
+            return []
+        self._invalidate(saved)
+
+        await self._save_items_diff(
+            [item for key in saved for item in latest[key].items], saved
+        )
+        return saved
+
+    def _count_contratacoes(self, rows: list, n_entities: int) -> None:
+        n_inserted = sum(1 for row in rows if row.inserted)
+        self.contratacao_counts["inserted"] += n_inserted
+        self.contratacao_counts["updated"] += len(rows) - n_inserted
+        self.contratacao_counts["unchanged"] += n_entities - len(rows)
+
+    async def _get_item_hashes(
+        self, numeros_controle_pncp: list[NumeroControlePNCP]
+    ) -> Dict[tuple[NumeroControlePNCP, int], Optional[str]]:
+        result = await self.session.execute(
+            select(
+                RawItemContratacaoModel.numero_controle_pncp,
+                RawItemContratacaoModel.numero_item,
+                RawItemContratacaoModel.meta_hash,
+            ).where(
+                any_key(
+                    RawItemContratacaoModel.numero_controle_pncp, numeros_controle_pncp
+                ),
+                in_anos_compra(
+                    RawItemContratacaoModel.ano_compra, numeros_controle_pncp
+                ),
+            )
+        )
+        return {
+            (numero_controle_pncp, numero_item): meta_hash
+            for numero_controle_pncp, numero_item, meta_hash in result.all()
+        }
+
+    async def _save_items_diff(
+        self,
+        items: list[RawItemContratacao],
+        numeros_controle_pncp: list[NumeroControlePNCP],
+    ) -> None:
+        stored_hashes = await self._get_item_hashes(numeros_controle_pncp)
+        incoming_rows = {
+            (item.numero_controle_pncp, item.numero_item): self._to_item_row(item)
+            for item in items
+        }
+
+        rows_to_insert = []
+        rows_to_update = []
+        for key, row in incoming_rows.items():
+            if key not in stored_hashes:
+                rows_to_insert.append(row)
+            elif stored_hashes[key] != row["meta_hash"]:
+                rows_to_update.append(row)
+        keys_to_delete = [key for key in stored_hashes if key not in incoming_rows]
+
+        for start in range(0, len(keys_to_delete), ITEM_DELETE_CHUNK_SIZE):
+            chunk = keys_to_delete[start : start + ITEM_DELETE_CHUNK_SIZE]
+            await self.session.execute(
+                delete(RawItemContratacaoModel)
+                .where(
+                    tuple_(
+                        RawItemContratacaoModel.numero_controle_pncp,
+                        RawItemContratacaoModel.numero_item,
+                    ).in_(chunk),
+                    in_anos_compra(
+                        RawItemContratacaoModel.ano_compra, [key for key, _ in chunk]
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if rows_to_update:
+            await self.session.execute(update(RawItemContratacaoModel), rows_to_update)
+        if rows_to_insert:
+            await self.session.execute(
+                insert(RawItemContratacaoModel.__table__), rows_to_insert
+            )
+
+        self.item_counts["inserted"] += len(rows_to_insert)
+        self.item_counts["updated"] += len(rows_to_update)
+        self.item_counts["deleted"] += len(keys_to_delete)
+
+    async def _create_staging_tables(self) -> None:
+        # Temporary tables are never WAL-logged and are private to the
+        # connection, so concurrent backfills cannot see each other's rows.
+        for table, staging_table in (
+            (CONTRATACOES_TABLE, CONTRATACOES_STAGING_TABLE),
+            (ITEM_CONTRATACOES_TABLE, ITEM_CONTRATACOES_STAGING_TABLE),
+        ):
+            await self.session.execute(
+                text(
+                    f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_table} "
+                    f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+            )
+        await self.session.execute(
+            text(
+                f"TRUNCATE {CONTRATACOES_STAGING_TABLE}, "
+                f"{ITEM_CONTRATACOES_STAGING_TABLE}"
+            )
+        )
+
+    async def copy_many(
+        self, entities: list[RawContratacao], force: bool = False
+    ) -> list[NumeroControlePNCP]:
+        latest = self._latest_versions(entities)
+        if not latest:
+            return []
+        await self._prepare_write()
+
+        await self._create_staging_tables()
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        for table, rows in (
+            (
+                CONTRATACOES_STAGING_TABLE,
+                [self._to_row(entity) for entity in latest.values()],
+            ),
+            (
+                ITEM_CONTRATACOES_STAGING_TABLE,
+                # An item listed twice would make the merge's ON CONFLICT
+                # touch the same row twice; the last one wins, as in save_many.
+                list(
+                    {
+                        (item.numero_controle_pncp, item.numero_item): (
+                            self._to_item_row(item)
+                        )
+                        for entity in latest.values()
+                        for item in entity.items
+                    }.values()
+                ),
+            ),
+        ):
+            if not rows:
+                continue
+            # COPY takes meta as JSON text, like the jsonb input function.
+            await driver_connection.copy_records_to_table(
+                table,
+                records=[
+                    tuple(
+                        serialize_json(value) if column == "meta" else value
+                        for column, value in row.items()
+                    )
+                    for row in rows
+                ],
+                columns=list(rows[0]),
+            )
+        result = await self.session.execute(
+            text(COPY_MERGE_FORCE_SQL if force else COPY_MERGE_SQL)
+        )
+        rows = result.all()
+        self._count_contratacoes(rows, len(latest))
+        if rows:
+            self.item_counts["inserted"] += rows[0].n_items_inserted
+            self.item_counts["updated"] += rows[0].n_items_updated
+            self.item_counts["deleted"] += rows[0].n_items_deleted
+        saved = [row.numero_controle_pncp for row in rows]
+        self._invalidate(saved)
+        return saved
 
     async def delete(self, numero_controle_pncp: NumeroControlePNCP) -> None:
         await self.session.execute(
             delete(RawContratacaoModel).where(
-                RawContratacaoModel.numero_controle_pncp == numero_controle_pncp
+                RawContratacaoModel.numero_controle_pncp == numero_controle_pncp,
+                in_anos_compra(RawContratacaoModel.ano_compra, [numero_controle_pncp]),
             )
         )
+        self._invalidate([numero_controle_pncp])
 
     async def commit(self) -> None:
         await self.session.commit()
+        # Again after commit: a read between the write and the commit may
+        # have cached the version this transaction replaced.
+        written, self._written = self._written, set()
+        self._invalidate(written)
+        self._written.clear()
 
     async def flush(self) -> None:
         await self.session.flush()
 
     async def rollback(self) -> None:
         await self.session.rollback()
+        self._written.clear()
+
+    def expunge_all(self) -> None:
+        self.session.expunge_all()
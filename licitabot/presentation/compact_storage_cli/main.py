@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+
+from licitabot.infrastructure.database.session import create_session
+from licitabot.infrastructure.repositories.raw_contratacao.compact_storage import (
+    CompactStorageBackfill,
+)
+from licitabot.settings import logger, settings
+
+
+async def async_main():
+
+    parser = argparse.ArgumentParser(
+        description="Manage the compact (zstd) storage of raw PNCP payloads"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser(
+        "train", help="Train a zstd dictionary on stored payloads and save it"
+    )
+    train_parser.add_argument(
+        "--samples",
+        type=int,
+        default=settings.compact_storage.n_training_samples,
+        help="Payloads sampled per table",
+    )
+    train_parser.add_argument(
+        "--size",
+        type=int,
+        default=settings.compact_storage.dictionary_size,
+        help="Dictionary size in bytes",
+    )
+
+    for command, help in (
+        ("backfill", "Compress the rows still stored as full JSONB"),
+        ("expand", "Decompress compacted rows back into full JSONB"),
+    ):
+        command_parser = subparsers.add_parser(command, help=help)
+        command_parser.add_argument("--batch-size", type=int, default=1000)
+
+    args = parser.parse_args()
+
+    async with await create_session() as session:
+        backfill = CompactStorageBackfill(session)
+        if args.command == "train":
+            await backfill.train(args.samples, args.size)
+        elif args.command == "backfill":
+            counts = await backfill.backfill(args.batch_size)
+            logger.info(f"[*] Compacted {counts}")
+        elif args.command == "expand":
+            counts = await backfill.expand(args.batch_size)
+            logger.info(f"[*] Expanded {counts}")
+
+
+def main():
+    asyncio.run(async_main())
+
+
+if __name__ == "__main__":
+    main()
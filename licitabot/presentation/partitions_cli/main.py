@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+
+from licitabot.infrastructure.database.session import create_session
+from licitabot.infrastructure.repositories.raw_contratacao.partitions import (
+    RawContratacaoPartitionManager,
+)
+from licitabot.settings import logger
+
+
+async def ensure_partitions_ahead(n_years: int = 1):
+    async with await create_session() as session:
+        created = await RawContratacaoPartitionManager(session).ensure_years_ahead(
+            n_years
+        )
+    logger.info(f"[*] Partitions ensured, {len(created)} created")
+
+
+async def async_main():
+
+    parser = argparse.ArgumentParser(
+        description="Manage the yearly partitions of contratacoes and item_contratacoes"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List partitions and their bounds")
+
+    ensure_parser = subparsers.add_parser(
+        "ensure", help="Create the partitions of the given years, if missing"
+    )
+    ensure_parser.add_argument("years", type=int, nargs="*", metavar="YEAR")
+    ensure_parser.add_argument(
+        "--ahead",
+        type=int,
+        default=1,
+        help="Without YEAR: create the current year plus this many ahead",
+    )
+
+    detach_parser = subparsers.add_parser(
+        "detach",
+        help="Detach the partitions of a year, keeping them as standalone tables "
+        "to archive or drop",
+    )
+    detach_parser.add_argument("year", type=int, metavar="YEAR")
+
+    args = parser.parse_args()
+
+    async with await create_session() as session:
+        manager = RawContratacaoPartitionManager(session)
+        if args.command == "list":
+            for partition in await manager.list_partitions():
+                print(
+                    f"{partition['table_name']:<20} {partition['partition_name']:<28} "
+                    f"{partition['bound']}  ~{partition['n_rows_estimate']} rows"
+                )
+        elif args.command == "ensure":
+            if args.years:
+                for year in args.years:
+                    await manager.ensure_year(year)
+            else:
+                await manager.ensure_years_ahead(args.ahead)
+        elif args.command == "detach":
+            detached = await manager.detach_year(args.year)
+            if not detached:
+                logger.info(f"[*] No partitions found for {args.year}")
+
+
+def main():
+    asyncio.run(async_main())
+
+
+if __name__ == "__main__":
+    main()
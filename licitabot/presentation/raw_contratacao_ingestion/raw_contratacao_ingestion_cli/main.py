@@ -1,6 +1,7 @@
 import argparse
 import asyncio
 from datetime import datetime
+from licitabot.domain.value_objects import CodigoModalidadeContratacao
 from licitabot.presentation.raw_contratacao_ingestion.raw_contratacao_ingestion_consumer.publish import (
     publish_raw_contratacao_ingestion_message,
 )
@@ -28,12 +29,70 @@ async def async_main():
         "--dataFinal", type=parse_date, help="Final date (YYYYMMDD or YYYY-MM-DD)"
     )
 
+    parser.add_argument(
+        "--http-cache",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Serve PNCP responses from the on-disk cache (default: settings)",
+    )
+    parser.add_argument(
+        "--write-mode",
+        choices=["upsert", "copy"],
+        default="upsert",
+        help="upsert: batched INSERT ... ON CONFLICT; "
+        "copy: COPY into staging tables, for large backfills",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="EXECUTION_ID",
+        help="Resume a failed execution, skipping the pages it already committed",
+    )
+
+    parser.add_argument(
+        "--shard-by",
+        choices=["none", "day"],
+        default="none",
+        help="none: one message for the whole window; "
+        "day: one message per day, so consumer replicas can share the window",
+    )
+    parser.add_argument(
+        "--modalidades",
+        type=int,
+        nargs="+",
+        metavar="CODIGO",
+        help="codigoModalidadeContratacao values to ingest, one shard each "
+        "(default: 6, pregao eletronico)",
+    )
+    parser.add_argument(
+        "--all-modalidades",
+        action="store_true",
+        help="Ingest every codigoModalidadeContratacao",
+    )
+    parser.add_argument(
+        "--concurrent-modalidades",
+        action="store_true",
+        help="Run the modalidades of a window concurrently in one consumer, "
+        "sharing its request budget, instead of one shard per modalidade",
+    )
+
     args = parser.parse_args()
 
     data_inicial = args.dataInicial
+    codigos_modalidade_contratacao = args.modalidades
+    if args.all_modalidades:
+        codigos_modalidade_contratacao = CodigoModalidadeContratacao.all()
     data_final = args.dataFinal
 
-    await publish_raw_contratacao_ingestion_message(data_inicial, data_final)
+    await publish_raw_contratacao_ingestion_message(
+        data_inicial,
+        data_final,
+        use_http_cache=args.http_cache,
+        write_mode=args.write_mode,
+        resume_execution_id=args.resume,
+        shard_by=args.shard_by,
+        codigos_modalidade_contratacao=codigos_modalidade_contratacao,
+        concurrent_modalidades=args.concurrent_modalidades,
+    )
 
 
 def main():
@@ -2,6 +2,10 @@ from contextlib import asynccontextmanager
 from licitabot.settings import logger
 from faststream import ContextRepo
 from faststream.asgi import AsgiFastStream, make_ping_asgi
+from licitabot.infrastructure.adapters.decode_pool import decode_pool
+from licitabot.infrastructure.adapters.http_client_registry import (
+    http_client_registry,
+)
 from licitabot.presentation.raw_contratacao_ingestion.raw_contratacao_ingestion_consumer.routers.router import (
     router as raw_contratacao_ingestion_router,
 )
@@ -12,7 +16,8 @@ from licitabot.presentation.raw_contratacao_ingestion.raw_contratacao_ingestion_
 
 @asynccontextmanager
 async def lifespan(context: ContextRepo):
-    yield
+    async with http_client_registry, decode_pool:
+        yield
 
 
 broker = get_broker()
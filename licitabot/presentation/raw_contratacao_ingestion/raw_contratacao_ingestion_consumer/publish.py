@@ -3,12 +3,43 @@ from licitabot.settings import logger
 from licitabot.presentation.raw_contratacao_ingestion.raw_contratacao_ingestion_consumer.broker import (
     get_broker,
 )
+from licitabot.domain.value_objects import CodigoModalidadeContratacao
+from licitabot.infrastructure.database.session import create_session
+from licitabot.infrastructure.execution_tracker.tracker import ExecutionTracker
 from datetime import datetime
+from typing import Literal, Optional
+
+SHARDED_JOB_NAME = "raw_contratacao_ingestion_sharded"
+
+
+async def _start_sharded_execution(ingestion_window, shards: list[dict]) -> str:
+    session = await create_session()
+    async with session:
+        execution = await ExecutionTracker(session).start(
+            SHARDED_JOB_NAME,
+            {
+                "dataInicial": ingestion_window.data_inicial,
+                "dataFinal": ingestion_window.data_final,
+                "n_shards": len(shards),
+                "shards": shards,
+            },
+        )
+        return str(execution.id)
 
 
 async def publish_raw_contratacao_ingestion_message(
-    data_inicial: datetime = None, data_final: datetime = None
+    data_inicial: datetime = None,
+    data_final: datetime = None,
+    use_http_cache: Optional[bool] = None,
+    write_mode: Literal["upsert", "copy"] = "upsert",
+    resume_execution_id: Optional[str] = None,
+    shard_by: Literal["none", "day"] = "none",
+    codigos_modalidade_contratacao: Optional[list[int]] = None,
+    concurrent_modalidades: bool = False,
 ):
+    if codigos_modalidade_contratacao is None:
+        codigos_modalidade_contratacao = [CodigoModalidadeContratacao.PREGAO_ELETRONICO]
+
     broker = get_broker()
     await broker.connect()
 
@@ -18,15 +49,61 @@ async def publish_raw_contratacao_ingestion_message(
             data_inicial, data_final
         )
 
-        await broker.publish(
-            {
-                "dataInicial": ingestion_window.data_inicial,
-                "dataFinal": ingestion_window.data_final,
-            },
-            "raw_contratacao_ingestion_triggered",
-        )
+        if resume_execution_id:
+            # A resumed execution already knows its window and modalidade.
+            windows = [ingestion_window]
+            codigos_modalidade_contratacao = codigos_modalidade_contratacao[:1]
+        elif shard_by == "day":
+            windows = ingestion_window.split_by_day()
+        else:
+            windows = [ingestion_window]
+
+        if concurrent_modalidades and len(codigos_modalidade_contratacao) > 1:
+            # One message per window, whose consumer runs every modalidade.
+            shards = [
+                {
+                    "dataInicial": window.data_inicial,
+                    "dataFinal": window.data_final,
+                    "codigosModalidadeContratacao": [
+                        int(codigo) for codigo in codigos_modalidade_contratacao
+                    ],
+                }
+                for window in windows
+            ]
+        else:
+            shards = [
+                {
+                    "dataInicial": window.data_inicial,
+                    "dataFinal": window.data_final,
+                    "codigoModalidadeContratacao": int(codigo_modalidade_contratacao),
+                }
+                for codigo_modalidade_contratacao in codigos_modalidade_contratacao
+                for window in windows
+            ]
+
+        parent_execution_id = None
+        if len(shards) > 1:
+            parent_execution_id = await _start_sharded_execution(
+                ingestion_window, shards
+            )
+            logger.info(
+                f"Started sharded execution {parent_execution_id} "
+                f"with {len(shards)} shards"
+            )
+
+        for shard in shards:
+            await broker.publish(
+                {
+                    **shard,
+                    "useHttpCache": use_http_cache,
+                    "writeMode": write_mode,
+                    "resumeExecutionId": resume_execution_id,
+                    "parentExecutionId": parent_execution_id,
+                },
+                "raw_contratacao_ingestion_triggered",
+            )
         logger.info(
-            f"Published ingestion message: {ingestion_window.data_inicial} → {ingestion_window.data_final}"
+            f"Published {len(shards)} ingestion message(s): {ingestion_window.data_inicial} → {ingestion_window.data_final}"
         )
     finally:
         await broker.close()
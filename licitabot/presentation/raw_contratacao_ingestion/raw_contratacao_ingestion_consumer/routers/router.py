@@ -1,10 +1,21 @@
+from contextlib import AsyncExitStack
+from typing import List, Literal, Optional
+from uuid import UUID
 from faststream import Logger
 from faststream.rabbit import RabbitRouter
 from licitabot.application.service_factory import ServiceFactory
-from licitabot.application.dtos import RawContratacaoIngestionParamsDTO
+from licitabot.application.dtos import (
+    RawContratacaoIngestionParamsDTO,
+    RawContratacaoMultiModalidadeIngestionParamsDTO,
+)
 from licitabot.domain.value_objects import YearMonthDay
 from pydantic import BaseModel, field_validator, ConfigDict
 from licitabot.infrastructure.database.session import create_session
+from licitabot.settings import settings
+from licitabot.infrastructure.execution_tracker.tracker import (
+    ExecutionTracker,
+    current_parent_execution_id,
+)
 from licitabot.domain.value_objects import CodigoModalidadeContratacao
 
 router = RabbitRouter()
@@ -14,6 +25,12 @@ class RawContratacaoIngestionMessageDTO(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     dataInicial: YearMonthDay
     dataFinal: YearMonthDay
+    codigoModalidadeContratacao: int = CodigoModalidadeContratacao.PREGAO_ELETRONICO
+    codigosModalidadeContratacao: Optional[List[int]] = None
+    useHttpCache: Optional[bool] = None
+    writeMode: Literal["upsert", "copy"] = "upsert"
+    resumeExecutionId: Optional[str] = None
+    parentExecutionId: Optional[str] = None
 
     @field_validator("dataInicial", "dataFinal", mode="before")
     @classmethod
@@ -23,27 +40,113 @@ class RawContratacaoIngestionMessageDTO(BaseModel):
         return v
 
 
-@router.subscriber("raw_contratacao_ingestion_triggered")
-async def handle_raw_contratacao_ingestion_triggered(
-    message: RawContratacaoIngestionMessageDTO, logger: Logger
-):
-    logger.info(f"[*] Received raw contratacao ingestion request: {message}")
+async def _get_resume_request(
+    tracker: ExecutionTracker, message: RawContratacaoIngestionMessageDTO
+) -> tuple[RawContratacaoIngestionParamsDTO, Optional[UUID]]:
+    execution = await tracker.get(UUID(message.resumeExecutionId))
+    if execution is None:
+        raise ValueError(f"Execution {message.resumeExecutionId} not found")
+    params = (execution.meta or {}).get("params", {})
+    # The window comes from the execution being resumed, and checkpoints are
+    # always recorded under the first execution of that window.
+    request = RawContratacaoIngestionParamsDTO(
+        dataInicial=params.get("dataInicial", message.dataInicial),
+        dataFinal=params.get("dataFinal", message.dataFinal),
+        codigoModalidadeContratacao=params.get(
+            "codigoModalidadeContratacao", message.codigoModalidadeContratacao
+        ),
+        writeMode=message.writeMode,
+        resumeExecutionId=params.get("resumeExecutionId") or str(execution.id),
+    )
+    # A resumed shard keeps reporting to the aggregate execution of its run.
+    return request, execution.parent_id
+
+
+async def _run_multi_modalidade(
+    message: RawContratacaoIngestionMessageDTO, parent_execution_id: Optional[UUID]
+) -> None:
+    request = RawContratacaoMultiModalidadeIngestionParamsDTO(
+        dataInicial=message.dataInicial,
+        dataFinal=message.dataFinal,
+        codigosModalidadeContratacao=message.codigosModalidadeContratacao,
+        writeMode=message.writeMode,
+    )
+    async with AsyncExitStack() as stack:
+        # Modalidades persist concurrently, so each needs its own session.
+        sessions = {
+            CodigoModalidadeContratacao(codigo): await stack.enter_async_context(
+                await create_session()
+            )
+            for codigo in request.codigosModalidadeContratacao
+        }
+        service = (
+            ServiceFactory.create_raw_contratacao_multi_modalidade_ingestion_service(
+                sessions, use_http_cache=message.useHttpCache
+            )
+        )
+        token = current_parent_execution_id.set(parent_execution_id)
+        try:
+            await service.run(request)
+        finally:
+            current_parent_execution_id.reset(token)
+
 
+async def _run_single_modalidade(
+    message: RawContratacaoIngestionMessageDTO, parent_execution_id: Optional[UUID]
+) -> None:
     raw_contratacao_ingestion_request = RawContratacaoIngestionParamsDTO(
         dataInicial=message.dataInicial,
         dataFinal=message.dataFinal,
+        codigoModalidadeContratacao=message.codigoModalidadeContratacao,
+        writeMode=message.writeMode,
     )
-    session = await create_session()
+    async with AsyncExitStack() as stack:
+        session = await stack.enter_async_context(await create_session())
+        # Every writer after the first persists through a session of its own.
+        writer_sessions = [
+            await stack.enter_async_context(await create_session())
+            for _ in range(settings.ingestion_services.n_writers - 1)
+        ]
 
-    async with session:
+        if message.resumeExecutionId:
+            raw_contratacao_ingestion_request, parent_execution_id = (
+                await _get_resume_request(ExecutionTracker(session), message)
+            )
 
         raw_contratacao_ingestion_service = (
             ServiceFactory.create_raw_contratacao_ingestion_service(
-                session, CodigoModalidadeContratacao.PREGAO_ELETRONICO
+                session,
+                CodigoModalidadeContratacao(
+                    raw_contratacao_ingestion_request.codigoModalidadeContratacao
+                ),
+                use_http_cache=message.useHttpCache,
+                writer_sessions=writer_sessions,
             )
         )
 
-        await raw_contratacao_ingestion_service.run(raw_contratacao_ingestion_request)
+        token = current_parent_execution_id.set(parent_execution_id)
+        try:
+            await raw_contratacao_ingestion_service.run(
+                raw_contratacao_ingestion_request
+            )
+        finally:
+            current_parent_execution_id.reset(token)
+
+
+@router.subscriber("raw_contratacao_ingestion_triggered")
+async def handle_raw_contratacao_ingestion_triggered(
+    message: RawContratacaoIngestionMessageDTO, logger: Logger
+):
+    logger.info(f"[*] Received raw contratacao ingestion request: {message}")
+
+    parent_execution_id = (
+        UUID(message.parentExecutionId) if message.parentExecutionId else None
+    )
+    # Resuming targets the execution of a single modalidade.
+    if message.codigosModalidadeContratacao and not message.resumeExecutionId:
+        await _run_multi_modalidade(message, parent_execution_id)
+    else:
+        await _run_single_modalidade(message, parent_execution_id)
 
     logger.info(
         f"[*] Raw contratacao ingestion request processed successfully: {message}"
@@ -2,6 +2,7 @@ import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from licitabot.settings import logger
 from licitabot.domain.services import time_service
+from licitabot.presentation.partitions_cli.main import ensure_partitions_ahead
 from licitabot.presentation.raw_contratacao_ingestion.raw_contratacao_ingestion_consumer.publish import (
     publish_raw_contratacao_ingestion_message,
 )
@@ -18,6 +19,15 @@ async def start_app():
         minute=0,
         timezone=time_service.get_timezone(),
     )
+    # Next year's partitions exist long before the first row for it arrives.
+    scheduler.add_job(
+        ensure_partitions_ahead,
+        trigger="cron",
+        day=1,
+        hour=3,
+        minute=0,
+        timezone=time_service.get_timezone(),
+    )
 
     scheduler.start()
     logger.info("Scheduler started. Waiting for jobs...")
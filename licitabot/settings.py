@@ -1,4 +1,6 @@
 import logging
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel
 
@@ -16,6 +18,14 @@ class DatabaseSettings(BaseModel):
     db: str = "pncp_ingestion"
     user: str = "pncp_user"
     password: str = "pncp_pass"
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    server_side_prepared_statements: bool = True
 
     @property
     def async_url(self) -> str:
@@ -41,10 +51,63 @@ class RabbitMQSettings(BaseModel):
 
 class IngestionServicesSettings(BaseModel):
     default_delta_days: int = 1
+    n_page_workers: int = 20
+    n_item_workers: int = 50
+    max_buffered_pages: int = 10
+    max_buffered_bytes: Optional[int] = None
+    commit_every_pages: int = 1
+    commit_every_entities: Optional[int] = None
+    n_writers: int = 1
 
 
 class HTTPSettings(BaseModel):
     timeout: float = 60.0
+    http2: bool = True
+    max_connections_per_host: int = 100
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 60.0
+
+
+class HTTPCacheSettings(BaseModel):
+    enabled: bool = False
+    directory: str = ".cache/pncp"
+    ttl: float = 24 * 60 * 60
+    max_bytes: int = 5 * 1024**3
+
+
+class PNCPLimiterSettings(BaseModel):
+    initial_window: float = 10
+    min_window: float = 1
+    max_window: float = 50
+    increase_step: float = 1.0
+    decrease_factor: float = 0.5
+    latency_threshold: float = 10.0
+    max_error_rate: float = 0.05
+    default_retry_after: float = 5.0
+
+
+class PNCPItemsSettings(BaseModel):
+    stream: bool = True
+    max_streamed_items: int = 2000
+    page_size: int = 500
+
+
+class PNCPDecodeSettings(BaseModel):
+    decoder: Literal["msgspec", "pydantic", "passthrough"] = "msgspec"
+    n_process_workers: int = 0
+
+
+class ReadCacheSettings(BaseModel):
+    enabled: bool = True
+    max_entries: int = 10_000
+    ttl: float = 5 * 60
+
+
+class CompactStorageSettings(BaseModel):
+    enabled: bool = False
+    level: int = 3
+    dictionary_size: int = 112 * 1024
+    n_training_samples: int = 5000
 
 
 class LiteLLMSettings(BaseModel):
@@ -63,6 +126,12 @@ class Settings(BaseSettings):
     rabbitmq: RabbitMQSettings = RabbitMQSettings()
     ingestion_services: IngestionServicesSettings = IngestionServicesSettings()
     http: HTTPSettings = HTTPSettings()
+    http_cache: HTTPCacheSettings = HTTPCacheSettings()
+    pncp_limiter: PNCPLimiterSettings = PNCPLimiterSettings()
+    pncp_items: PNCPItemsSettings = PNCPItemsSettings()
+    pncp_decode: PNCPDecodeSettings = PNCPDecodeSettings()
+    read_cache: ReadCacheSettings = ReadCacheSettings()
+    compact_storage: CompactStorageSettings = CompactStorageSettings()
     litellm: LiteLLMSettings = LiteLLMSettings()
 
 
@@ -0,0 +1,179 @@
+import argparse
+import json
+import time
+
+from licitabot.infrastructure.adapters.dtos import (
+    PNCPContratacaoItemsResultDTO,
+    PNCPUpdatedContratacoesResultDTO,
+)
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    decode_contratacao_items,
+    decode_updated_contratacoes,
+)
+from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
+    convert_to_raw_contratacao,
+)
+
+
+def make_entry(i: int) -> dict:
+    return {
+        "numeroControlePNCP": f"{i:014d}-1-{i % 999999 + 1:06d}/2024",
+        "orgaoEntidade": {
+            "cnpj": f"{i:014d}",
+            "razaoSocial": "MUNICIPIO DE EXEMPLO",
+            "poderId": "E",
+            "esferaId": "M",
+        },
+        "unidadeOrgao": {
+            "ufNome": "Sao Paulo",
+            "codigoUnidade": "1",
+            "nomeUnidade": "PREFEITURA MUNICIPAL",
+            "ufSigla": "SP",
+            "municipioNome": "Sao Paulo",
+            "codigoIbge": "3550308",
+        },
+        "anoCompra": 2024,
+        "sequencialCompra": i % 999999 + 1,
+        "numeroCompra": str(i),
+        "processo": f"{i}/2024",
+        "objetoCompra": "Aquisicao de materiais de consumo " * 4,
+        "informacaoComplementar": "",
+        "modalidadeId": 6,
+        "modalidadeNome": "Pregao - Eletronico",
+        "situacaoCompraId": 1,
+        "situacaoCompraNome": "Divulgada no PNCP",
+        "srp": False,
+        "valorTotalEstimado": 12345.67,
+        "valorTotalHomologado": None,
+        "dataAberturaProposta": "2024-01-10T08:00:00",
+        "dataEncerramentoProposta": "2024-01-20T08:00:00",
+        "dataPublicacaoPncp": "2024-01-05T10:00:00",
+        "dataInclusao": "2024-01-05T10:00:00",
+        "dataAtualizacao": "2024-01-05T10:00:00",
+        "dataAtualizacaoGlobal": "2024-01-05T10:00:00",
+        "amparoLegal": {"codigo": 1, "nome": "Lei 14.133/2021, Art. 28, I"},
+        "linkSistemaOrigem": "https://example.org",
+    }
+
+
+def make_item(i: int) -> dict:
+    return {
+        "numeroItem": i + 1,
+        "descricao": "Papel A4, resma com 500 folhas",
+        "materialOuServico": "M",
+        "materialOuServicoNome": "Material",
+        "valorUnitarioEstimado": 25.5,
+        "valorTotal": 255.0,
+        "quantidade": 10,
+        "unidadeMedida": "Resma",
+        "orcamentoSigiloso": False,
+        "itemCategoriaId": 2,
+        "criterioJulgamentoNome": "Menor preco",
+        "situacaoCompraItemNome": "Em andamento",
+        "temResultado": False,
+        "dataInclusao": "2024-01-05T10:00:00",
+        "dataAtualizacao": "2024-01-05T10:00:00",
+    }
+
+
+def bench(name: str, decode, content: bytes, repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        decode(content)
+    elapsed = (time.perf_counter() - started_at) / repeat
+    print(f"{name:<32} {elapsed * 1000:8.3f} ms")
+    return elapsed
+
+
+def decode_and_convert(page: bytes, items: bytes, decoder: str) -> list:
+    # What a page costs before it reaches the repository: the entries, the
+    # /itens body of each one and the records built from them, hashes included.
+    entries = decode_updated_contratacoes(page, decoder).data
+    for entry in entries:
+        entry["items"] = decode_contratacao_items(items, decoder).root
+    return [convert_to_raw_contratacao(entry) for entry in entries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PNCP payload decode benchmark")
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--items-per-entry", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    page = json.dumps(
+        {
+            "data": [make_entry(i) for i in range(args.entries)],
+            "totalPaginas": 10,
+            "totalRegistros": args.entries * 10,
+            "numeroPagina": 2,
+            "paginasRestantes": 8,
+            "empty": False,
+        }
+    ).encode()
+    items = json.dumps([make_item(i) for i in range(args.items)]).encode()
+
+    print(f"consulta page: {args.entries} entries, {len(page)} bytes")
+    pydantic_page = bench(
+        "pydantic",
+        lambda content: PNCPUpdatedContratacoesResultDTO.model_validate(
+            json.loads(content)
+        ),
+        page,
+        args.repeat,
+    )
+    msgspec_page = bench("msgspec", decode_updated_contratacoes, page, args.repeat)
+    passthrough_page = bench(
+        "passthrough",
+        lambda content: decode_updated_contratacoes(content, "passthrough"),
+        page,
+        args.repeat,
+    )
+    print(f"speedup: {pydantic_page / msgspec_page:.1f}x (msgspec), ", end="")
+    print(f"{pydantic_page / passthrough_page:.1f}x (passthrough)\n")
+
+    print(f"itens: {args.items} items, {len(items)} bytes")
+    pydantic_items = bench(
+        "pydantic",
+        lambda content: PNCPContratacaoItemsResultDTO.model_validate(
+            json.loads(content)
+        ),
+        items,
+        args.repeat,
+    )
+    msgspec_items = bench("msgspec", decode_contratacao_items, items, args.repeat)
+    passthrough_items = bench(
+        "passthrough",
+        lambda content: decode_contratacao_items(content, "passthrough"),
+        items,
+        args.repeat,
+    )
+    print(f"speedup: {pydantic_items / msgspec_items:.1f}x (msgspec), ", end="")
+    print(f"{pydantic_items / passthrough_items:.1f}x (passthrough)\n")
+
+    entry_items = json.dumps(
+        [make_item(i) for i in range(args.items_per_entry)]
+    ).encode()
+    print(
+        f"decode + convert: {args.entries} entries, "
+        f"{args.items_per_entry} items each"
+    )
+    repeat = max(args.repeat // 20, 1)
+    msgspec_convert = bench(
+        "msgspec",
+        lambda content: decode_and_convert(content, entry_items, "msgspec"),
+        page,
+        repeat,
+    )
+    passthrough_convert = bench(
+        "passthrough",
+        lambda content: decode_and_convert(content, entry_items, "passthrough"),
+        page,
+        repeat,
+    )
+    print(f"speedup: {msgspec_convert / passthrough_convert:.1f}x (passthrough)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 import asyncio
 from licitabot.infrastructure.adapters.litellm_adapter import LiteLLMAdapter
 from licitabot.infrastructure.adapters.dtos import LiteLLMEmbeddingsParamsDTO
+from licitabot.infrastructure.adapters.http_client_registry import (
+    http_client_registry,
+)
 
 
 async def main():
-    adapter = LiteLLMAdapter()
-    params = LiteLLMEmbeddingsParamsDTO(input="Hello, world!")
-    result = await adapter.get_embeddings(params)
-    print(result)
+    async with http_client_registry:
+        adapter = LiteLLMAdapter()
+        params = LiteLLMEmbeddingsParamsDTO(input="Hello, world!")
+        result = await adapter.get_embeddings(params)
+        print(result)
 
 
 if __name__ == "__main__":
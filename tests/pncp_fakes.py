@@ -0,0 +1,113 @@
+import asyncio
+import json
+from typing import Optional
+
+from licitabot.infrastructure.adapters.dtos import (
+    PNCPContratacaoItemsParamsDTO,
+    PNCPUpdatedContratacoesParamsDTO,
+)
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    PNCPDecoder,
+    decode_contratacao_items,
+    decode_updated_contratacoes,
+)
+
+
+def make_entry(i: int, data_atualizacao_global: str = "2024-01-05T10:00:00") -> dict:
+    return {
+        "numeroControlePNCP": f"{i:014d}-1-{i:06d}/2024",
+        "orgaoEntidade": {"cnpj": f"{i:014d}", "razaoSocial": "MUNICIPIO"},
+        "anoCompra": 2024,
+        "sequencialCompra": i,
+        "objetoCompra": f"Aquisicao {i}",
+        "dataPublicacaoPncp": "2024-01-05T10:00:00",
+        "dataAtualizacaoGlobal": data_atualizacao_global,
+    }
+
+
+def make_item(numero_item: int, descricao: str = "Papel A4") -> dict:
+    return {"numeroItem": numero_item, "descricao": descricao, "quantidade": 10}
+
+
+class FakeLimiter:
+
+    def snapshot(self) -> dict:
+        return {}
+
+
+class FakeConsultaAdapter:
+
+    def __init__(
+        self,
+        entries: list[dict],
+        tamanho_pagina: int = 50,
+        decoder: PNCPDecoder = "msgspec",
+    ):
+        self.entries = entries
+        self.tamanho_pagina = tamanho_pagina
+        self.decoder = decoder
+        self.limiter = FakeLimiter()
+        self.paginas_requested: list[int] = []
+
+    def _page(self, pagina: int) -> dict:
+        total_paginas = -(-len(self.entries) // self.tamanho_pagina)
+        start = (pagina - 1) * self.tamanho_pagina
+        return {
+            "data": self.entries[start : start + self.tamanho_pagina],
+            "totalPaginas": total_paginas,
+            "totalRegistros": len(self.entries),
+            "numeroPagina": pagina,
+            "paginasRestantes": max(total_paginas - pagina, 0),
+            "empty": False,
+        }
+
+    async def get_updated_contratacoes_content(
+        self, params: PNCPUpdatedContratacoesParamsDTO
+    ) -> bytes:
+        self.paginas_requested.append(params.pagina)
+        await asyncio.sleep(0)
+        return json.dumps(self._page(params.pagina)).encode()
+
+    async def get_updated_contratacoes(self, params: PNCPUpdatedContratacoesParamsDTO):
+        content = await self.get_updated_contratacoes_content(params)
+        return decode_updated_contratacoes(content, self.decoder)
+
+
+class FakePncpAdapter:
+
+    def __init__(
+        self,
+        items: dict[int, list[dict]],
+        failing: Optional[dict[int, Exception]] = None,
+        delay: float = 0.01,
+        decoder: PNCPDecoder = "msgspec",
+    ):
+        # Keyed by sequencialCompra, which make_entry sets to the entry index.
+        self.items = items
+        self.failing = failing or {}
+        self.delay = delay
+        self.decoder = decoder
+        self.limiter = FakeLimiter()
+        self.request_budget = None
+        self.n_calls: dict[int, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_contratacao_items_content(
+        self, params: PNCPContratacaoItemsParamsDTO
+    ) -> bytes:
+        sequencial = int(params.sequencial)
+        self.n_calls[sequencial] = self.n_calls.get(sequencial, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if sequencial in self.failing:
+                raise self.failing[sequencial]
+            return json.dumps(self.items.get(sequencial, [])).encode()
+        finally:
+            self.in_flight -= 1
+
+    async def get_contratacao_items(self, params: PNCPContratacaoItemsParamsDTO):
+        content = await self.get_contratacao_items_content(params)
+        return decode_contratacao_items(content, self.decoder)
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from licitabot.infrastructure.adapters.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+    parse_retry_after,
+)
+
+
+def respond(status_code: int, headers: dict | None = None, delay: float = 0.0):
+    async def send() -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(status_code, headers=headers)
+
+    return send
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_window_grows_additively_while_healthy():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_window=2, max_window=3)
+
+    async def run():
+        for _ in range(20):
+            await limiter.request(respond(200))
+
+    asyncio.run(run())
+
+    assert limiter.window == 3
+    assert limiter.n_successes == 20
+    assert [decision.action for decision in limiter.decisions] == ["increase"]
+
+
+def test_window_is_cut_once_per_burst_of_failures():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_window=8, min_window=1)
+
+    async def run():
+        await asyncio.gather(*(limiter.request(respond(503)) for _ in range(5)))
+
+    asyncio.run(run())
+
+    assert limiter.window == 4
+    assert limiter.n_failures == 5
+    assert [decision.action for decision in limiter.decisions] == ["decrease"]
+
+
+def test_429_pauses_new_requests_for_retry_after():
+    limiter = AdaptiveConcurrencyLimiter("test", default_retry_after=0.2)
+
+    async def run() -> float:
+        await limiter.request(respond(429))
+        started_at = asyncio.get_running_loop().time()
+        await limiter.request(respond(200))
+        return asyncio.get_running_loop().time() - started_at
+
+    assert asyncio.run(run()) >= 0.15
+    assert limiter.decisions[0].action == "pause"
+
+
+def test_in_flight_requests_never_exceed_the_window():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_window=3, max_window=3)
+    peak = 0
+
+    async def send() -> httpx.Response:
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    async def run():
+        await asyncio.gather(*(limiter.request(send) for _ in range(12)))
+
+    asyncio.run(run())
+
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+def test_timeout_counts_as_failure_and_propagates():
+    limiter = AdaptiveConcurrencyLimiter("test", initial_window=4)
+
+    async def send() -> httpx.Response:
+        raise httpx.ReadTimeout("timed out")
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(limiter.request(send))
+
+    assert limiter.n_failures == 1
+    assert limiter.window == 2
+    assert limiter.in_flight == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import zstandard
+
+from licitabot.infrastructure.repositories.raw_contratacao.compact_storage import (
+    NO_DICTIONARY,
+    PayloadCodec,
+)
+
+
+class FakeResult:
+
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def scalars(self) -> "FakeResult":
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+
+class FakeSession:
+
+    def __init__(self, dictionaries: list[bytes] | None = None):
+        self.dictionaries = dictionaries or []
+        self.n_queries = 0
+
+    async def execute(self, statement) -> FakeResult:
+        self.n_queries += 1
+        return FakeResult(self.dictionaries)
+
+
+def train(codec: PayloadCodec) -> bytes:
+    samples = [
+        {"numeroItem": i, "descricao": f"Papel A4 {i}", "quantidade": i * 10}
+        for i in range(1, 400)
+    ]
+    return codec.train(samples, dictionary_size=4096)
+
+
+def test_missing_dictionary_is_not_looked_up_again_within_the_ttl():
+    codec = PayloadCodec(level=3, no_dictionary_ttl=60)
+    session = FakeSession()
+
+    async def run():
+        for _ in range(5):
+            await codec.ensure_compressor(session)
+
+    asyncio.run(run())
+
+    assert session.n_queries == 1
+    assert codec.current_dict_id == NO_DICTIONARY
+
+
+def test_dictionary_trained_elsewhere_is_loaded_once_the_ttl_expires():
+    codec = PayloadCodec(level=3, no_dictionary_ttl=0)
+    session = FakeSession()
+
+    async def run():
+        await codec.ensure_compressor(session)
+        session.dictionaries = [train(codec)]
+        await codec.ensure_compressor(session)
+        await codec.ensure_compressor(session)
+
+    asyncio.run(run())
+
+    assert session.n_queries == 2
+    assert codec.current_dict_id != NO_DICTIONARY
+
+
+def test_round_trip_with_and_without_a_dictionary():
+    codec = PayloadCodec(level=3)
+    meta = {"numeroItem": 1, "descricao": "Papel A4", "quantidade": 10}
+    plain = codec.compress(meta)
+
+    dict_id = codec.add_dictionary(train(codec), current=True)
+    compressed = codec.compress(meta)
+
+    assert zstandard.get_frame_parameters(compressed).dict_id == dict_id
+    assert codec.decompress(compressed) == meta
+    assert codec.decompress(plain) == meta
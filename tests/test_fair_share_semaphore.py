@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+
+from licitabot.infrastructure.adapters.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+)
+from licitabot.infrastructure.adapters.fair_share_semaphore import (
+    FairShareSemaphore,
+)
+from licitabot.infrastructure.adapters.pncp_api_consulta_adapter import (
+    PNCPApiConsultaAdapter,
+)
+
+
+async def hold(semaphore: FairShareSemaphore, tenant: str, release: asyncio.Event):
+    async with semaphore.slot(tenant):
+        await release.wait()
+
+
+def test_lone_tenant_may_use_the_whole_capacity():
+    async def run():
+        semaphore = FairShareSemaphore("test", capacity=4)
+        release = asyncio.Event()
+        holders = [asyncio.create_task(hold(semaphore, "a", release)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        assert semaphore.in_flight == {"a": 4}
+        release.set()
+        await asyncio.gather(*holders)
+        assert semaphore.in_flight == {"a": 0}
+        assert semaphore.n_acquired == {"a": 6}
+
+    asyncio.run(run())
+
+
+def test_waiting_tenant_gets_its_share_before_borrowers():
+    async def run():
+        semaphore = FairShareSemaphore("test", capacity=4)
+        release_a = asyncio.Event()
+        holders_a = [
+            asyncio.create_task(hold(semaphore, "a", release_a)) for _ in range(4)
+        ]
+        await asyncio.sleep(0.01)
+
+        release_b = asyncio.Event()
+        holders_b = [
+            asyncio.create_task(hold(semaphore, "b", release_b)) for _ in range(2)
+        ]
+        more_a = [
+            asyncio.create_task(hold(semaphore, "a", release_a)) for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        assert semaphore.in_flight == {"a": 4}
+
+        # Slots freed by a go to b until b reaches its share of 2.
+        release_a.set()
+        await asyncio.sleep(0.01)
+        assert semaphore.in_flight["b"] == 2
+
+        release_b.set()
+        await asyncio.gather(*holders_a, *holders_b, *more_a)
+
+    asyncio.run(run())
+
+
+def test_adapter_holds_a_budget_slot_only_around_the_send():
+    budget = FairShareSemaphore("test", capacity=1)
+    in_flight_during_send = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        in_flight_during_send.append(budget.in_flight.get(6, 0))
+        return httpx.Response(503)
+
+    adapter = PNCPApiConsultaAdapter(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        limiter=AdaptiveConcurrencyLimiter("test"),
+        request_budget=budget,
+        budget_tenant=6,
+    )
+
+    response = asyncio.run(adapter._get(adapter.PNCP_GET_UPDATED_CONTRATACOES_URL, {}))
+
+    # Retries happen above _get, so backoff never holds a slot.
+    assert response.status_code == 503
+    assert in_flight_during_send == [1]
+    assert budget.in_flight == {6: 0}
@@ -0,0 +1,103 @@
+import asyncio
+import os
+
+import httpx
+
+from licitabot.infrastructure.adapters.http_cache import HTTPResponseCache
+
+URL = "https://pncp.gov.br/api/consulta/v1/contratacoes/atualizacao"
+
+
+class FakeServer:
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self.n_requests = 0
+        self.sent_headers: list[dict] = []
+
+    async def send(self, headers: dict) -> httpx.Response:
+        self.n_requests += 1
+        self.sent_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"x" * self.size, headers={"ETag": '"v1"'})
+
+
+def fetch(cache: HTTPResponseCache, server: FakeServer, pagina: int):
+    return cache.fetch(URL, {"pagina": pagina}, server.send)
+
+
+def cached_paginas(cache: HTTPResponseCache) -> set[int]:
+    return {
+        pagina
+        for pagina in range(10)
+        if cache._paths(cache._key(URL, {"pagina": pagina}))[1].exists()
+    }
+
+
+def test_second_fetch_is_served_from_disk(tmp_path):
+    cache = HTTPResponseCache(str(tmp_path), ttl=60, max_bytes=10_000)
+    server = FakeServer()
+
+    async def run():
+        first = await fetch(cache, server, 1)
+        second = await fetch(cache, server, 1)
+        assert second.content == first.content
+
+    asyncio.run(run())
+
+    assert server.n_requests == 1
+    assert cache.snapshot() == {"n_hits": 1, "n_revalidated": 0, "n_misses": 1}
+
+
+def test_stale_entry_is_revalidated_with_its_etag(tmp_path):
+    cache = HTTPResponseCache(str(tmp_path), ttl=0, max_bytes=10_000)
+    server = FakeServer()
+
+    async def run():
+        await fetch(cache, server, 1)
+        response = await fetch(cache, server, 1)
+        assert response.status_code == 200
+        assert len(response.content) == 100
+
+    asyncio.run(run())
+
+    assert server.sent_headers[1] == {"If-None-Match": '"v1"'}
+    assert cache.n_revalidated == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = HTTPResponseCache(str(tmp_path), ttl=60, max_bytes=300)
+    server = FakeServer(size=100)
+
+    async def run():
+        for pagina in (1, 2, 3):
+            await fetch(cache, server, pagina)
+        # Reading 1 makes 2 the least recently used entry.
+        await fetch(cache, server, 1)
+        await fetch(cache, server, 4)
+
+    asyncio.run(run())
+
+    assert cached_paginas(cache) == {1, 3, 4}
+    assert cache._total_bytes == 300
+
+
+def test_index_is_rebuilt_from_disk_in_mtime_order(tmp_path):
+    server = FakeServer(size=100)
+
+    async def fill():
+        cache = HTTPResponseCache(str(tmp_path), ttl=60, max_bytes=10_000)
+        for pagina in (1, 2, 3):
+            await fetch(cache, server, pagina)
+        return cache
+
+    cache = asyncio.run(fill())
+    for age, pagina in enumerate((2, 1, 3)):
+        body_path = cache._paths(cache._key(URL, {"pagina": pagina}))[1]
+        os.utime(body_path, (1_000_000 + age, 1_000_000 + age))
+
+    restarted = HTTPResponseCache(str(tmp_path), ttl=60, max_bytes=300)
+    asyncio.run(fetch(restarted, server, 4))
+
+    assert cached_paginas(restarted) == {1, 3, 4}
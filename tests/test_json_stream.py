@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import httpx
+import msgspec
+import pytest
+
+from licitabot.infrastructure.adapters.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+)
+from licitabot.infrastructure.adapters.dtos import PNCPContratacaoItemsParamsDTO
+from licitabot.infrastructure.adapters.json_stream import JSONArrayStreamDecoder
+from licitabot.infrastructure.adapters.pncp_api_pncp_adapter import (
+    PNCPApiPncpAdapter,
+)
+from licitabot.infrastructure.adapters.pncp_decoders import RAW_JSON_KEY
+
+DOCUMENT = (
+    b'[1, 2.5e3, -7, true, null, "a\\u00e9 \\"]b", '
+    b'{"x": [1, 2], "y": "\xc3\xa9"}, 1e5 ]'
+)
+
+
+def decode_in_chunks(chunks: list[bytes]) -> list:
+    decoder = JSONArrayStreamDecoder()
+    elements = []
+    for chunk in chunks:
+        elements.extend(decoder.feed(chunk))
+    decoder.close()
+    return [msgspec.json.decode(element) for element in elements]
+
+
+def test_every_two_way_split_decodes_like_json_loads():
+    for split in range(len(DOCUMENT) + 1):
+        assert decode_in_chunks([DOCUMENT[:split], DOCUMENT[split:]]) == json.loads(
+            DOCUMENT
+        )
+
+
+def test_byte_by_byte_feed_decodes_like_json_loads():
+    chunks = [DOCUMENT[i : i + 1] for i in range(len(DOCUMENT))]
+    assert decode_in_chunks(chunks) == json.loads(DOCUMENT)
+
+
+def test_number_split_across_chunks_waits_for_a_delimiter():
+    decoder = JSONArrayStreamDecoder()
+    assert decoder.feed(b"[1, 2") == [b"1"]
+    assert decoder.feed(b".5") == []
+    assert decoder.feed(b"]") == [b"2.5"]
+    decoder.close()
+
+
+def test_elements_are_handed_over_as_their_original_bytes():
+    decoder = JSONArrayStreamDecoder()
+    assert decoder.feed(b'[ {"a": "}\\"", "b": [1, {"c": 2}]') == []
+    assert decoder.feed(b'} ,"x]" , []]') == [
+        b'{"a": "}\\"", "b": [1, {"c": 2}]}',
+        b'"x]"',
+        b"[]",
+    ]
+    decoder.close()
+
+
+@pytest.mark.parametrize(
+    "document", [b"[2.x]", b"[tru, 1]", b"[1 2]", b"[1, , 2]", b"{}"]
+)
+def test_malformed_arrays_raise(document):
+    with pytest.raises(ValueError):
+        decode_in_chunks([document])
+
+
+def test_truncated_array_raises_on_close():
+    decoder = JSONArrayStreamDecoder()
+    decoder.feed(b"[1, 2")
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+ITEMS = [{"numeroItem": i, "descricao": "Papel A4"} for i in range(1, 8)]
+PARAMS = PNCPContratacaoItemsParamsDTO(cnpj="00000000000001", ano=2024, sequencial=1)
+
+
+def make_adapter(requests: list[dict], **kwargs) -> PNCPApiPncpAdapter:
+    body = json.dumps(ITEMS).encode()
+
+    async def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start : start + 7]
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        requests.append(params)
+        if "pagina" not in params:
+            return httpx.Response(200, content=chunks())
+        page_size = int(params["tamanhoPagina"])
+        start = (int(params["pagina"]) - 1) * page_size
+        return httpx.Response(200, json=ITEMS[start : start + page_size])
+
+    return PNCPApiPncpAdapter(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+        limiter=AdaptiveConcurrencyLimiter("test"),
+        stream=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("decoder", ["msgspec", "pydantic", "passthrough"])
+def test_adapter_streams_short_item_lists_in_one_request(decoder):
+    requests = []
+    adapter = make_adapter(
+        requests, max_streamed_items=100, page_size=2, decoder=decoder
+    )
+
+    result = asyncio.run(adapter.get_contratacao_items(PARAMS))
+    assert requests == [{"tamanhoPagina": "10000"}]
+    assert [item["numeroItem"] for item in result.root] == list(range(1, 8))
+    assert result._n_bytes == len(json.dumps(ITEMS))
+    if decoder == "passthrough":
+        assert [json.loads(item[RAW_JSON_KEY]) for item in result.root] == ITEMS
+
+
+def test_adapter_fetches_lists_past_the_threshold_page_by_page():
+    requests = []
+    adapter = make_adapter(
+        requests, max_streamed_items=3, page_size=2, decoder="msgspec"
+    )
+
+    result = asyncio.run(adapter.get_contratacao_items(PARAMS))
+    # Four items were streamed before the threshold was crossed; they fill
+    # two pages, so the rest starts at the third.
+    assert requests == [
+        {"tamanhoPagina": "10000"},
+        {"pagina": "3", "tamanhoPagina": "2"},
+        {"pagina": "4", "tamanhoPagina": "2"},
+    ]
+    assert result.root == ITEMS
@@ -0,0 +1,71 @@
+import asyncio
+
+from licitabot.application.page_queue import BoundedPageQueue
+from licitabot.domain.entities import RawContratacaoPage
+
+
+def make_page(pagina: int, n_bytes: int = 0) -> RawContratacaoPage:
+    return RawContratacaoPage(
+        codigo_modalidade_contratacao=6,
+        pagina=pagina,
+        contratacoes=[],
+        n_bytes=n_bytes,
+    )
+
+
+async def put_blocks(queue: BoundedPageQueue, page: RawContratacaoPage) -> bool:
+    put = asyncio.create_task(queue.put(page))
+    await asyncio.sleep(0.01)
+    blocked = not put.done()
+    put.cancel()
+    return blocked
+
+
+def test_put_blocks_at_max_pages_until_a_page_is_released():
+    async def run():
+        queue = BoundedPageQueue(max_pages=2)
+        await queue.put(make_page(1))
+        await queue.put(make_page(2))
+        assert await put_blocks(queue, make_page(3))
+
+        # Taking a page is not enough; it counts until released.
+        page = await queue.get()
+        assert await put_blocks(queue, make_page(3))
+        await queue.release(page)
+        await asyncio.wait_for(queue.put(make_page(3)), 1)
+        assert queue.n_pages == 2
+
+    asyncio.run(run())
+
+
+def test_byte_budget_blocks_but_lets_an_oversized_page_through_alone():
+    async def run():
+        queue = BoundedPageQueue(max_pages=10, max_bytes=100)
+        await queue.put(make_page(1, n_bytes=60))
+        assert await put_blocks(queue, make_page(2, n_bytes=60))
+
+        await queue.release(await queue.get())
+        await asyncio.wait_for(queue.put(make_page(2, n_bytes=500)), 1)
+        assert queue.n_bytes == 500
+
+    asyncio.run(run())
+
+
+def test_every_consumer_gets_none_once_closed_and_drained():
+    async def consume(queue: BoundedPageQueue, seen: list[int]) -> None:
+        while (page := await queue.get()) is not None:
+            seen.append(page.pagina)
+            await queue.release(page)
+
+    async def run() -> list[int]:
+        queue = BoundedPageQueue(max_pages=2)
+        seen: list[int] = []
+        consumers = [asyncio.create_task(consume(queue, seen)) for _ in range(3)]
+        for pagina in range(1, 8):
+            await queue.put(make_page(pagina))
+        await queue.close()
+        await asyncio.wait_for(asyncio.gather(*consumers), 1)
+        assert queue.n_pages == 0
+        return seen
+
+    assert sorted(asyncio.run(run())) == list(range(1, 8))
@@ -0,0 +1,172 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pncp_fakes import FakeConsultaAdapter, FakePncpAdapter, make_entry, make_item
+
+from licitabot.domain.value_objects import CodigoModalidadeContratacao, ContentHash
+from licitabot.infrastructure.adapters.pncp_decoders import (
+    decode_contratacao_items,
+    decode_updated_contratacoes,
+)
+from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
+    RawContratacaoGateway,
+    convert_to_raw_contratacao,
+)
+
+
+def make_gateway(entries, items, **kwargs) -> RawContratacaoGateway:
+    failing = kwargs.pop("failing", None)
+    decoder = kwargs.pop("decoder", "msgspec")
+    return RawContratacaoGateway(
+        pncp_api_consulta_adapter=FakeConsultaAdapter(
+            entries, tamanho_pagina=10, decoder=decoder
+        ),
+        pncp_api_pncp_adapter=FakePncpAdapter(items, failing=failing, decoder=decoder),
+        codigo_modalidade_contratacao=CodigoModalidadeContratacao(
+            CodigoModalidadeContratacao.PREGAO_ELETRONICO
+        ),
+        tamanho_pagina=10,
+        **kwargs,
+    )
+
+
+async def collect_pages(gateway: RawContratacaoGateway, **kwargs) -> list:
+    pages = []
+
+    async def sink(page):
+        pages.append(page)
+
+    await gateway.fetch_updated_contratacoes_pages(
+        "20240101", "20240101", sink, **kwargs
+    )
+    return sorted(pages, key=lambda page: page.pagina)
+
+
+def test_items_are_fetched_concurrently_up_to_the_item_workers():
+    entries = [make_entry(i) for i in range(1, 26)]
+    items = {i: [make_item(1), make_item(2)] for i in range(1, 26)}
+    gateway = make_gateway(entries, items, n_page_workers=1, n_item_workers=4)
+
+    pages = asyncio.run(collect_pages(gateway))
+
+    assert [page.pagina for page in pages] == [1, 2, 3]
+    contratacoes = [c for page in pages for c in page.contratacoes]
+    assert [c.numero_controle_pncp for c in contratacoes] == [
+        entry["numeroControlePNCP"] for entry in entries
+    ]
+    assert all(len(c.items) == 2 for c in contratacoes)
+    assert gateway.pncp_api_pncp_adapter.max_in_flight == 4
+
+
+def test_failed_item_fetch_is_not_retried_by_the_gateway():
+    entries = [make_entry(i) for i in range(1, 6)]
+    items = {i: [make_item(1)] for i in range(1, 6)}
+    gateway = make_gateway(
+        entries, items, failing={3: RuntimeError("itens unavailable")}
+    )
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        asyncio.run(collect_pages(gateway))
+
+    assert exc_info.group_contains(RuntimeError, match="itens unavailable")
+    # The adapter's own retries are the only ones.
+    assert gateway.pncp_api_pncp_adapter.n_calls[3] == 1
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.calls: list[tuple[str, object]] = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(
+            lambda done: self.calls.append((fn.__name__, done.result()))
+        )
+        return future
+
+
+@pytest.mark.parametrize("decoder", ["msgspec", "passthrough"])
+def test_decode_executor_builds_the_same_records_in_two_calls_per_page(decoder):
+    entries = [make_entry(i) for i in range(1, 16)]
+    items = {i: [make_item(1), make_item(2, f"Item {i}")] for i in range(1, 16)}
+    executor = RecordingExecutor()
+
+    in_process = asyncio.run(
+        collect_pages(make_gateway(entries, items, decoder=decoder))
+    )
+    with executor:
+        offloaded = asyncio.run(
+            collect_pages(
+                make_gateway(entries, items, decoder=decoder, decode_executor=executor)
+            )
+        )
+
+    def records(pages):
+        return [
+            (
+                c.numero_controle_pncp,
+                c.meta,
+                c.content_hash,
+                [item.meta for item in c.items],
+            )
+            for page in pages
+            for c in page.contratacoes
+        ]
+
+    assert records(offloaded) == records(in_process)
+    assert [page.n_bytes for page in offloaded] == [page.n_bytes for page in in_process]
+
+    # One key decode for the page count, then a key decode and a build per page.
+    names = [name for name, _ in executor.calls]
+    assert names.count("decode_updated_contratacoes_keys") == 3
+    assert names.count("build_raw_contratacoes") == 2
+    for name, result in executor.calls:
+        if name == "decode_updated_contratacoes_keys":
+            assert all(
+                set(entry)
+                <= {
+                    "numeroControlePNCP",
+                    "orgaoEntidade",
+                    "anoCompra",
+                    "sequencialCompra",
+                    "dataAtualizacaoGlobal",
+                }
+                for entry in result.data
+            )
+
+
+def test_passthrough_hashes_the_stored_bytes_without_decoding_them():
+    page = {
+        "data": [make_entry(1)],
+        "totalPaginas": 2,
+        "totalRegistros": 1,
+        "numeroPagina": 1,
+        "paginasRestantes": 1,
+        "empty": False,
+    }
+
+    def convert(items: list[dict]):
+        entry = decode_updated_contratacoes(
+            json.dumps(page).encode(), "passthrough"
+        ).data[0]
+        entry["items"] = decode_contratacao_items(
+            json.dumps(items).encode(), "passthrough"
+        ).root
+        return convert_to_raw_contratacao(entry)
+
+    contratacao = convert([make_item(2, "Café"), make_item(1)])
+
+    assert contratacao.content_hash == ContentHash.from_bytes(contratacao.meta_json)
+    assert [item.content_hash for item in contratacao.items] == [
+        ContentHash.from_bytes(item.meta_json) for item in contratacao.items
+    ]
+    # Same payload, same hash; a changed item changes the contratacao's.
+    assert convert([make_item(2, "Café"), make_item(1)]) == contratacao
+    assert (
+        convert([make_item(2, "Chá"), make_item(1)]).content_hash
+        != contratacao.content_hash
+    )
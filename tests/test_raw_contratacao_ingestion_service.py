@@ -0,0 +1,194 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from pncp_fakes import FakeConsultaAdapter, FakePncpAdapter, make_entry, make_item
+
+from licitabot.application.dtos import RawContratacaoIngestionParamsDTO
+from licitabot.application.raw_contratacao_ingestion_service import (
+    RawContratacaoIngestionService,
+)
+from licitabot.domain.value_objects import CodigoModalidadeContratacao
+from licitabot.infrastructure.execution_tracker import tracker as tracker_module
+from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
+    RawContratacaoGateway,
+)
+
+
+class FakeExecution:
+
+    def __init__(self):
+        self.id = uuid4()
+
+
+class FakeExecutionTracker:
+
+    def __init__(self):
+        self.failed: list[dict] = []
+        self.succeeded: list[dict] = []
+
+    async def start(self, job_name, meta=None, parent_id=None) -> FakeExecution:
+        return FakeExecution()
+
+    async def mark_success(self, execution, result=None) -> None:
+        self.succeeded.append(result)
+
+    async def mark_failed(self, execution, error=None) -> None:
+        self.failed.append(error)
+
+    async def mark_cancelled(self, execution) -> None:
+        pass
+
+
+class FakeRawContratacaoRepository:
+
+    def __init__(self):
+        self.item_counts = {"inserted": 0, "updated": 0, "deleted": 0}
+        self.contratacao_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self.saved: list[str] = []
+        self.n_commits = 0
+        self.n_rollbacks = 0
+
+    async def save_many(self, entities, force=False):
+        keys = [entity.numero_controle_pncp for entity in entities]
+        self.saved += keys
+        self.contratacao_counts["inserted"] += len(keys)
+        return keys
+
+    copy_many = save_many
+
+    async def commit(self) -> None:
+        self.n_commits += 1
+
+    async def rollback(self) -> None:
+        self.n_rollbacks += 1
+
+    def expunge_all(self) -> None:
+        pass
+
+
+class FakeIngestionCheckpointRepository:
+
+    def __init__(self, completed: dict | None = None):
+        self.completed: dict[UUID, set[int]] = completed or {}
+
+    async def get_completed_pages(
+        self, execution_id, data_inicial, data_final, codigo_modalidade_contratacao
+    ) -> set[int]:
+        return set(self.completed.get(execution_id, set()))
+
+    async def add_completed_pages(
+        self,
+        execution_id,
+        data_inicial,
+        data_final,
+        codigo_modalidade_contratacao,
+        paginas,
+    ) -> None:
+        self.completed.setdefault(execution_id, set()).update(paginas)
+
+
+@pytest.fixture
+def execution_tracker(monkeypatch) -> FakeExecutionTracker:
+    fake_tracker = FakeExecutionTracker()
+
+    async def get_execution_tracker():
+        return fake_tracker
+
+    monkeypatch.setattr(tracker_module, "get_execution_tracker", get_execution_tracker)
+    return fake_tracker
+
+
+def make_service(
+    n_entries: int,
+    failing: dict | None = None,
+    n_writers: int = 1,
+    checkpoints: FakeIngestionCheckpointRepository | None = None,
+) -> RawContratacaoIngestionService:
+    entries = [make_entry(i) for i in range(1, n_entries + 1)]
+    items = {i: [make_item(1)] for i in range(1, n_entries + 1)}
+    gateway = RawContratacaoGateway(
+        pncp_api_consulta_adapter=FakeConsultaAdapter(entries, tamanho_pagina=10),
+        pncp_api_pncp_adapter=FakePncpAdapter(items, failing=failing),
+        codigo_modalidade_contratacao=CodigoModalidadeContratacao(
+            CodigoModalidadeContratacao.PREGAO_ELETRONICO
+        ),
+        tamanho_pagina=10,
+    )
+    checkpoints = checkpoints or FakeIngestionCheckpointRepository()
+    return RawContratacaoIngestionService(
+        gateway,
+        FakeRawContratacaoRepository(),
+        checkpoints,
+        writer_repositories=[
+            (FakeRawContratacaoRepository(), checkpoints) for _ in range(n_writers - 1)
+        ],
+    )
+
+
+def test_run_saves_every_page(execution_tracker):
+    service = make_service(25, n_writers=2)
+
+    result = asyncio.run(
+        service.run(
+            RawContratacaoIngestionParamsDTO(
+                dataInicial="20240101", dataFinal="20240101"
+            )
+        )
+    )
+
+    assert result.n_pages_committed == 3
+    assert result.n_raw_contratacoes_saved == 25
+    assert sorted(
+        key for repository, _ in service.writers for key in repository.saved
+    ) == [make_entry(i)["numeroControlePNCP"] for i in range(1, 26)]
+    assert execution_tracker.failed == []
+
+
+def test_failed_fetch_rolls_back_every_writer_and_records_the_cause(
+    execution_tracker,
+):
+    service = make_service(
+        25, failing={13: RuntimeError("itens of 13 unavailable")}, n_writers=3
+    )
+
+    with pytest.raises(RuntimeError, match="itens of 13 unavailable"):
+        asyncio.run(
+            service.run(
+                RawContratacaoIngestionParamsDTO(
+                    dataInicial="20240101", dataFinal="20240101"
+                )
+            )
+        )
+
+    assert [repository.n_rollbacks for repository, _ in service.writers] == [1, 1, 1]
+    assert execution_tracker.failed == [{"error": "itens of 13 unavailable"}]
+
+
+def test_resumed_run_skips_completed_pages(execution_tracker):
+    execution_id = uuid4()
+    checkpoints = FakeIngestionCheckpointRepository({execution_id: {1, 3}})
+    service = make_service(25, checkpoints=checkpoints)
+
+    result = asyncio.run(
+        service.run(
+            RawContratacaoIngestionParamsDTO(
+                dataInicial="20240101",
+                dataFinal="20240101",
+                resumeExecutionId=str(execution_id),
+            )
+        )
+    )
+
+    assert result.n_pages_resumed == 2
+    assert result.n_pages_committed == 1
+    repository, _ = service.writers[0]
+    assert repository.saved == [
+        make_entry(i)["numeroControlePNCP"] for i in range(11, 21)
+    ]
+    # Only the entries of the pending page had their items fetched.
+    assert sorted(
+        service.raw_contratacao_gateway.pncp_api_pncp_adapter.n_calls
+    ) == list(range(11, 21))
+    # Checkpoints stay under the resumed execution.
+    assert checkpoints.completed == {execution_id: {1, 2, 3}}
@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+import pytest
+from pncp_fakes import make_entry, make_item
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from licitabot.infrastructure.database.session import _create_engine
+from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
+    convert_to_raw_contratacao,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.partitions import (
+    RawContratacaoPartitionManager,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.repository import (
+    RawContratacaoRepository,
+)
+from licitabot.settings import settings
+
+# Same database as test_raw_contratacao_repository.py; the partitions
+# created here are dropped again at the end.
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("LICITABOT_TEST_DATABASE"),
+    reason="LICITABOT_TEST_DATABASE is not set",
+)
+
+YEAR = 2099
+
+
+def test_detach_year_leaves_both_partitions_as_standalone_tables():
+    async def main():
+        engine = _create_engine(settings.database)
+        try:
+            async with AsyncSession(engine) as session:
+                manager = RawContratacaoPartitionManager(session)
+                try:
+                    assert await manager.ensure_year(YEAR) == [
+                        f"contratacoes_y{YEAR}",
+                        f"item_contratacoes_y{YEAR}",
+                    ]
+                    entry = make_entry(1)
+                    entry["numeroControlePNCP"] = f"{1:014d}-1-{1:06d}/{YEAR}"
+                    entry["anoCompra"] = YEAR
+                    entry["items"] = [make_item(1), make_item(2)]
+                    repository = RawContratacaoRepository(session)
+                    await repository.save_many([convert_to_raw_contratacao(entry)])
+                    await repository.commit()
+
+                    assert await manager.detach_year(YEAR) == [
+                        f"item_contratacoes_y{YEAR}",
+                        f"contratacoes_y{YEAR}",
+                    ]
+                    assert not [
+                        partition
+                        for partition in await manager.list_partitions()
+                        if partition["partition_name"].endswith(f"_y{YEAR}")
+                    ]
+                    result = await session.execute(
+                        text(
+                            "SELECT count(*) FROM pg_constraint "
+                            "WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+                        ),
+                        {"name": f"item_contratacoes_y{YEAR}"},
+                    )
+                    assert result.scalar_one() == 0
+                    # The rows stay in the detached tables, for archiving.
+                    for table, n_rows in (
+                        (f"contratacoes_y{YEAR}", 1),
+                        (f"item_contratacoes_y{YEAR}", 2),
+                    ):
+                        result = await session.execute(
+                            text(f"SELECT count(*) FROM {table}")
+                        )
+                        assert result.scalar_one() == n_rows
+                finally:
+                    await session.rollback()
+                    await session.execute(
+                        text(
+                            f"DROP TABLE IF EXISTS item_contratacoes_y{YEAR}, "
+                            f"contratacoes_y{YEAR}"
+                        )
+                    )
+                    await session.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+import asyncio
+import os
+
+import pytest
+from pncp_fakes import make_entry, make_item
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from licitabot.infrastructure.database.session import _create_engine
+from licitabot.infrastructure.gateways.raw_contratacao_gateway import (
+    convert_to_raw_contratacao,
+)
+from licitabot.infrastructure.repositories.raw_contratacao.repository import (
+    RawContratacaoRepository,
+)
+from licitabot.settings import settings
+
+# These run against the database in settings.database, which they empty
+# first: point DATABASE__* at a disposable database migrated with
+# `alembic upgrade head` and set LICITABOT_TEST_DATABASE=1.
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("LICITABOT_TEST_DATABASE"),
+    reason="LICITABOT_TEST_DATABASE is not set",
+)
+
+WRITE_MODES = ("save_many", "copy_many")
+
+
+def make_contratacao(
+    i: int,
+    data_atualizacao_global: str = "2024-01-05T10:00:00",
+    items: tuple = (make_item(1), make_item(2)),
+):
+    entry = make_entry(i, data_atualizacao_global)
+    entry["items"] = list(items)
+    return convert_to_raw_contratacao(entry)
+
+
+def run_with_repository(test, compact: bool = False):
+    async def main():
+        engine = _create_engine(settings.database)
+        try:
+            async with AsyncSession(engine) as session:
+                await session.execute(text("TRUNCATE contratacoes, item_contratacoes"))
+                await session.commit()
+                return await test(RawContratacaoRepository(session, compact=compact))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def write(repository, write_mode: str, entities: list) -> list:
+    saved = await getattr(repository, write_mode)(entities)
+    await repository.commit()
+    return saved
+
+
+@pytest.mark.parametrize("write_mode", WRITE_MODES)
+def test_contratacao_counts(write_mode):
+    async def test(repository):
+        await write(repository, write_mode, [make_contratacao(i) for i in (1, 2)])
+        assert repository.contratacao_counts == {
+            "inserted": 2,
+            "updated": 0,
+            "unchanged": 0,
+        }
+
+        saved = await write(
+            repository,
+            write_mode,
+            [
+                # Identical content.
+                make_contratacao(1),
+                # Newer version.
+                make_contratacao(2, "2024-02-01T00:00:00", (make_item(1, "Papel A3"),)),
+                make_contratacao(3),
+            ],
+        )
+        assert sorted(saved) == [make_entry(i)["numeroControlePNCP"] for i in (2, 3)]
+        assert repository.contratacao_counts == {
+            "inserted": 3,
+            "updated": 1,
+            "unchanged": 1,
+        }
+
+        # Older than what is stored.
+        assert (
+            await write(
+                repository, write_mode, [make_contratacao(2, "2024-01-01T00:00:00")]
+            )
+            == []
+        )
+        assert repository.contratacao_counts["unchanged"] == 2
+
+        stored = await repository.get(make_entry(2)["numeroControlePNCP"])
+        assert stored.meta["dataAtualizacaoGlobal"] == "2024-02-01T00:00:00"
+        assert [item.meta["descricao"] for item in stored.items] == ["Papel A3"]
+
+    run_with_repository(test)
+
+
+def test_save_many_splits_batches_over_the_bind_parameter_limit():
+    # 8 columns per row: 5000 rows would take 40000 parameters in one statement.
+    async def test(repository):
+        entities = [make_contratacao(i, items=()) for i in range(1, 5001)]
+        saved = await write(repository, "save_many", entities)
+        assert len(saved) == 5000
+        assert repository.contratacao_counts["inserted"] == 5000
+
+    run_with_repository(test)
+
+
+@pytest.mark.parametrize("write_mode", WRITE_MODES)
+def test_repeated_item_keeps_the_last_version(write_mode):
+    async def test(repository):
+        await write(
+            repository,
+            write_mode,
+            [make_contratacao(1, items=(make_item(1), make_item(1, "Papel A3")))],
+        )
+        stored = await repository.get(make_entry(1)["numeroControlePNCP"])
+        assert [item.meta["descricao"] for item in stored.items] == ["Papel A3"]
+
+    run_with_repository(test)
+
+
+@pytest.mark.parametrize("write_mode", WRITE_MODES)
+def test_item_counts(write_mode):
+    async def test(repository):
+        await write(
+            repository,
+            write_mode,
+            [make_contratacao(1, items=(make_item(1), make_item(2), make_item(3)))],
+        )
+        assert repository.item_counts == {"inserted": 3, "updated": 0, "deleted": 0}
+
+        await write(
+            repository,
+            write_mode,
+            [
+                make_contratacao(
+                    1,
+                    "2024-02-01T00:00:00",
+                    # 1 unchanged, 2 changed, 3 gone and 4 new.
+                    (make_item(1), make_item(2, "Papel A3"), make_item(4)),
+                )
+            ],
+        )
+        assert repository.item_counts == {"inserted": 4, "updated": 1, "deleted": 1}
+
+        stored = await repository.get(make_entry(1)["numeroControlePNCP"])
+        assert {item.numero_item: item.meta["descricao"] for item in stored.items} == {
+            1: "Papel A4",
+            2: "Papel A3",
+            4: "Papel A4",
+        }
+
+    run_with_repository(test)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_save_keeps_the_newer_stored_version(compact):
+    async def test(repository):
+        await repository.save(make_contratacao(1, "2024-02-01T00:00:00"))
+        await repository.commit()
+        await repository.save(make_contratacao(1, "2024-01-01T00:00:00"))
+        await repository.commit()
+        assert repository.contratacao_counts == {
+            "inserted": 1,
+            "updated": 0,
+            "unchanged": 1,
+        }
+
+        await repository.save(make_contratacao(1, "2024-03-01T00:00:00"))
+        await repository.commit()
+        assert repository.contratacao_counts["updated"] == 1
+
+    run_with_repository(test, compact=compact)
+
+
+def test_lookups_by_malformed_key_find_nothing():
+    async def test(repository):
+        await write(repository, "save_many", [make_contratacao(1)])
+        assert await repository.get("not-a-numero-controle") is None
+        assert await repository.get_updated_dates(
+            ["not-a-numero-controle", make_entry(1)["numeroControlePNCP"]]
+        ) == {make_entry(1)["numeroControlePNCP"]: "2024-01-05T10:00:00"}
+
+    run_with_repository(test)